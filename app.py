@@ -1752,17 +1752,21 @@ Drop-in replacement for your app.py
 import streamlit as st
 from pathlib import Path
 import io
-from PIL import Image
 from datetime import datetime
 import json
 from typing import Optional, List
 import sys
 
+from src.lazy import lazy_import
+
+# Pillow is only loaded once a page actually opens an image
+Image = lazy_import("PIL.Image")
+
 # Import OraLake modules (logic unchanged)
 try:
     from src.services.media_storage import MediaStorage, create_thumbnail, convert_image_format
     from src.services.oralake import get_object, query_by_tag
-    from src.database import pool
+    from src.database import get_pool
     import oracledb
     ORALAKE_AVAILABLE = True
 except ImportError as e:
@@ -1920,7 +1924,7 @@ def check_db_connection() -> bool:
     if not ORALAKE_AVAILABLE:
         return False
     try:
-        with pool.acquire() as conn:
+        with get_pool().acquire() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT 1 FROM DUAL")
             result = cursor.fetchone()
@@ -2315,28 +2319,48 @@ def tools_tab():
             if st.button("Upload All", key="upload_all_btn_anthropic"):
                 progress_bar = st.progress(0)
                 status_text = st.empty()
+                image_paths = []
+                uploaded_count = 0
                 for idx, file in enumerate(uploaded_files):
                     try:
-                        status_text.text(f"Uploading {file.name}...")
                         temp_path = f"temp_{file.name}"
                         with open(temp_path, "wb") as f:
                             f.write(file.getbuffer())
                         ext = Path(file.name).suffix.lower()
-                        if ext in ['.jpg','jpeg','.png']:
-                            MediaStorage.save_image(file_path=temp_path, name=Path(file.name).stem, tags="batch_upload")
+                        if ext in ['.jpg','.jpeg','.png']:
+                            # Images are stored together below with one array insert
+                            image_paths.append(temp_path)
                         else:
+                            status_text.text(f"Uploading {file.name}...")
                             MediaStorage.save_video(file_path=temp_path, name=Path(file.name).stem, tags="batch_upload")
-                        Path(temp_path).unlink()
+                            Path(temp_path).unlink()
+                            uploaded_count += 1
                         progress_bar.progress((idx + 1) / len(uploaded_files))
                     except Exception as e:
                         st.error(f"Error uploading {file.name}: {e}")
+                if image_paths:
+                    status_text.text(f"Uploading {len(image_paths)} images...")
+                    try:
+                        result = MediaStorage.save_images_batch(
+                            file_paths=image_paths,
+                            names=[Path(p).stem[len("temp_"):] for p in image_paths],
+                            tags="batch_upload"
+                        )
+                        uploaded_count += len(image_paths) - len(result["errors"])
+                        for error in result["errors"]:
+                            st.error(f"Error uploading {Path(image_paths[error['index']]).name[len('temp_'):]}: {error['error']}")
+                    except Exception as e:
+                        st.error(f"Error uploading images: {e}")
+                    finally:
+                        for temp_path in image_paths:
+                            Path(temp_path).unlink(missing_ok=True)
                 status_text.text("Upload complete!")
-                st.success(f"Uploaded {len(uploaded_files)} files!")
+                st.success(f"Uploaded {uploaded_count} files!")
 
     elif tool_choice == "Database Stats":
         st.subheader("Database Statistics")
         try:
-            with pool.acquire() as conn:
+            with get_pool().acquire() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM ora_lake_objects")
                 total_objects = cursor.fetchone()[0]
@@ -2346,7 +2370,16 @@ def tools_tab():
                     GROUP BY object_type
                 """)
                 type_counts = cursor.fetchall()
-                cursor.execute("SELECT SUM(DBMS_LOB.GETLENGTH(content)) FROM ora_lake_objects")
+                # Bytes actually stored, after compression: deduplicated blobs and
+                # their chunks, version deltas and content stored inline before dedup
+                cursor.execute("""
+                    SELECT (SELECT NVL(SUM(DBMS_LOB.GETLENGTH(content)), 0) FROM ora_lake_blobs)
+                         + (SELECT NVL(SUM(DBMS_LOB.GETLENGTH(content)), 0) FROM ora_lake_chunks)
+                         + (SELECT NVL(SUM(NVL(DBMS_LOB.GETLENGTH(delta), 0) + NVL(DBMS_LOB.GETLENGTH(content), 0)), 0)
+                            FROM ora_lake_versions)
+                         + (SELECT NVL(SUM(DBMS_LOB.GETLENGTH(content)), 0) FROM ora_lake_objects)
+                    FROM dual
+                """)
                 total_size = cursor.fetchone()[0] or 0
                 col1, col2, col3 = st.columns(3)
                 col1.metric("Total Objects", total_objects)
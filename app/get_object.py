@@ -59,7 +59,6 @@
 
 import streamlit as st
 import requests
-import base64
 from frontend_utils import apply_animated_css, alert, show_shimmer
 
 def render_get_object():
@@ -79,34 +78,55 @@ def render_get_object():
             else:
                 shimmer = show_shimmer(st)
                 try:
-                    response = requests.get(f"http://localhost:8000/datalake/get/{object_id}")
-                    shimmer.empty()
+                    # Metadata is small JSON; the bytes come raw from the content endpoint
+                    response = requests.get(f"http://localhost:8000/datalake/objects/{object_id}")
 
                     if response.status_code == 200:
                         data = response.json()
                         filename = data.get("filename", f"object_{object_id}")
-                        file_content = base64.b64decode(data["content"])
+                        # Revalidate the last download instead of fetching unchanged bytes again
+                        cached = st.session_state.get("last_download")
+                        if cached and cached["object_id"] != object_id:
+                            cached = None
+                        content_response = requests.get(
+                            f"http://localhost:8000{data['content_url']}",
+                            headers={"If-None-Match": cached["etag"]} if cached else None
+                        )
+                        if content_response.status_code == 304:
+                            file_content = cached["content"]
+                        else:
+                            content_response.raise_for_status()
+                            file_content = content_response.content
+                            if content_response.headers.get("ETag"):
+                                st.session_state["last_download"] = {
+                                    "object_id": object_id,
+                                    "etag": content_response.headers["ETag"],
+                                    "content": file_content,
+                                }
+                        shimmer.empty()
 
                         # ✅ Animated Success
                         alert(f"Object '{filename}' fetched successfully!", "success")
 
-                        # --- Version Info (if backend sends it) ---
-                        if "version" in data:
-                            st.markdown(f"<div class='ol-card'>📘 Version: {data['version']}</div>", unsafe_allow_html=True)
-                        if "timestamp" in data:
-                            st.caption(f"🕒 Uploaded on: {data['timestamp']}")
+                        # --- Version Info ---
+                        if data.get("version_num") is not None:
+                            st.markdown(f"<div class='ol-card'>📘 Version: {data['version_num']}</div>", unsafe_allow_html=True)
+                        if data.get("updated_at"):
+                            st.caption(f"🕒 Updated on: {data['updated_at']}")
 
                         # --- Download Option ---
                         st.download_button(
                             label="⬇️ Download File",
                             data=file_content,
                             file_name=filename,
-                            mime=data.get("type", "application/octet-stream")
+                            mime=data.get("content_type", "application/octet-stream")
                         )
 
                     elif response.status_code == 404:
+                        shimmer.empty()
                         alert("Object not found.", "error")
                     else:
+                        shimmer.empty()
                         alert(f"Failed to fetch object. Error: {response.text}", "error")
 
                 except Exception as e:
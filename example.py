@@ -145,45 +145,26 @@ def example_5_image_optimization_pipeline():
     print("Example 5: Image Optimization Pipeline")
     print("=" * 60)
     
-    # Original high-quality image
-    original_id = MediaStorage.save_image(
+    # Original plus web, mobile and thumbnail renditions from a single decode,
+    # stored in one transaction
+    ids = MediaStorage.save_image_renditions(
         file_path="uploads/photo_original.jpg",
-        name="blog_post_hero_original",
-        tags="blog,original",
-        compress=False  # Keep original quality
+        name="blog_post_hero",
+        tags="blog",
+        renditions=[
+            {"name": "web", "max_dimension": 1920, "quality": 75},
+            {"name": "mobile", "max_dimension": 800, "quality": 70},
+            {"name": "thumb", "size": (200, 200)},
+        ]
     )
-    print(f"✅ Original saved (ID: {original_id})")
-    
-    # Web-optimized version
-    web_id = MediaStorage.save_image(
-        file_path="uploads/photo_original.jpg",
-        name="blog_post_hero_web",
-        tags="blog,web-optimized",
-        compress=True,
-        quality=75,
-        max_dimension=1920
-    )
-    print(f"✅ Web version saved (ID: {web_id})")
-    
-    # Mobile-optimized version
-    mobile_id = MediaStorage.save_image(
-        file_path="uploads/photo_original.jpg",
-        name="blog_post_hero_mobile",
-        tags="blog,mobile-optimized",
-        compress=True,
-        quality=70,
-        max_dimension=800
-    )
-    print(f"✅ Mobile version saved (ID: {mobile_id})")
-    
-    # Thumbnail for preview
-    thumb_id = create_thumbnail(
-        object_id=original_id,
-        size=(200, 200),
-        save_as_new=True,
-        thumbnail_name="blog_post_hero_thumb"
-    )
-    print(f"✅ Thumbnail saved (ID: {thumb_id})")
+    print(f"✅ Original saved (ID: {ids['source']})")
+    print(f"✅ Web version saved (ID: {ids['web']})")
+    print(f"✅ Mobile version saved (ID: {ids['mobile']})")
+    print(f"✅ Thumbnail saved (ID: {ids['thumb']})")
+    
+    # Renditions are found through their original
+    thumb_bytes, thumb_info = MediaStorage.get_rendition(ids['source'], "thumb")
+    print(f"✅ Thumbnail fetched: {thumb_info['size']}, {len(thumb_bytes)} bytes")
     print()
 
 
@@ -270,26 +251,25 @@ def example_8_batch_upload_photos():
     event_name = "company_party_2025"
     photo_folder = Path("events/company_party/")
     
-    uploaded_ids = []
-    
     # Simulate batch upload
     photo_files = [
         "photo1.jpg", "photo2.jpg", "photo3.jpg",
         "photo4.jpg", "photo5.jpg"
     ]
     
-    for i, photo_file in enumerate(photo_files, 1):
-        obj_id = MediaStorage.save_image(
-            file_path=str(photo_folder / photo_file),
-            name=f"{event_name}_photo_{i:03d}",
-            tags=f"event,party,{event_name}",
-            description=f"Company Party 2025 - Photo {i}",
-            compress=True,
-            quality=80,
-            max_dimension=1920
-        )
-        uploaded_ids.append(obj_id)
-        print(f"✅ Photo {i}/5 uploaded (ID: {obj_id})")
+    # One array insert and one commit for the whole event
+    result = MediaStorage.save_images_batch(
+        file_paths=[str(photo_folder / photo_file) for photo_file in photo_files],
+        names=[f"{event_name}_photo_{i:03d}" for i in range(1, len(photo_files) + 1)],
+        tags=f"event,party,{event_name}",
+        description="Company Party 2025",
+        compress=True,
+        quality=80,
+        max_dimension=1920
+    )
+    uploaded_ids = [obj_id for obj_id in result["object_ids"] if obj_id is not None]
+    for error in result["errors"]:
+        print(f"❌ Photo {error['index'] + 1} failed: {error['error']}")
     
     print(f"\n📸 Total photos uploaded: {len(uploaded_ids)}")
     print()
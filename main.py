@@ -1,13 +1,26 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import RedirectResponse
 from src.routes.sample_routes import router as oracle_router
 from src.routes.datalake_routes import router as datalake_router
+from src.config import settings
+from src.database import close_pools, warm_up_pools
+from src.services.imaging import shutdown_image_workers
 from pydantic import BaseModel
 #from your_db_module import tag_object  # import your DB function
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pools open lazily on the first request unless warm-up is enabled
+    if settings.pool_warmup:
+        await warm_up_pools()
+    yield
+    await close_pools()
+    shutdown_image_workers()
+
+app = FastAPI(lifespan=lifespan)
 
 class TagRequest(BaseModel):
     object_id: int
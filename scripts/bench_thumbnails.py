@@ -0,0 +1,125 @@
+"""
+Thumbnail benchmark: the original create_thumbnail call vs make_thumbnail.
+
+Generates a set of JPEG photos, then thumbnails them with each engine in a
+fresh interpreter and reports wall time and peak resident memory:
+
+  before   the original MediaStorage.create_thumbnail code: Image.thumbnail()
+           with LANCZOS and the default reducing_gap on the unloaded image
+  current  imaging.make_thumbnail, as used by the thumbnail endpoints
+
+Usage:
+    python scripts/bench_thumbnails.py
+    python scripts/bench_thumbnails.py --count 50 --width 6000 --height 4000 --size 150
+"""
+
+from typing import List, Optional
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ("before", "current")
+
+
+def make_photos(directory: str, count: int, width: int, height: int) -> List[str]:
+    """Noisy gradients, so the JPEGs are about as expensive to decode as real photos."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    paths = []
+    for i in range(count):
+        base = np.stack([x + 0 * y, y + 0 * x, (x + y + 40 * i) % 256], axis=-1)
+        pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f"photo_{i:04d}.jpg")
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def _peak_rss_kb() -> int:
+    # VmHWM starts afresh at exec; ru_maxrss would carry over the parent's peak on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _worker(engine: str, paths: List[str], size: int):
+    """Runs in the child: thumbnail every file and report time and memory."""
+    import io
+    import time
+    from PIL import Image
+    from src.services.imaging import make_thumbnail
+
+    def before(image_bytes: bytes) -> bytes:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=85, optimize=True)
+            return buffer.getvalue()
+
+    thumbnail = before if engine == "before" else (lambda data: make_thumbnail(data, (size, size)))
+    baseline_kb = _peak_rss_kb()
+    start = time.perf_counter()
+    output = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            output += len(thumbnail(f.read()))
+    elapsed = time.perf_counter() - start
+    peak_kb = _peak_rss_kb()
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_mb": (peak_kb - baseline_kb) / 1024,
+        "output_bytes": output,
+    }))
+
+
+def run_engine(engine: str, paths: List[str], size: int) -> dict:
+    code = (
+        "import json, sys; sys.path.insert(0, '.'); "
+        "from scripts.bench_thumbnails import _worker; "
+        f"_worker({engine!r}, json.loads(sys.stdin.read()), {size})"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, input=json.dumps(paths),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20, help="number of photos")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--size", type=int, default=150, help="thumbnail bounding box")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {args.count} {args.width}x{args.height} JPEGs...")
+        paths = make_photos(directory, args.count, args.width, args.height)
+        results = {engine: run_engine(engine, paths, args.size) for engine in ENGINES}
+
+    print(f"{'engine':<10}{'total s':>10}{'ms/photo':>10}{'peak MB':>10}")
+    for engine, result in results.items():
+        print(f"{engine:<10}{result['seconds']:>10.2f}{1000 * result['seconds'] / args.count:>10.1f}"
+              f"{result['peak_mb']:>10.1f}")
+    ratio = results["current"]["seconds"] / results["before"]["seconds"]
+    print(f"current/before time: {ratio:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Import-time budget for the API and the Streamlit app.
+
+Runs each target in a fresh interpreter under `python -X importtime`,
+prints the most expensive modules it imported and fails when:
+
+  * one of src.lazy.HEAVY_MODULES (Pillow, NumPy, OpenCV, MoviePy, pandas)
+    is imported by our own code (main, app.py, src.*) instead of being
+    deferred with src.lazy.lazy_import; heavy modules pulled in by a
+    third-party package such as streamlit are reported but allowed
+  * the target's total import time exceeds its budget
+
+Usage:
+    python scripts/import_budget.py                    # main:app and app.py
+    python scripts/import_budget.py main:app --top 30
+    python scripts/import_budget.py --budget-ms 0      # report only, no time budget
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lazy import HEAVY_MODULES  # noqa: E402
+
+MARKER = "-- import budget: target starts --"
+
+TARGETS = {
+    "main:app": "import main; main.app",
+    "app.py": "import runpy; runpy.run_path('app.py', run_name='__main__')",
+}
+
+# Cumulative import time allowed per target, in milliseconds
+BUDGETS_MS = {
+    "main:app": 1500,
+    "app.py": 4000,
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Module:
+    def __init__(self, name: str, self_us: int, cumulative_us: int, depth: int):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+        self.parent: Optional["Module"] = None
+        self.children: List["Module"] = []
+
+    def chain(self) -> List[str]:
+        names, node = [], self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return names[::-1]
+
+
+def parse_importtime(stderr: str) -> List[Module]:
+    """
+    Modules imported after MARKER, in completion order, linked to their
+    importer. -X importtime prints a module after everything it imported,
+    indented two more spaces per nesting level.
+    """
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+
+    modules = []
+    pending: Dict[int, List[Module]] = {}
+    for line in lines:
+        match = _LINE.match(line)
+        if not match:
+            continue
+        depth = (len(match.group(3)) - 1) // 2
+        module = Module(match.group(4), int(match.group(1)), int(match.group(2)), depth)
+        module.children = pending.pop(depth + 1, [])
+        for child in module.children:
+            child.parent = module
+        pending.setdefault(depth, []).append(module)
+        modules.append(module)
+    return modules
+
+
+def is_heavy(name: str) -> bool:
+    return any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+
+
+def is_ours(name: str) -> bool:
+    return name in ("main", "app") or name == "src" or name.startswith("src.")
+
+
+def _entry_points(modules: List[Module]) -> List[Module]:
+    """Heavy modules imported from outside their own package."""
+    return [
+        module for module in modules
+        if is_heavy(module.name) and (module.parent is None or not is_heavy(module.parent.name))
+    ]
+
+
+def eager_heavy_imports(modules: List[Module]) -> List[Module]:
+    """Heavy modules imported by our code or by the target's top level."""
+    return [module for module in _entry_points(modules) if module.parent is None or is_ours(module.parent.name)]
+
+
+def run_target(target: str, timeout: float) -> subprocess.CompletedProcess:
+    code = f"import sys; sys.stderr.write({MARKER!r} + '\\n'); sys.stderr.flush(); {TARGETS[target]}"
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+
+
+def check(target: str, top: int, budget_ms: Optional[float], timeout: float) -> bool:
+    print(f"== {target}")
+    try:
+        result = run_target(target, timeout)
+    except subprocess.TimeoutExpired:
+        print(f"   FAIL: did not finish within {timeout:.0f}s")
+        return False
+
+    modules = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        last = result.stderr.strip().splitlines()[-1:] or ["no output"]
+        print(f"   FAIL: exited with status {result.returncode}: {last[0]}")
+        return False
+
+    total_us = sum(module.cumulative_us for module in modules if module.depth == 0)
+    print(f"   {len(modules)} modules imported, {total_us / 1000:.1f} ms total")
+    print(f"   {'cumulative ms':>13}  {'self ms':>8}  module")
+    for module in sorted(modules, key=lambda m: m.cumulative_us, reverse=True)[:top]:
+        print(f"   {module.cumulative_us / 1000:13.1f}  {module.self_us / 1000:8.1f}  {module.name}")
+
+    ok = True
+    for module in eager_heavy_imports(modules):
+        ok = False
+        print(f"   FAIL: {module.name} imported eagerly via {' -> '.join(module.chain())}"
+              f" ({module.cumulative_us / 1000:.1f} ms)")
+    for module in _entry_points(modules):
+        if module.parent is not None and not is_ours(module.parent.name):
+            print(f"   note: {module.name} imported by third-party {module.parent.name}")
+
+    if budget_ms and total_us / 1000 > budget_ms:
+        ok = False
+        print(f"   FAIL: {total_us / 1000:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help=f"targets to check: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument("--top", type=int, default=15, help="number of modules to list per target")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="time budget for every target; 0 disables it (default: per-target budgets)")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for each target")
+    args = parser.parse_args(argv)
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    ok = True
+    for target in args.targets or list(TARGETS):
+        budget_ms = BUDGETS_MS.get(target) if args.budget_ms is None else args.budget_ms
+        ok = check(target, args.top, budget_ms, args.timeout) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,7 @@
 from pydantic_settings import BaseSettings
+from typing import Dict
+import os
+import tempfile
 
 class Settings(BaseSettings):
     oracle_user: str
@@ -6,6 +9,61 @@ class Settings(BaseSettings):
     oracle_dsn: str
     app_port: int = 8000
 
+    # Connection pool sizing and behaviour
+    pool_min: int = 2
+    pool_max: int = 5
+    pool_increment: int = 1
+    pool_getmode: str = "wait"          # wait | nowait | forceget | timedwait
+    pool_wait_timeout: int = 5000       # ms, only used with getmode=timedwait
+    pool_ping_interval: int = 60        # seconds, negative disables pinging
+    pool_stmtcachesize: int = 20
+    pool_max_lifetime_session: int = 0  # seconds, 0 keeps sessions forever
+    # Pools are created lazily; warm-up opens pool_min connections at startup
+    pool_warmup: bool = False
+    pool_warmup_jitter: float = 2.0     # seconds, max random delay before warm-up
+    pool_drain_timeout: float = 10.0    # seconds to wait for busy connections on shutdown
+
+    # In-process object content cache, 0 disables it
+    object_cache_bytes: int = 0
+
+    # Versions between full snapshots; the rest are stored as binary deltas
+    version_snapshot_interval: int = 10
+
+    # Stored content compression: none | auto | zlib | lzma | zstd
+    compression: str = "none"
+    compression_by_type: Dict[str, str] = {
+        "JSON": "auto",
+        "CSV": "auto",
+        "TEXT": "auto",
+        "LOG": "auto",
+        "IMAGE": "none",
+        "VIDEO": "none",
+    }
+
+    # Blobs of at least chunked_min_bytes (0 disables) are stored as
+    # chunk_bytes pieces, transferred over up to chunk_parallelism connections
+    chunked_min_bytes: int = 64 * 1024 * 1024
+    chunk_bytes: int = 8 * 1024 * 1024
+    chunk_parallelism: int = 4
+
+    # Staging area of multipart upload sessions; must be shared by all workers
+    upload_staging_dir: str = os.path.join(tempfile.gettempdir(), "oralake-uploads")
+    upload_part_max_bytes: int = 5 * 1024 * 1024 * 1024
+    upload_expiry_hours: int = 24
+
+    # Upload bodies stay in memory up to ingest_spool_bytes each, within a
+    # per-process budget shared by all uploads in flight
+    ingest_spool_bytes: int = 1024 * 1024
+    ingest_memory_budget_bytes: int = 64 * 1024 * 1024
+
+    # Pillow decode/resize/encode runs in image_workers processes (0 keeps it
+    # on the calling thread), with at most image_worker_queue_depth tasks
+    # submitted (0 means twice the workers); workers are replaced after
+    # image_worker_max_tasks tasks (0 never)
+    image_workers: int = 0
+    image_worker_queue_depth: int = 0
+    image_worker_max_tasks: int = 200
+
     class Config:
         env_file = ".env"
 
@@ -1,23 +1,277 @@
+import asyncio
 import oracledb
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List
+from src.config import settings
 from src.secrets import secrets
 from src import logger
 
 # DSN format: host:port/service_name
 DSN = secrets.ORACLE_DSN 
 
-pool = oracledb.create_pool(
-    user=secrets.ORACLE_USER,
-    password=secrets.ORACLE_PASSWORD,
-    dsn=DSN,
-    min=2,
-    max=5,
-    increment=1,
-    mode=oracledb.DEFAULT_AUTH,
-)
+POOL_GETMODES = {
+    "wait": oracledb.POOL_GETMODE_WAIT,
+    "nowait": oracledb.POOL_GETMODE_NOWAIT,
+    "forceget": oracledb.POOL_GETMODE_FORCEGET,
+    "timedwait": oracledb.POOL_GETMODE_TIMEDWAIT,
+}
+
+# Number of recent acquire wait times kept for percentile reporting
+ACQUIRE_SAMPLE_SIZE = 1000
+
+
+class PoolStats:
+    """Thread-safe record of how long callers wait to acquire a pooled connection."""
+
+    def __init__(self, sample_size: int = ACQUIRE_SAMPLE_SIZE):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=sample_size)
+        self.acquired = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self._waits.append(seconds * 1000)
+            self.acquired += 1
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            # DPY-4005: timed out waiting for the pool to return a connection
+            if "DPY-4005" in str(error):
+                self.timeouts += 1
+            else:
+                self.failures += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            acquired, timeouts, failures = self.acquired, self.timeouts, self.failures
+        return {
+            "acquired": acquired,
+            "timeouts": timeouts,
+            "failures": failures,
+            "wait_ms": {
+                "p50": _percentile(waits, 50),
+                "p90": _percentile(waits, 90),
+                "p99": _percentile(waits, 99),
+                "max": round(waits[-1], 3) if waits else None,
+                "samples": len(waits),
+            },
+        }
+
+
+def _percentile(values: List[float], pct: int):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[index], 3)
+
+
+def _pool_params() -> Dict:
+    return dict(
+        user=secrets.ORACLE_USER,
+        password=secrets.ORACLE_PASSWORD,
+        dsn=DSN,
+        min=settings.pool_min,
+        max=settings.pool_max,
+        increment=settings.pool_increment,
+        getmode=POOL_GETMODES[settings.pool_getmode.lower()],
+        wait_timeout=settings.pool_wait_timeout,
+        ping_interval=settings.pool_ping_interval,
+        stmtcachesize=settings.pool_stmtcachesize,
+        max_lifetime_session=settings.pool_max_lifetime_session,
+    )
+
+
+# Pools are created on first use, so importing the service layer never connects
+_pool = None
+_pool_lock = threading.Lock()
+pool_stats = PoolStats()
+
+_async_pool = None
+_async_pool_loop = None
+async_pool_stats = PoolStats()
+
+# Closes of async pools replaced for a new event loop, awaited by close_pools
+_retiring_pools = set()
+
+# A replaced pool whose loop is gone cannot answer; its close gives up after this many seconds
+RETIRE_TIMEOUT = 5.0
+
+def get_pool() -> oracledb.ConnectionPool:
+    """Return the sync connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = oracledb.create_pool(mode=oracledb.DEFAULT_AUTH, **_pool_params())
+    return _pool
+
+def __getattr__(name: str):
+    # Keeps `from src.database import pool` working; the pool is created then
+    if name == "pool":
+        return get_pool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def connect_oracledb() -> oracledb.Connection:
     """Acquire a connection from the pool."""
-    return pool.acquire()
+    start = time.perf_counter()
+    try:
+        conn = get_pool().acquire()
+    except oracledb.Error as e:
+        pool_stats.record_failure(e)
+        raise
+    pool_stats.record_wait(time.perf_counter() - start)
+    return conn
+
+def get_async_pool() -> oracledb.AsyncConnectionPool:
+    """
+    Return the asyncio connection pool, creating it on first use.
+    It has to be created from inside a running event loop, and its
+    connections belong to that loop; when called from a different loop
+    (or after the first one closed) a fresh pool is created for it.
+    """
+    global _async_pool, _async_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_pool is not None and _async_pool_loop is not loop:
+        logger.warning("Async pool belongs to another event loop; closing it and creating a new one")
+        _retire_async_pool(_async_pool, _async_pool_loop)
+        _async_pool = None
+    if _async_pool is None:
+        _async_pool = oracledb.create_pool_async(**_pool_params())
+        _async_pool_loop = loop
+    return _async_pool
+
+async def _close_async_pool(p, timeout: float = None):
+    try:
+        await asyncio.wait_for(p.close(force=True), timeout)
+    except Exception as e:
+        logger.warning(f"Could not close the async pool of a previous event loop: {e}")
+
+def _retire_async_pool(p, loop):
+    """
+    Close an async pool replaced for another event loop, so its sessions are
+    logged off instead of lingering on the server. It is closed on its own
+    loop while that still runs, otherwise from the current one.
+    """
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_close_async_pool(p), loop))
+    else:
+        future = asyncio.ensure_future(_close_async_pool(p, RETIRE_TIMEOUT))
+    _retiring_pools.add(future)
+    future.add_done_callback(_retiring_pools.discard)
+
+async def acquire_async() -> oracledb.AsyncConnection:
+    """Acquire a connection from the async pool."""
+    start = time.perf_counter()
+    try:
+        conn = await get_async_pool().acquire()
+    except oracledb.Error as e:
+        async_pool_stats.record_failure(e)
+        raise
+    async_pool_stats.record_wait(time.perf_counter() - start)
+    return conn
+
+@asynccontextmanager
+async def connect_oracledb_async():
+    """Async context manager around acquire_async() that releases the connection."""
+    conn = await acquire_async()
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+def idle_connections() -> int:
+    """Connections the sync pool can hand out right now without waiting."""
+    p = get_pool()
+    return max(0, p.max - p.busy)
+
+def async_idle_connections() -> int:
+    """Connections the async pool can hand out right now without waiting."""
+    p = get_async_pool()
+    return max(0, p.max - p.busy)
+
+def _describe_pool(p) -> Dict:
+    return {
+        "min": p.min,
+        "max": p.max,
+        "increment": p.increment,
+        "opened": p.opened,
+        "busy": p.busy,
+        "getmode": settings.pool_getmode.lower(),
+        "wait_timeout_ms": p.wait_timeout,
+        "ping_interval_s": p.ping_interval,
+        "stmtcachesize": p.stmtcachesize,
+        "max_lifetime_session_s": p.max_lifetime_session,
+    }
+
+def get_pool_stats() -> Dict:
+    """Live pool occupancy plus acquire wait-time statistics for the pools created so far."""
+    stats = {}
+    if _pool is not None:
+        stats["sync"] = {**_describe_pool(_pool), "acquire": pool_stats.snapshot()}
+    if _async_pool is not None:
+        stats["async"] = {**_describe_pool(_async_pool), "acquire": async_pool_stats.snapshot()}
+    return stats
+
+async def warm_up_pools():
+    """
+    Open the min connections of both pools in parallel. A random delay of
+    up to settings.pool_warmup_jitter seconds first keeps several workers
+    booting together from hitting the listener at once. Failures are
+    logged, not raised; the pools then fill on demand.
+    """
+    await asyncio.sleep(random.uniform(0, settings.pool_warmup_jitter))
+    start = time.perf_counter()
+    sync_pool = get_pool()
+    async_pool = get_async_pool()
+    results = await asyncio.gather(
+        *(asyncio.to_thread(connect_oracledb) for _ in range(sync_pool.min)),
+        *(acquire_async() for _ in range(async_pool.min)),
+        return_exceptions=True
+    )
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    for conn in results:
+        if isinstance(conn, oracledb.AsyncConnection):
+            await conn.close()
+        elif isinstance(conn, oracledb.Connection):
+            conn.close()
+    if failures:
+        logger.error(f"Pool warm-up opened {len(results) - len(failures)} of {len(results)} connections: {failures[0]}")
+    else:
+        logger.info(f"Pool warm-up opened {len(results)} connections in {time.perf_counter() - start:.2f}s")
+
+async def close_pools(drain_timeout: float = None):
+    """
+    Close both pools once their busy connections are returned, waiting up
+    to drain_timeout (default settings.pool_drain_timeout) seconds before
+    closing them regardless.
+    """
+    global _pool, _async_pool, _async_pool_loop
+    deadline = time.monotonic() + (settings.pool_drain_timeout if drain_timeout is None else drain_timeout)
+    pools = [p for p in (_pool, _async_pool) if p is not None]
+    while any(p.busy for p in pools) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+
+    if _pool is not None:
+        busy = _pool.busy
+        await asyncio.to_thread(_pool.close, True)
+        _pool = None
+        logger.info(f"Sync pool closed ({busy} connections still busy)")
+    if _async_pool is not None:
+        busy = _async_pool.busy
+        await _async_pool.close(force=True)
+        _async_pool = None
+        _async_pool_loop = None
+        logger.info(f"Async pool closed ({busy} connections still busy)")
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(f for f in list(_retiring_pools) if f.get_loop() is loop))
 
 if __name__ == "__main__":
     try:
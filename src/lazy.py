@@ -0,0 +1,32 @@
+"""
+Deferred imports for heavy optional modules.
+
+lazy_import("PIL.Image") returns a module object right away but only
+executes the module on first attribute access, so importing the service
+layer or the Streamlit app does not pay for Pillow, NumPy, OpenCV,
+MoviePy or pandas until they are used.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+# Modules that must never be imported eagerly on the API or app startup path.
+# The PIL package itself is tiny; PIL.Image is what loads the imaging core.
+HEAVY_MODULES = ("PIL.Image", "numpy", "cv2", "moviepy", "pandas")
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return name as a lazily loaded module (or the module itself if it is loaded already)."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,84 @@
+"""
+HTTP conditional request helpers (RFC 9110 validators) for the object endpoints
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+import hashlib
+import json
+
+
+def content_etag(info: Dict) -> str:
+    """
+    Strong ETag of an object's bytes: its content hash plus version. Rows
+    stored before content hashing fall back to the update time.
+    """
+    validator = info.get("content_hash") or f"t{_timestamp(info.get('updated_at'))}"
+    return f'"{validator}-v{info.get("version_num")}"'
+
+
+def rendition_etag(info: Dict, key: str) -> str:
+    """Strong ETag of a derived rendition: the source's validator plus the rendition key (which holds the version)."""
+    validator = info.get("content_hash") or f"t{_timestamp(info.get('updated_at'))}"
+    return f'"{validator}-{hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]}"'
+
+
+def metadata_etag(payload: Dict) -> str:
+    """Strong ETag of a metadata response, which also covers tags and descriptions."""
+    body = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _timestamp(value: Optional[datetime]) -> int:
+    if value is None:
+        return 0
+    return int(_as_utc(value).timestamp() * 1_000_000)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Oracle TIMESTAMP columns come back naive; the database runs in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def last_modified(value: Optional[datetime]) -> Optional[str]:
+    return format_datetime(_as_utc(value), usegmt=True) if value is not None else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(headers, etag: str, modified: Optional[datetime] = None) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified. If-None-Match takes
+    precedence; If-Modified-Since is only consulted without it.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if not if_modified_since or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return _as_utc(modified).replace(microsecond=0) <= since
+
+
+def range_applies(headers, etag: str) -> bool:
+    """
+    If-Range: serve the requested range only while the representation is
+    unchanged. Dates are not strong validators here, so they never match.
+    """
+    if_range = headers.get("if-range")
+    return not if_range or if_range.strip() == etag
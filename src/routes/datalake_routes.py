@@ -1,39 +1,140 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Body, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
 import os
 import mimetypes
 import base64
+import json
+import uuid
 from datetime import datetime
-from src.services.oralake import add_object, get_object, query_by_tag
+from typing import Dict, List, Optional
+from src.services.oralake import (
+    LIST_PAGE_SIZE, add_object, add_objects_many, decode_cursor, iter_object
+)
+from src.services import ingest, oralake_async, uploads
+from src.services.image_renditions import RenditionParams, get_rendition, rendition_flights
+from src.services.object_cache import object_cache
+from src.services.single_flight import object_flights
+from src.routes.conditional import (
+    content_etag, last_modified, metadata_etag, not_modified, range_applies, rendition_etag
+)
+from src.routes.ranges import (
+    RangeNotSatisfiable, multipart_headers, multipart_length, parse_range
+)
 
 router = APIRouter(prefix="/datalake", tags=["Data Lake"])
 
+# Bare object_type values used across the repo that are not MIME types
+TYPE_ALIASES = {
+    "JSON": "application/json",
+    "CSV": "text/csv",
+    "TEXT": "text/plain",
+}
+
+
+def _media_type(info: Dict) -> str:
+    """Best-effort Content-Type from the object type and MediaStorage's schema_hint."""
+    obj_type = info.get("object_type") or ""
+    if "/" in obj_type:
+        return obj_type
+    if obj_type.upper() in TYPE_ALIASES:
+        return TYPE_ALIASES[obj_type.upper()]
+
+    try:
+        hint = json.loads(info.get("schema_hint") or "{}")
+    except ValueError:
+        hint = {}
+    if not isinstance(hint, dict):
+        hint = {}
+
+    # Compressed images are always re-encoded as JPEG by MediaStorage
+    fmt = "jpeg" if hint.get("media_type") == "image" and hint.get("compressed") else hint.get("format")
+    if fmt:
+        guessed = mimetypes.guess_type(f"object.{str(fmt).lower()}")[0]
+        if guessed:
+            return guessed
+    return "application/octet-stream"
+
+
+def _filename(info: Dict, media_type: str) -> str:
+    ext = mimetypes.guess_extension(media_type) or ".bin"
+    return f"{info.get('object_name') or 'object_' + str(info['object_id'])}{ext}"
+
+
+def _encode_object(object_id: int) -> Optional[str]:
+    """
+    Base64-encode an object chunk by chunk, so the raw BLOB is never
+    held in memory alongside its encoded form.
+    """
+    chunks = iter_object(object_id)
+    if chunks is None:
+        return None
+
+    encoded = []
+    carry = b""
+    with chunks:
+        for chunk in chunks:
+            data = carry + chunk
+            # Only encode whole 3-byte groups until the last chunk
+            cut = len(data) - len(data) % 3
+            encoded.append(base64.b64encode(data[:cut]).decode("utf-8"))
+            carry = data[cut:]
+    encoded.append(base64.b64encode(carry).decode("utf-8"))
+    return "".join(encoded)
+
 # ------------------------------
 # 1️⃣ Upload Object (with Version & Timestamp)
 # ------------------------------
-@router.post("/upload")
-async def upload_file(
-    file: UploadFile = File(...),
-    tags: str = Form(""),
-    description: str = Form(None),
-    schema_hint: str = Form(None)
-):
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "tags": {"type": "string"},
+                        "description": {"type": "string"},
+                        "schema_hint": {"type": "string"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/upload", openapi_extra=UPLOAD_FORM_SCHEMA)
+async def upload_file(request: Request):
     """
     Upload a file to the Oracle Data Lake.
     The backend handles versioning and timestamp generation.
+    The multipart body is read incrementally: the file is hashed as it
+    arrives and spilled to disk past a small in-memory threshold.
     """
     try:
-        name, ext = os.path.splitext(file.filename)
-        obj_type = mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
-        content = await file.read()
+        form = await ingest.read_upload_form(request.headers.get("content-type", ""), request.stream())
+    except ingest.InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        file = form.file
+        name, ext = os.path.splitext(form.filename)
+        obj_type = mimetypes.guess_type(form.filename)[0] or "application/octet-stream"
+        size = file.size
 
         # Backend returns dict including version & timestamp
-        result = add_object(
+        result = await oralake_async.add_object(
             name=name,
             obj_type=obj_type,
-            content=content,
-            tags=tags,
-            description=description,
-            schema_hint=schema_hint
+            content=file,
+            tags=form.fields.get("tags", ""),
+            description=form.fields.get("description"),
+            schema_hint=form.fields.get("schema_hint")
         )
 
         # Handle both dict and int (backward compatible)
@@ -41,9 +142,9 @@ async def upload_file(
             return {
                 "status": "success",
                 "object_id": result.get("object_id"),
-                "filename": file.filename,
+                "filename": form.filename,
                 "type": obj_type,
-                "size_kb": round(len(content) / 1024, 2),
+                "size_kb": round(size / 1024, 2),
                 "version": result.get("version"),
                 "timestamp": result.get("timestamp"),
             }
@@ -53,9 +154,9 @@ async def upload_file(
             return {
                 "status": "success",
                 "object_id": result,
-                "filename": file.filename,
+                "filename": form.filename,
                 "type": obj_type,
-                "size_kb": round(len(content) / 1024, 2),
+                "size_kb": round(size / 1024, 2),
                 "version": None,
                 "timestamp": datetime.now().isoformat(),
             }
@@ -65,6 +166,8 @@ async def upload_file(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await form.aclose()
 
 
 # ------------------------------
@@ -76,11 +179,10 @@ def get_object_by_id(object_id: int):
     Retrieve an object by its ID and return Base64 encoded content.
     """
     try:
-        content = get_object(object_id)
-        if not content:
+        encoded_content = _encode_object(object_id)
+        if encoded_content is None:
             raise HTTPException(status_code=404, detail="Object not found")
 
-        encoded_content = base64.b64encode(content).decode("utf-8")
         return {
             "status": "success",
             "object_id": object_id,
@@ -88,6 +190,8 @@ def get_object_by_id(object_id: int):
             "type": "application/octet-stream",
             "content": encoded_content,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -101,7 +205,7 @@ async def query_objects(tag: str):
     Fetch all objects having the given tag.
     """
     try:
-        results = query_by_tag(tag)
+        results = await oralake_async.query_by_tag(tag)
         if results and isinstance(results, list) and len(results) > 0:
             return {"status": "success", "count": len(results), "objects": results}
         else:
@@ -119,12 +223,10 @@ def view_object(object_id: int):
     Fetch object details for the viewer — includes Base64 content, type, version, timestamp.
     """
     try:
-        data = get_object(object_id)
-        if not data:
+        encoded_content = _encode_object(object_id)
+        if encoded_content is None:
             raise HTTPException(status_code=404, detail="Object not found")
 
-        encoded_content = base64.b64encode(data).decode("utf-8")
-
         return {
             "status": "success",
             "object_id": object_id,
@@ -135,5 +237,416 @@ def view_object(object_id: int):
             "content": encoded_content,
         }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 5️⃣ Batch Upload (array DML, one commit per batch)
+# ------------------------------
+@router.post("/upload-batch")
+def upload_batch(
+    files: List[UploadFile] = File(...),
+    tags: str = Form(""),
+    description: str = Form(None),
+    schema_hint: str = Form(None)
+):
+    """
+    Upload several files in one request.
+    Objects are inserted with array DML; per-file failures are reported
+    without rejecting the rest of the batch.
+    """
+    try:
+        records = []
+        for file in files:
+            name, ext = os.path.splitext(file.filename)
+            records.append({
+                "name": name,
+                "obj_type": mimetypes.guess_type(file.filename)[0] or "application/octet-stream",
+                "content": file.file,
+                "tags": tags,
+                "description": description,
+                "schema_hint": schema_hint,
+            })
+
+        result = add_objects_many(records)
+        uploaded = [
+            {"object_id": object_id, "filename": file.filename, "type": record["obj_type"]}
+            for file, record, object_id in zip(files, records, result["object_ids"])
+            if object_id is not None
+        ]
+        failed = [
+            {"filename": files[error["index"]].filename, "error": error["error"]}
+            for error in result["errors"]
+        ]
+        return {
+            "status": "success" if not failed else ("partial" if uploaded else "failure"),
+            "count": len(uploaded),
+            "objects": uploaded,
+            "errors": failed,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 6️⃣ List Objects (metadata only, keyset pagination)
+# ------------------------------
+@router.get("/objects")
+async def list_objects(
+    tag: Optional[str] = None,
+    obj_type: Optional[str] = Query(None, alias="type"),
+    created_after: Optional[datetime] = None,
+    min_size: Optional[int] = None,
+    limit: int = LIST_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """
+    Page through object metadata without reading any content.
+    Pass the returned next_cursor back as ?cursor= to get the next page.
+    """
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        page = await oralake_async.list_objects(
+            tag=tag,
+            obj_type=obj_type,
+            created_after=created_after,
+            min_size=min_size,
+            limit=limit,
+            after_id=after_id,
+        )
+        return {"status": "success", "count": len(page["objects"]), **page}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 7️⃣ Object Metadata (no content)
+# ------------------------------
+def _validator_headers(etag: str, info: Dict) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    modified = last_modified(info.get("updated_at"))
+    if modified:
+        headers["Last-Modified"] = modified
+    return headers
+
+
+@router.get("/objects/{object_id}")
+async def get_object_metadata(object_id: int, request: Request):
+    """
+    Lightweight JSON description of an object; the BLOB is never read.
+    Carries an ETag and answers If-None-Match/If-Modified-Since with 304.
+    """
+    try:
+        info = await oralake_async.get_object_info(object_id)
+        if info is None:
+            raise HTTPException(status_code=404, detail="Object not found")
+
+        media_type = _media_type(info)
+        payload = {
+            "status": "success",
+            **info,
+            "content_type": media_type,
+            "filename": _filename(info, media_type),
+            "content_url": f"{router.prefix}/objects/{object_id}/content",
+            "etag": content_etag(info),
+        }
+        headers = _validator_headers(metadata_etag(payload), info)
+        if not_modified(request.headers, headers["ETag"], info.get("updated_at")):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(jsonable_encoder(payload), headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 8️⃣ Object Content (raw streaming download, supports Range)
+# ------------------------------
+async def _stream_range(stream, start: int, end: int):
+    try:
+        async for chunk in stream.read_range(start, end - start + 1):
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+async def _stream_ranges(stream, ranges, boundary: str, media_type: str, size: int):
+    try:
+        for start, end in ranges:
+            yield multipart_headers(boundary, media_type, start, end, size)
+            async for chunk in stream.read_range(start, end - start + 1):
+                yield chunk
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode("ascii")
+    finally:
+        await stream.aclose()
+
+
+@router.get("/objects/{object_id}/content")
+async def get_object_content(object_id: int, request: Request):
+    """
+    Stream the raw object bytes straight from the LOB, chunk by chunk.
+    Range requests only read the requested LOB offsets and answer with
+    206 Partial Content (multipart/byteranges for several ranges), all
+    through one locator. The ETag, Last-Modified, length and media type
+    come from the statement that selects the locator, so they always match
+    the body. Conditional requests matching them get 304 Not Modified
+    after that single lookup, without any LOB read.
+    """
+    try:
+        stream = await oralake_async.iter_object(object_id)
+        if stream is None:
+            raise HTTPException(status_code=404, detail="Object not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        info = stream.info
+        etag = content_etag(info)
+        if not_modified(request.headers, etag, info.get("updated_at")):
+            await stream.aclose()
+            return Response(status_code=304, headers=_validator_headers(etag, info))
+
+        size = info["size_bytes"] or 0
+        media_type = _media_type(info)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f'inline; filename="{_filename(info, media_type)}"',
+            **_validator_headers(etag, info),
+        }
+
+        try:
+            range_header = request.headers.get("range") if range_applies(request.headers, etag) else None
+            ranges = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            await stream.aclose()
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+
+        # The background close releases the connection even if the body is never iterated
+        background = BackgroundTask(stream.aclose)
+        if ranges is None:
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(stream, media_type=media_type, headers=headers, background=background)
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers["Content-Length"] = str(end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return StreamingResponse(
+                _stream_range(stream, start, end), status_code=206,
+                media_type=media_type, headers=headers, background=background,
+            )
+
+        boundary = uuid.uuid4().hex
+        headers["Content-Length"] = str(multipart_length(boundary, media_type, ranges, size))
+        return StreamingResponse(
+            _stream_ranges(stream, ranges, boundary, media_type, size),
+            status_code=206,
+            media_type=f"multipart/byteranges; boundary={boundary}",
+            headers=headers,
+            background=background,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await stream.aclose()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 9️⃣ Object Cache Statistics
+# ------------------------------
+@router.get("/cache")
+async def cache_stats():
+    """
+    Hit/miss/eviction counters of the in-process object content cache,
+    plus how many reads were served by sharing another request's fetch
+    and how many image renditions were generated or shared.
+    """
+    return {
+        **object_cache.stats(),
+        "single_flight": object_flights.stats(),
+        "renditions": rendition_flights.stats(),
+    }
+
+
+# ------------------------------
+# 🔟 Resumable Multipart Uploads
+# ------------------------------
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: Optional[str] = None
+
+
+@router.post("/uploads")
+def create_upload(
+    filename: str = Form(...),
+    tags: str = Form(""),
+    description: str = Form(None),
+    schema_hint: str = Form(None)
+):
+    """
+    Start a multipart upload. Send the parts with PUT .../parts/{n}, in any
+    order or in parallel, then assemble them with POST .../complete.
+    """
+    try:
+        name, ext = os.path.splitext(filename)
+        obj_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        upload_id = uploads.create_upload(name, obj_type, tags, description, schema_hint)
+        return {
+            "status": "success",
+            "upload_id": upload_id,
+            "filename": filename,
+            "type": obj_type,
+            "max_part_number": uploads.MAX_PART_NUMBER,
+            "part_url": f"{router.prefix}/uploads/{upload_id}/parts/{{part_number}}",
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    """
+    Parts received so far, so an interrupted client can resume with the missing ones.
+    """
+    try:
+        return {"status": "success", **uploads.get_upload(upload_id)}
+    except uploads.UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/uploads/{upload_id}/parts/{part_number}")
+async def upload_part(upload_id: str, part_number: int, request: Request):
+    """
+    Store one part from the raw request body, streamed to the staging area.
+    Sending a part number again replaces that part.
+    """
+    try:
+        part = await uploads.write_part(upload_id, part_number, request.stream())
+        return {"status": "success", **part}
+    except uploads.UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except uploads.InvalidPart as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/complete")
+def complete_upload(upload_id: str, parts: Optional[List[CompletedPart]] = Body(None, embed=True)):
+    """
+    Assemble the parts into a new object. parts lists the part numbers (and
+    optionally etags) to use in ascending order; without it every received
+    part is used. Part files are streamed into the database, never loaded whole.
+    """
+    try:
+        session, reader = uploads.open_parts(
+            upload_id, [part.model_dump() for part in parts] if parts is not None else None
+        )
+        try:
+            object_id = add_object(
+                name=session["name"],
+                obj_type=session["obj_type"],
+                content=reader,
+                tags=session["tags"],
+                description=session["description"],
+                schema_hint=session["schema_hint"]
+            )
+        finally:
+            reader.close()
+        uploads.abort_upload(upload_id)
+        return {
+            "status": "success",
+            "object_id": object_id,
+            "type": session["obj_type"],
+            "parts": len(session["parts"]) if parts is None else len(parts),
+        }
+    except uploads.UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except uploads.InvalidPart as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload(upload_id: str):
+    """
+    Discard an upload session and its staged parts.
+    """
+    try:
+        uploads.abort_upload(upload_id)
+        return {"status": "success", "upload_id": upload_id}
+    except uploads.UploadNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ------------------------------
+# 1️⃣1️⃣ Image Renditions (generated on demand, stored as derived objects)
+# ------------------------------
+@router.get("/images/{object_id}")
+async def get_image_rendition(
+    object_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, description="Width in pixels"),
+    h: Optional[int] = Query(None, description="Height in pixels"),
+    fit: str = Query("contain", description="contain | cover | fill"),
+    fmt: str = Query("jpeg", description="jpeg | webp | png"),
+    q: Optional[int] = Query(None, description="Quality 1-100 for jpeg and webp"),
+):
+    """
+    Resized/re-encoded image. The first request for a version and parameter
+    set renders it and stores it as a derived object; later ones serve the
+    stored bytes. A new version of the source gets new renditions.
+    """
+    try:
+        try:
+            params = RenditionParams.parse(w, h, fit, fmt, q)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        info = await oralake_async.get_object_info(object_id)
+        if info is None:
+            raise HTTPException(status_code=404, detail="Object not found")
+        if (info.get("object_type") or "").upper() != "IMAGE":
+            raise HTTPException(status_code=415, detail="Object is not an image")
+
+        key = params.key(info["version_num"])
+        etag = rendition_etag(info, key)
+        headers = _validator_headers(etag, info)
+        if not_modified(request.headers, etag, info.get("updated_at")):
+            return Response(status_code=304, headers=headers)
+
+        try:
+            image_bytes, source = await get_rendition(object_id, info["version_num"], params)
+        except OSError:
+            # Pillow could not decode the stored bytes
+            raise HTTPException(status_code=415, detail="Object is not a decodable image")
+        if image_bytes is None:
+            raise HTTPException(status_code=404, detail="Object not found")
+
+        headers["X-Rendition-Cache"] = source
+        return Response(content=image_bytes, media_type=params.media_type, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,79 @@
+"""
+HTTP Range request helpers (RFC 9110 byte ranges) for the object content endpoint
+"""
+
+from typing import List, Optional, Tuple
+
+# Requests asking for more ranges than this are answered with the full object
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(ValueError):
+    """None of the requested ranges overlap the object."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse a Range header into inclusive (start, end) byte offsets.
+
+    Returns None when the header is absent, malformed or should be ignored,
+    in which case the whole object is served. Raises RangeNotSatisfiable if
+    the header is valid but no range overlaps the object.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if len(parts) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for part in parts:
+        first, sep, last = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if first == "":
+                # Suffix range: the last N bytes
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(0, size - suffix), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable(header)
+    return ranges
+
+
+def multipart_headers(boundary: str, media_type: str, start: int, end: int, size: int) -> bytes:
+    """Headers that open one part of a multipart/byteranges body."""
+    return (
+        f"--{boundary}\r\n"
+        f"Content-Type: {media_type}\r\n"
+        f"Content-Range: bytes {start}-{end}/{size}\r\n"
+        "\r\n"
+    ).encode("ascii")
+
+
+def multipart_length(boundary: str, media_type: str, ranges: List[Tuple[int, int]], size: int) -> int:
+    """Exact Content-Length of a multipart/byteranges body for the given ranges."""
+    total = 0
+    for start, end in ranges:
+        total += len(multipart_headers(boundary, media_type, start, end, size))
+        total += end - start + 1 + len(b"\r\n")
+    return total + len(f"--{boundary}--\r\n")
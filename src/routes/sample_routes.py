@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from src.database import connect_oracledb
+from src.database import connect_oracledb, get_pool_stats
 from oracledb.exceptions import DatabaseError
 
 router = APIRouter(prefix="/oracle", tags=["Oracle"])
@@ -19,3 +19,12 @@ async def test_connection():
         return {"error": f"Database error: {e}"}
     except Exception as e:
         return {"error": str(e)}
+
+
+@router.get("/pool")
+async def pool_stats():
+    """
+    Report connection pool occupancy (opened/busy) together with acquire
+    wait-time percentiles, timeouts and failures.
+    """
+    return get_pool_stats()
@@ -0,0 +1,184 @@
+"""
+Compression codecs for stored object content.
+
+zlib and lzma come with Python; zstd is used when the optional zstandard
+package is installed. Codecs are chosen per object type from
+settings.compression_by_type (falling back to settings.compression), where
+"auto" tries every available codec on a sample and keeps the smallest
+result. Content that is already compressed, such as JPEG or MP4, is stored
+as-is.
+"""
+
+from src.config import settings
+from typing import Iterable, Iterator, List, Optional, Tuple
+import itertools
+import lzma
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB_LEVEL = 6
+LZMA_PRESET = 3
+ZSTD_LEVEL = 3
+# Bytes compressed with each candidate codec when "auto" picks a winner
+AUTO_SAMPLE_BYTES = 256 * 1024
+# A codec must shrink the sample to at most this fraction to be used at all
+MAX_RATIO = 0.9
+# Upper bound on decompressed bytes produced per step when streaming
+DECODE_STEP = 1024 * 1024
+
+# Leading bytes of formats that are already compressed
+_COMPRESSED_SIGNATURES = (
+    b"\xff\xd8\xff",          # JPEG
+    b"\x89PNG\r\n\x1a\n",     # PNG
+    b"GIF8",                  # GIF
+    b"RIFF",                  # WebP / AVI
+    b"\x1a\x45\xdf\xa3",      # Matroska / WebM
+    b"PK\x03\x04",            # ZIP, docx, xlsx
+    b"\x1f\x8b",              # gzip
+    b"\xfd7zXZ\x00",          # xz
+    b"\x28\xb5\x2f\xfd",      # zstd
+    b"BZh",                   # bzip2
+    b"%PDF",
+)
+
+
+def available_codecs() -> List[str]:
+    codecs = ["zlib", "lzma"]
+    if zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+
+def is_precompressed(head: bytes) -> bool:
+    if head[4:8] == b"ftyp":  # MP4 / MOV / HEIC
+        return True
+    return head.startswith(_COMPRESSED_SIGNATURES)
+
+
+def compressor(codec: str):
+    """Incremental compressor exposing compress(data) and flush()."""
+    if codec == "zlib":
+        return zlib.compressobj(ZLIB_LEVEL)
+    if codec == "lzma":
+        return lzma.LZMACompressor(preset=LZMA_PRESET)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    comp = compressor(codec)
+    return comp.compress(data) + comp.flush()
+
+
+class StreamDecoder:
+    """Incremental decompressor producing output in steps of at most DECODE_STEP bytes."""
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        if codec == "zlib":
+            self._decomp = zlib.decompressobj()
+        elif codec == "lzma":
+            self._decomp = lzma.LZMADecompressor()
+        elif codec == "zstd" and zstandard is not None:
+            self._decomp = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise ValueError(f"Unsupported compression codec: {codec}")
+
+    def feed(self, chunk: bytes) -> Iterator[bytes]:
+        if self.codec == "zlib":
+            while chunk:
+                yield self._decomp.decompress(chunk, DECODE_STEP)
+                chunk = self._decomp.unconsumed_tail
+        elif self.codec == "lzma":
+            yield self._decomp.decompress(chunk, DECODE_STEP)
+            while not self._decomp.needs_input and not self._decomp.eof:
+                yield self._decomp.decompress(b"", DECODE_STEP)
+        else:
+            yield self._decomp.decompress(chunk)
+
+    def finish(self) -> Iterator[bytes]:
+        if self.codec == "zlib":
+            yield self._decomp.flush()
+
+
+class ByteWindow:
+    """Cuts the byte range [offset, offset + length) out of a sequence of pieces."""
+
+    def __init__(self, offset: int = 0, length: Optional[int] = None):
+        self.offset = offset
+        self.end = None if length is None else offset + length
+        self.position = 0
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None and self.position >= self.end
+
+    def take(self, data: bytes) -> bytes:
+        start, self.position = self.position, self.position + len(data)
+        lo = max(0, self.offset - start)
+        hi = len(data) if self.end is None else max(lo, min(len(data), self.end - start))
+        return data[lo:hi]
+
+
+def decode_stream(chunks: Iterable[bytes], codec: str,
+                  offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Decompress an iterable of stored chunks, yielding only the logical byte
+    range [offset, offset + length). Compressed streams cannot seek, so the
+    bytes before offset are decoded and discarded. The source iterable is
+    closed as soon as the range has been produced.
+    """
+    decoder, window = StreamDecoder(codec), ByteWindow(offset, length)
+    try:
+        for chunk in itertools.chain(chunks, [None]):
+            for data in decoder.finish() if chunk is None else decoder.feed(chunk):
+                piece = window.take(data)
+                if piece:
+                    yield piece
+                if window.done:
+                    return
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def decode(codec: Optional[str], data: bytes) -> bytes:
+    if not codec or data is None:
+        return data
+    return b"".join(decode_stream([data], codec))
+
+
+def codec_mode(obj_type: Optional[str], compression: Optional[str] = None) -> str:
+    """Resolve the configured mode ("none", "auto" or a codec name) for an object type."""
+    if compression:
+        return compression
+    return settings.compression_by_type.get((obj_type or "").upper(), settings.compression)
+
+
+def choose_codec(mode: str, sample: bytes) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Pick the codec for content starting with sample. Returns (codec,
+    compressed sample); codec is None when the content should be stored
+    uncompressed. When sample is the whole content, the compressed sample
+    can be stored directly.
+    """
+    if not mode or mode == "none" or not sample or is_precompressed(sample):
+        return None, None
+
+    candidates = available_codecs() if mode == "auto" else [mode]
+    best_codec, best = None, None
+    for codec in candidates:
+        if codec == "zstd" and zstandard is None:
+            continue
+        encoded = compress(codec, sample)
+        if best is None or len(encoded) < len(best):
+            best_codec, best = codec, encoded
+
+    if best is None or len(best) > len(sample) * MAX_RATIO:
+        return None, None
+    return best_codec, best
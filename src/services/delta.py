@@ -0,0 +1,143 @@
+"""
+Binary deltas between object versions.
+
+A delta is a header (magic, target length) followed by COPY instructions,
+which reference a byte range of the base, and INSERT instructions, which
+carry literal bytes. Encoding trims the common prefix and suffix, then
+matches the remaining middle line by line, which suits incrementally
+edited JSON/CSV. Binary payloads still round-trip; they just rarely
+produce a delta worth keeping.
+"""
+
+from difflib import SequenceMatcher
+import struct
+
+MAGIC = b"OLD1"
+
+_HEADER = struct.Struct(">4sQ")
+_COPY = struct.Struct(">BQQ")
+_INSERT = struct.Struct(">BQ")
+_OP_COPY = 1
+_OP_INSERT = 2
+
+
+def _common_prefix(a: memoryview, b: memoryview) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: memoryview, b: memoryview) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class _Writer:
+    """Collects instructions, merging adjacent copies and inserts."""
+
+    def __init__(self, target_length: int):
+        self.parts = [_HEADER.pack(MAGIC, target_length)]
+        self.copy = None
+        self.literal = bytearray()
+
+    def add_copy(self, offset: int, length: int):
+        if length <= 0:
+            return
+        self._flush_literal()
+        if self.copy and self.copy[0] + self.copy[1] == offset:
+            self.copy[1] += length
+        else:
+            self._flush_copy()
+            self.copy = [offset, length]
+
+    def add_insert(self, data: bytes):
+        if data:
+            self._flush_copy()
+            self.literal += data
+
+    def _flush_copy(self):
+        if self.copy:
+            self.parts.append(_COPY.pack(_OP_COPY, *self.copy))
+            self.copy = None
+
+    def _flush_literal(self):
+        if self.literal:
+            self.parts.append(_INSERT.pack(_OP_INSERT, len(self.literal)))
+            self.parts.append(bytes(self.literal))
+            self.literal = bytearray()
+
+    def getvalue(self) -> bytes:
+        self._flush_copy()
+        self._flush_literal()
+        return b"".join(self.parts)
+
+
+def encode_delta(base: bytes, target: bytes) -> bytes:
+    """Return a delta that turns base into target."""
+    base_view, target_view = memoryview(base), memoryview(target)
+    prefix = _common_prefix(base_view, target_view)
+    suffix = _common_suffix(base_view[prefix:], target_view[prefix:])
+
+    writer = _Writer(len(target))
+    writer.add_copy(0, prefix)
+
+    base_middle = bytes(base_view[prefix:len(base) - suffix])
+    target_middle = bytes(target_view[prefix:len(target) - suffix])
+    if base_middle and target_middle:
+        base_lines = base_middle.splitlines(keepends=True)
+        target_lines = target_middle.splitlines(keepends=True)
+        offsets = [prefix]
+        for line in base_lines:
+            offsets.append(offsets[-1] + len(line))
+
+        matcher = SequenceMatcher(None, base_lines, target_lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                writer.add_copy(offsets[i1], offsets[i2] - offsets[i1])
+            else:
+                writer.add_insert(b"".join(target_lines[j1:j2]))
+    else:
+        writer.add_insert(target_middle)
+
+    writer.add_copy(len(base) - suffix, suffix)
+    return writer.getvalue()
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild the target from base and a delta produced by encode_delta."""
+    magic, target_length = _HEADER.unpack_from(delta, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an OraLake delta")
+
+    out = bytearray()
+    position = _HEADER.size
+    while position < len(delta):
+        op = delta[position]
+        if op == _OP_COPY:
+            _, offset, length = _COPY.unpack_from(delta, position)
+            position += _COPY.size
+            if offset + length > len(base):
+                raise ValueError("Delta copies past the end of its base")
+            out += base[offset:offset + length]
+        elif op == _OP_INSERT:
+            _, length = _INSERT.unpack_from(delta, position)
+            position += _INSERT.size
+            out += delta[position:position + length]
+            position += length
+        else:
+            raise ValueError(f"Unknown delta instruction {op}")
+
+    if len(out) != target_length:
+        raise ValueError(f"Delta produced {len(out)} bytes, expected {target_length}")
+    return bytes(out)
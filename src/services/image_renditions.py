@@ -0,0 +1,115 @@
+"""
+On-demand image renditions, persisted as derived objects.
+
+The first request for object N at version V with parameters P renders
+the image and stores the result as an IMAGE object named "N@<key>". That
+object is linked in ora_lake_renditions under the key "v<V>/<P>", and
+later requests read it from there without touching the original. Because
+the key includes the version, a new version of the source never serves a
+stale rendition. The PL/SQL version operations delete a source's
+renditions of other versions as soon as it changes version, so they never
+linger in listings. A rendition is rendered from the version it is keyed
+by, even if the source has moved on since; it is then served but not
+stored. Concurrent requests for a
+rendition that is not stored yet share a single generation.
+"""
+
+from src import logger
+from src.services import oralake_async, version_control_async
+from src.services.imaging import render_image, run_image_task
+from src.services.oralake import add_derived_rendition
+from src.services.single_flight import SingleFlight
+from typing import NamedTuple, Optional, Tuple
+import asyncio
+import json
+
+FITS = ("contain", "cover", "fill")
+FORMATS = {"jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP", "png": "PNG"}
+MEDIA_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+MAX_DIMENSION = 4096
+DEFAULT_QUALITY = 80
+
+# Concurrent generation of the same (object_id, key)
+rendition_flights = SingleFlight()
+
+
+class RenditionParams(NamedTuple):
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+    format: str
+    quality: int
+
+    @classmethod
+    def parse(cls, width: Optional[int] = None, height: Optional[int] = None, fit: str = "contain",
+              fmt: str = "jpeg", quality: Optional[int] = None) -> "RenditionParams":
+        """Validate query parameters; raises ValueError on bad input."""
+        if width is None and height is None:
+            raise ValueError("At least one of w and h is required")
+        for value in (width, height):
+            if value is not None and not 1 <= value <= MAX_DIMENSION:
+                raise ValueError(f"w and h must be between 1 and {MAX_DIMENSION}")
+        if fit not in FITS:
+            raise ValueError(f"fit must be one of {', '.join(FITS)}")
+        if fmt.lower() not in FORMATS:
+            raise ValueError(f"fmt must be one of {', '.join(FORMATS)}")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError("q must be between 1 and 100")
+        output_format = FORMATS[fmt.lower()]
+        # PNG is lossless, so q would only split the cache
+        quality = 0 if output_format == "PNG" else quality or DEFAULT_QUALITY
+        return cls(width, height, fit, output_format, quality)
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    def key(self, version: int) -> str:
+        """Rendition name of these parameters for a source version, e.g. v3/300x200/cover/q80.webp"""
+        size = f"{self.width or ''}x{self.height or ''}"
+        return f"v{version}/{size}/{self.fit}/q{self.quality}.{self.format.lower()}"
+
+
+def _store(object_id: int, key: str, version: int, image_bytes: bytes, schema_hint: dict) -> Optional[int]:
+    return add_derived_rendition(object_id, version, key, {
+        "name": f"{object_id}@{key}",
+        "obj_type": "IMAGE",
+        "content": image_bytes,
+        "tags": "derived",
+        "description": f"Rendition {key} of image ID {object_id}",
+        "schema_hint": json.dumps({**schema_hint, "source_id": object_id, "rendition": key}),
+    })
+
+
+async def get_rendition(object_id: int, version: int, params: RenditionParams) -> Tuple[Optional[bytes], str]:
+    """
+    Bytes of the rendition of object_id at version, plus how they were
+    obtained: "hit" (stored earlier), "miss" (generated by this call) or
+    "shared" (generated by a concurrent call). Returns (None, "miss") if
+    the object no longer exists.
+    """
+    key = params.key(version)
+    derived_id = await oralake_async.find_rendition(object_id, key)
+    if derived_id is not None:
+        image_bytes = await oralake_async.get_object(derived_id)
+        if image_bytes is not None:
+            return image_bytes, "hit"
+
+    async def generate() -> Optional[bytes]:
+        # The source may have a newer version by now; render the one the key names
+        source = await version_control_async.get_version_content(object_id, version)
+        if source is None:
+            return None
+        image_bytes, schema_hint = await asyncio.to_thread(
+            run_image_task, render_image, source, params.width, params.height,
+            params.fit, params.format, params.quality
+        )
+        try:
+            await asyncio.to_thread(_store, object_id, key, version, image_bytes, schema_hint)
+        except Exception as e:
+            # The rendition is still served; the next request tries to store it again
+            logger.error(f"Error Occurred at get_rendition: could not store {key} of {object_id}: {e}")
+        return image_bytes
+
+    image_bytes, shared = await rendition_flights.do_async((object_id, key), generate)
+    return image_bytes, "shared" if shared else "miss"
@@ -0,0 +1,513 @@
+"""
+Pillow decode/resize/encode work for MediaStorage.
+
+The task functions are self-contained and pickle-friendly, so they run
+either on the calling thread or, with settings.image_workers > 0, in a pool
+of worker processes. In process mode a task receives a file path or the
+stored bytes and sends back only the encoded bytes. Resizing and encoding
+then no longer hold the parent's GIL, and image throughput scales with
+cores. At most settings.image_worker_queue_depth tasks are submitted at
+once; further callers block until a slot frees up. Workers are replaced
+after settings.image_worker_max_tasks tasks to bound leaks and
+fragmentation in long-lived processes.
+"""
+
+from src import logger
+from src.config import settings
+from src.lazy import lazy_import
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import io
+import multiprocessing
+import os
+import threading
+
+# Pillow and NumPy are loaded on first use, not when the service layer is imported
+Image = lazy_import("PIL.Image")
+np = lazy_import("numpy")
+
+# Adaptive encoding searches lossy quality in this range; SSIM is averaged over square blocks of this side
+ADAPTIVE_FORMATS = ('JPEG', 'WEBP', 'PNG')
+ADAPTIVE_QUALITY_RANGE = (20, 95)
+SSIM_BLOCK = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_pool_lock = threading.Lock()
+
+
+def _flatten(img):
+    """Composite transparent or palette images onto white for JPEG output."""
+    if img.mode not in ('RGBA', 'LA', 'P'):
+        return img
+    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+    rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+    return rgb_img
+
+
+def encode_image(
+    file_path: str,
+    compress: bool = True,
+    quality: int = 85,
+    max_dimension: Optional[int] = None
+) -> Tuple[bytes, Dict]:
+    """Decode, optionally resize and re-encode an image file. Returns the bytes and their schema_hint fields."""
+    with Image.open(file_path) as img:
+        format_name = img.format
+        original_size = img.size
+        mode = img.mode
+
+        if max_dimension and max(img.size) > max_dimension:
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            logger.info(f"Resized image from {original_size} to {img.size}")
+
+        if compress:
+            img = _flatten(img)
+
+        buffer = io.BytesIO()
+        save_format = 'JPEG' if compress else format_name
+        save_kwargs = {'quality': quality, 'optimize': True} if compress else {}
+
+        img.save(buffer, format=save_format, **save_kwargs)
+        image_bytes = buffer.getvalue()
+
+    image_info = {
+        'media_type': 'image',
+        'format': format_name,
+        'original_size': original_size,
+        'current_size': list(img.size),
+        'mode': mode,
+        'compressed': compress,
+        'quality': quality if compress else None,
+        'file_size_bytes': len(image_bytes)
+    }
+    return image_bytes, image_info
+
+
+def convert_bytes(image_bytes: bytes, output_format: str = 'JPEG', quality: int = 85) -> bytes:
+    """Re-encode stored image bytes in another format."""
+    output_format = output_format.upper()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if output_format == 'JPEG':
+            img = _flatten(img)
+        buffer = io.BytesIO()
+        save_kwargs = {'quality': quality} if output_format in ['JPEG', 'WEBP'] else {}
+        img.save(buffer, format=output_format, **save_kwargs)
+        return buffer.getvalue()
+
+
+def make_thumbnail(image_bytes: bytes, size: Tuple[int, int] = (150, 150)) -> bytes:
+    """
+    JPEG thumbnail of stored image bytes that fits within size, flattening
+    any transparency. Image.thumbnail() on the unloaded image already lets
+    libjpeg decode JPEGs at a reduced DCT scale.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        img = _flatten(img)
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=85, optimize=True)
+        return buffer.getvalue()
+
+
+def probe_image(header: bytes) -> Optional[Dict]:
+    """
+    Format, size and mode read from the first bytes of an image without
+    decoding any pixels, or None if header is too short to tell.
+    """
+    try:
+        with Image.open(io.BytesIO(header)) as img:
+            return {'format': img.format, 'size': img.size, 'mode': img.mode}
+    except OSError:
+        return None
+
+
+def _fit(size: Tuple[int, int], box: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """Largest size with size's aspect ratio that fits in box, never upscaling."""
+    if not box:
+        return size
+    scale = min(box[0] / size[0], box[1] / size[1], 1.0)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def _rendition_box(spec: Dict) -> Optional[Tuple[int, int]]:
+    if spec.get('size'):
+        return tuple(spec['size'])
+    if spec.get('max_dimension'):
+        return spec['max_dimension'], spec['max_dimension']
+    return None
+
+
+def _encode(img, output_format: str, quality: int) -> bytes:
+    if output_format == 'JPEG':
+        img = _flatten(img)
+    buffer = io.BytesIO()
+    save_kwargs = {'JPEG': {'quality': quality, 'optimize': True}, 'WEBP': {'quality': quality}}
+    img.save(buffer, format=output_format, **save_kwargs.get(output_format, {}))
+    return buffer.getvalue()
+
+
+def _rendition_info(img, source_info: Dict, output_format: str, quality: int, image_bytes: bytes) -> Dict:
+    return {
+        'media_type': 'image',
+        'format': output_format,
+        'source_format': source_info['format'],
+        'original_size': source_info['original_size'],
+        'current_size': list(img.size),
+        'mode': img.mode,
+        'quality': quality if output_format in ('JPEG', 'WEBP') else None,
+        'file_size_bytes': len(image_bytes),
+    }
+
+
+def _encode_rendition(img, source_info: Dict, spec: Dict, target: Tuple[int, int]) -> Tuple[bytes, Dict]:
+    if img.size != target:
+        # reducing_gap shrinks by an integer factor first, then LANCZOS finishes the job
+        img = img.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    output_format = spec.get('format', 'JPEG').upper()
+    quality = spec.get('quality', 85)
+    image_bytes = _encode(img, output_format, quality)
+    return image_bytes, {**_rendition_info(img, source_info, output_format, quality, image_bytes),
+                         'rendition': spec['name']}
+
+
+def render_renditions(file_path: str, renditions: List[Dict]) -> Tuple[Dict, List[Tuple[bytes, Dict]]]:
+    """
+    Decode an image file once and derive every rendition from it. Each spec
+    has a name and optionally size (w, h) or max_dimension to fit within,
+    format (JPEG) and quality (85). JPEG sources are decoded at the smallest
+    DCT scale (1/2, 1/4 or 1/8) that still covers the largest rendition.
+    Renditions are encoded on parallel threads, as Pillow releases the GIL
+    while resampling and encoding. Returns the source's schema_hint fields
+    and (bytes, schema_hint fields) per rendition, in order.
+    """
+    with Image.open(file_path) as img:
+        source_info = {
+            'media_type': 'image',
+            'format': img.format,
+            'original_size': img.size,
+            'current_size': list(img.size),
+            'mode': img.mode,
+            'compressed': False,
+            'quality': None,
+            'file_size_bytes': os.path.getsize(file_path),
+        }
+        targets = [_fit(img.size, _rendition_box(spec)) for spec in renditions]
+        if targets:
+            img.draft(None, (max(w for w, _ in targets), max(h for _, h in targets)))
+        img.load()
+        if img.size != tuple(source_info['original_size']):
+            logger.info(f"Decoded {file_path} at {img.size} instead of {source_info['original_size']}")
+        if img.mode == 'P':
+            # Palette images would otherwise be resized with NEAREST
+            img = img.convert('RGBA')
+
+        workers = max(1, min(len(renditions), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            encoded = list(executor.map(
+                lambda job: _encode_rendition(img, source_info, *job), zip(renditions, targets)
+            ))
+    return source_info, encoded
+
+
+def _cover(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Smallest size with size's aspect ratio that covers box, never upscaling."""
+    scale = min(max(box[0] / size[0], box[1] / size[1]), 1.0)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def render_image(
+    image_bytes: bytes,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    fit: str = 'contain',
+    output_format: str = 'JPEG',
+    quality: int = 85
+) -> Tuple[bytes, Dict]:
+    """
+    Resize stored image bytes to width x height and encode them. fit is
+    contain (fit inside, keep the aspect ratio), cover (fill the box, then
+    crop the overflow around the centre) or fill (stretch to the exact
+    size). A missing width or height leaves that side unconstrained, and
+    contain and cover never upscale. JPEG sources are decoded at a reduced
+    DCT scale when the output is small enough.
+    """
+    output_format = output_format.upper()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        source_info = {'format': img.format, 'original_size': img.size}
+        box = (width or img.size[0], height or img.size[1])
+        if fit == 'fill':
+            target = box
+        elif fit == 'cover' and width and height:
+            target = _cover(img.size, box)
+        else:
+            target = _fit(img.size, box)
+        img.draft(None, target)
+        img.load()
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+
+        if img.size != target:
+            img = img.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        if fit == 'cover' and width and height:
+            crop_w, crop_h = min(width, target[0]), min(height, target[1])
+            left, top = (target[0] - crop_w) // 2, (target[1] - crop_h) // 2
+            img = img.crop((left, top, left + crop_w, top + crop_h))
+
+        rendered = _encode(img, output_format, quality)
+        return rendered, _rendition_info(img, source_info, output_format, quality, rendered)
+
+
+def ssim(reference, candidate) -> float:
+    """
+    Mean structural similarity of two equally sized 8-bit luma arrays,
+    computed over non-overlapping SSIM_BLOCK x SSIM_BLOCK blocks. 1.0 means
+    identical; visible compression artefacts usually start below 0.95.
+    """
+    x = np.asarray(reference, dtype=np.float32)
+    y = np.asarray(candidate, dtype=np.float32)
+    if x.shape != y.shape:
+        raise ValueError(f"Cannot compare images of shape {x.shape} and {y.shape}")
+    block = max(1, min(SSIM_BLOCK, *x.shape))
+    h, w = x.shape[0] // block * block, x.shape[1] // block * block
+    x = x[:h, :w].reshape(h // block, block, w // block, block)
+    y = y[:h, :w].reshape(h // block, block, w // block, block)
+
+    mean_x, mean_y = x.mean(axis=(1, 3)), y.mean(axis=(1, 3))
+    var_x = (x * x).mean(axis=(1, 3)) - mean_x * mean_x
+    var_y = (y * y).mean(axis=(1, 3)) - mean_y * mean_y
+    cov = (x * y).mean(axis=(1, 3)) - mean_x * mean_y
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    ssim_map = ((2 * mean_x * mean_y + c1) * (2 * cov + c2)) / (
+        (mean_x * mean_x + mean_y * mean_y + c1) * (var_x + var_y + c2)
+    )
+    return float(ssim_map.mean())
+
+
+def _luma(img):
+    return np.asarray(_flatten(img).convert('L'))
+
+
+def _search_quality(ok: Callable[[int], bool], lowest: bool) -> Optional[int]:
+    """Lowest (or highest) quality in ADAPTIVE_QUALITY_RANGE for which ok holds, assuming ok is monotonic."""
+    lo, hi = ADAPTIVE_QUALITY_RANGE
+    found = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if ok(mid):
+            found = mid
+            lo, hi = (lo, mid - 1) if lowest else (mid + 1, hi)
+        else:
+            lo, hi = (mid + 1, hi) if lowest else (lo, mid - 1)
+    return found
+
+
+def encode_adaptive(
+    file_path: str,
+    max_bytes: Optional[int] = None,
+    min_ssim: Optional[float] = None,
+    max_dimension: Optional[int] = None,
+    formats: Iterable[str] = ADAPTIVE_FORMATS
+) -> Tuple[bytes, Dict]:
+    """
+    Encode an image file as the smallest output that meets a target instead
+    of at a fixed quality. With min_ssim, JPEG and WebP quality is
+    binary-searched for the lowest setting whose SSIM against the decoded
+    source reaches min_ssim, and the smallest format wins. With only
+    max_bytes, the search finds the highest quality that fits and the most
+    similar format wins; with both, max_bytes is the hard limit. PNG is
+    lossless and competes at its one size. JPEG is skipped for images with
+    real transparency. If no format meets the target, the most similar
+    encoding within max_bytes is kept, or else the smallest one. Every
+    candidate and the decision are returned in the schema_hint fields
+    under 'encoding'.
+    """
+    if max_bytes is None and min_ssim is None:
+        raise ValueError("Adaptive encoding needs max_bytes or min_ssim")
+    if max_bytes is not None and max_bytes <= 0:
+        raise ValueError("max_bytes must be positive")
+    if min_ssim is not None and not 0 < min_ssim <= 1:
+        raise ValueError("min_ssim must be in (0, 1]")
+    formats = [output_format.upper() for output_format in formats]
+
+    with Image.open(file_path) as img:
+        source_format, original_size = img.format, img.size
+        if max_dimension and max(img.size) > max_dimension:
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        img.load()
+        if img.mode == 'P':
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        elif img.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'L' if img.mode == '1' else 'RGB')
+        if img.mode in ('LA', 'RGBA') and img.getchannel('A').getextrema()[0] < 255:
+            if len(formats) > 1 and 'JPEG' in formats:
+                formats.remove('JPEG')
+        reference = _luma(img)
+
+    def trial(output_format: str, quality: int, trials: Dict[int, Dict]) -> Dict:
+        if quality not in trials:
+            content = _encode(img, output_format, quality)
+            trials[quality] = {'format': output_format, 'quality': quality, 'content': content}
+        return trials[quality]
+
+    def score(candidate: Dict) -> float:
+        if 'ssim' not in candidate:
+            with Image.open(io.BytesIO(candidate['content'])) as decoded:
+                candidate['ssim'] = ssim(reference, _luma(decoded))
+        return candidate['ssim']
+
+    def fits(candidate: Dict) -> bool:
+        return max_bytes is None or len(candidate['content']) <= max_bytes
+
+    lowest_quality, highest_quality = ADAPTIVE_QUALITY_RANGE
+    candidates = []
+    for output_format in formats:
+        if output_format == 'PNG':
+            candidates.append({'format': 'PNG', 'quality': None, 'content': _encode(img, 'PNG', 0), 'ssim': 1.0})
+            continue
+        trials: Dict[int, Dict] = {}
+        quality = None
+        if min_ssim is not None:
+            quality = _search_quality(lambda q: score(trial(output_format, q, trials)) >= min_ssim, lowest=True)
+            if quality is None and max_bytes is None:
+                quality = highest_quality
+        if max_bytes is not None and (quality is None or not fits(trial(output_format, quality, trials))):
+            # The byte budget is a hard limit: take the best quality that fits
+            quality = _search_quality(lambda q: fits(trial(output_format, q, trials)), lowest=False)
+            quality = lowest_quality if quality is None else quality
+        candidate = trial(output_format, quality, trials)
+        candidate['trials'] = len(trials)
+        candidates.append(candidate)
+
+    for candidate in candidates:
+        candidate['target_met'] = fits(candidate) and (min_ssim is None or score(candidate) >= min_ssim)
+    met = [candidate for candidate in candidates if candidate['target_met']]
+    within_budget = [candidate for candidate in candidates if fits(candidate)]
+    if met and min_ssim is not None:
+        chosen = min(met, key=lambda c: len(c['content']))
+    elif within_budget:
+        chosen = max(within_budget, key=lambda c: (score(c), -len(c['content'])))
+    else:
+        chosen = min(candidates, key=lambda c: len(c['content']))
+    if not met:
+        logger.warning(f"No encoding of {file_path} meets max_bytes={max_bytes}, min_ssim={min_ssim}; "
+                       f"keeping {chosen['format']} at {len(chosen['content'])} bytes")
+
+    image_bytes = chosen['content']
+    image_info = {
+        'media_type': 'image',
+        'format': chosen['format'],
+        'source_format': source_format,
+        'original_size': original_size,
+        'current_size': list(img.size),
+        'mode': img.mode,
+        'compressed': True,
+        'quality': chosen['quality'],
+        'file_size_bytes': len(image_bytes),
+        'encoding': {
+            'mode': 'adaptive',
+            'max_bytes': max_bytes,
+            'min_ssim': min_ssim,
+            'ssim': round(score(chosen), 4),
+            'target_met': chosen['target_met'],
+            'candidates': [
+                {
+                    'format': candidate['format'],
+                    'quality': candidate['quality'],
+                    'file_size_bytes': len(candidate['content']),
+                    'ssim': round(score(candidate), 4),
+                    'trials': candidate.get('trials', 1),
+                    'target_met': candidate['target_met'],
+                }
+                for candidate in candidates
+            ],
+        },
+    }
+    logger.info(f"Adaptive encoding chose {chosen['format']} q={chosen['quality']} "
+                f"({len(image_bytes)} bytes, SSIM {score(chosen):.4f}) for {file_path}")
+    return image_bytes, image_info
+
+
+def _get_image_pool() -> Tuple[ProcessPoolExecutor, threading.BoundedSemaphore]:
+    global _pool, _slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = settings.image_workers
+                depth = settings.image_worker_queue_depth or 2 * workers
+                _slots = threading.BoundedSemaphore(max(depth, workers))
+                # spawn, not fork: the parent runs pool and event loop threads
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=settings.image_worker_max_tasks or None,
+                )
+                logger.info(f"Started image worker pool: {workers} processes, queue depth {max(depth, workers)}")
+    return _pool, _slots
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _slots = None, None
+
+
+def run_image_tasks(fn: Callable, arg_lists: Iterable[tuple], return_exceptions: bool = False) -> List:
+    """
+    Run fn(*args) for each args and return the results in order, in the
+    worker pool if settings.image_workers > 0 and on this thread otherwise.
+    With return_exceptions, an exception raised by fn is returned in place
+    of its result instead of propagating; a broken pool still raises.
+    """
+    def outcome(call: Callable):
+        try:
+            return call()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    if settings.image_workers <= 0:
+        return [outcome(lambda: fn(*args)) for args in arg_lists]
+
+    pool, slots = _get_image_pool()
+    futures = []
+    try:
+        for args in arg_lists:
+            slots.acquire()
+            try:
+                future = pool.submit(fn, *args)
+            except BaseException:
+                slots.release()
+                raise
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        return [outcome(future.result) for future in futures]
+    except BrokenProcessPool as e:
+        # A worker died (e.g. OOM-killed); the next call starts a fresh pool
+        logger.error(f"Error Occurred at run_image_tasks: image worker pool is broken: {e}")
+        _discard_pool(pool)
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def run_image_task(fn: Callable, *args):
+    """Run a single task like run_image_tasks."""
+    return run_image_tasks(fn, [args])[0]
+
+
+def shutdown_image_workers(wait: bool = True):
+    """Stop the worker pool, if one was started."""
+    pool = _pool
+    if pool is not None:
+        _discard_pool(pool)
+        pool.shutdown(wait=wait)
+        logger.info("Image worker pool shut down")
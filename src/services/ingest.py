@@ -0,0 +1,239 @@
+"""
+Streaming ingest of upload request bodies.
+
+The body is parsed as it arrives. The file part is hashed and measured on
+the fly, kept in memory up to settings.ingest_spool_bytes and spilled to a
+temporary file beyond that. Each upload reserves its whole in-memory
+allowance from a per-process budget (settings.ingest_memory_budget_bytes)
+before its first byte is buffered. When concurrent uploads exhaust it, new
+uploads wait for admission, which pushes back on clients through TCP flow
+control instead of growing the heap; uploads already admitted never wait,
+so they always run to completion and free their share.
+"""
+
+from src import logger
+from src.config import settings
+from typing import AsyncIterable, Dict, Optional
+import asyncio
+import hashlib
+import io
+import tempfile
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Largest accepted size of a plain form field
+FIELD_MAX_BYTES = 1024 * 1024
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+class MemoryBudget:
+    """Byte budget shared by all in-flight uploads of the process."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.used = 0
+        self.waits = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self, size: int) -> int:
+        """Wait until size bytes fit in the budget and reserve them; returns the amount reserved."""
+        size = min(size, self.capacity)
+        async with self._changed:
+            if self.used + size > self.capacity:
+                self.waits += 1
+                await self._changed.wait_for(lambda: self.used + size <= self.capacity)
+            self.used += size
+        return size
+
+    async def release(self, size: int):
+        if size:
+            async with self._changed:
+                self.used -= size
+                self._changed.notify_all()
+
+    def stats(self) -> Dict:
+        return {"capacity_bytes": self.capacity, "used_bytes": self.used, "waits": self.waits}
+
+
+memory_budget = MemoryBudget(settings.ingest_memory_budget_bytes)
+
+
+def _spill(buffer: io.BytesIO):
+    """Temporary file holding what buffer has collected so far."""
+    spill = tempfile.TemporaryFile()
+    spill.write(buffer.getbuffer())
+    return spill
+
+
+class SpooledUpload:
+    """
+    Upload body that knows its SHA-256 and size, held in memory or in a
+    temporary file. Reads are awaitable like UploadFile's; once spilled,
+    every file write and read runs in a worker thread.
+    """
+
+    def __init__(self, spool_bytes: Optional[int] = None, budget: MemoryBudget = memory_budget):
+        self.size = 0
+        self.content_hash = None
+        self._spool_bytes = settings.ingest_spool_bytes if spool_bytes is None else spool_bytes
+        self._budget = budget
+        self._reserved = 0
+        self._digest = hashlib.sha256()
+        self._file = io.BytesIO()
+        self._spilled = False
+
+    @property
+    def spilled(self) -> bool:
+        return self._spilled
+
+    async def append(self, data: bytes):
+        if not self._reserved and not self._spilled:
+            # Admission: the whole in-memory allowance at once, so no admitted
+            # upload ever waits on the budget while holding part of it
+            self._reserved = await self._budget.acquire(self._spool_bytes)
+        self._digest.update(data)
+        self.size += len(data)
+        if not self._spilled and self.size <= self._reserved:
+            self._file.write(data)
+            return
+
+        if not self._spilled:
+            self._file = await asyncio.to_thread(_spill, self._file)
+            self._spilled = True
+            await self._budget.release(self._reserved)
+            self._reserved = 0
+        await asyncio.to_thread(self._file.write, data)
+
+    async def finish(self):
+        self.content_hash = self._digest.hexdigest()
+        self._file.seek(0)
+        # Keep only what the buffered body actually uses
+        if self._reserved > self.size:
+            await self._budget.release(self._reserved - self.size)
+            self._reserved = self.size
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    async def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._spilled:
+            return await asyncio.to_thread(self._file.read, size)
+        return self._file.read(size)
+
+    async def aclose(self):
+        self._file.close()
+        await self._budget.release(self._reserved)
+        self._reserved = 0
+
+
+class UploadForm:
+    """File and text fields of a multipart/form-data upload."""
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.file: Optional[SpooledUpload] = None
+
+    async def aclose(self):
+        if self.file is not None:
+            await self.file.aclose()
+
+
+async def read_upload_form(content_type: str, body: AsyncIterable[bytes],
+                           file_field: str = "file") -> UploadForm:
+    """
+    Parse a multipart/form-data body chunk by chunk. The part named
+    file_field goes into a SpooledUpload; other fields are decoded as text.
+    """
+    media_type, params = parse_options_header(content_type)
+    if media_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("Expected a multipart/form-data body")
+
+    form = UploadForm()
+    state = {"header": b"", "value": b"", "disposition": b"", "name": None, "text": None}
+    pending = []
+
+    def on_part_begin():
+        state.update(disposition=b"", name=None, text=None)
+
+    def on_header_field(data, start, end):
+        state["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        if state["header"].lower() == b"content-disposition":
+            state["disposition"] = state["value"]
+        state.update(header=b"", value=b"")
+
+    def on_headers_finished():
+        _, options = parse_options_header(state["disposition"])
+        if b"name" not in options:
+            raise InvalidUpload('Form part without a "name" in its Content-Disposition')
+        state["name"] = options[b"name"].decode("utf-8", "replace")
+        if state["name"] == file_field and b"filename" in options:
+            if form.file is not None:
+                raise InvalidUpload(f"More than one '{file_field}' part")
+            form.filename = options[b"filename"].decode("utf-8", "replace")
+            form.file = SpooledUpload()
+        else:
+            state["text"] = bytearray()
+
+    def on_part_data(data, start, end):
+        if state["text"] is None:
+            pending.append(data[start:end])
+            return
+        state["text"] += data[start:end]
+        if len(state["text"]) > FIELD_MAX_BYTES:
+            raise InvalidUpload(f"Form field '{state['name']}' is too large")
+
+    def on_part_end():
+        if state["text"] is not None:
+            form.fields[state["name"]] = state["text"].decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            # File data is appended between reads, so waiting for admission stalls the body
+            for data in pending:
+                await form.file.append(data)
+            pending.clear()
+        parser.finalize()
+    except InvalidUpload:
+        await form.aclose()
+        raise
+    except Exception as e:
+        await form.aclose()
+        raise InvalidUpload(f"Malformed multipart body: {e}")
+
+    if form.file is None:
+        raise InvalidUpload(f"Missing '{file_field}' part")
+    await form.file.finish()
+    logger.info(
+        f"Received upload '{form.filename}': {form.file.size} bytes"
+        f"{' (spilled to disk)' if form.file.spilled else ''}"
+    )
+    return form
@@ -4,15 +4,24 @@ Handles image and video storage with version control
 """
 
 from src import logger
-from src.services.oralake import add_object, get_object, update_object, rollback_object
-from typing import Optional, Tuple, Dict
+from src.config import settings
+from src.services.imaging import (
+    convert_bytes, encode_adaptive, encode_image, make_thumbnail, probe_image, render_renditions, run_image_task,
+    run_image_tasks
+)
+from src.services.oralake import (
+    BATCH_SIZE, add_object, add_object_renditions, add_objects_many, fetch_objects_by_tag,
+    find_rendition, get_object, get_object_info, iter_object, update_object, rollback_object
+)
+from typing import Optional, Tuple, Dict, List
 from pathlib import Path
-import io
-from PIL import Image
 import json
 from datetime import datetime
 import time
 
+# First read when probing an image header; grown 4x while the header is incomplete
+PROBE_BYTES = 64 * 1024
+
 
 class MediaStorage:
     """Handle image and video storage with metadata and version control"""
@@ -28,8 +37,16 @@ class MediaStorage:
         description: Optional[str] = None,
         compress: bool = True,
         quality: int = 85,
-        max_dimension: Optional[int] = None
+        max_dimension: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        min_ssim: Optional[float] = None
     ) -> int:
+        """
+        Store an image file. With max_bytes and/or min_ssim, compress and
+        quality are ignored and the image is encoded by encode_adaptive as
+        the smallest JPEG, WebP or PNG that meets the target; the decision
+        is recorded in schema_hint under 'encoding'.
+        """
         start_time = time.time()
         path = Path(file_path)
         
@@ -38,38 +55,11 @@ class MediaStorage:
         
         name = name or path.stem
         
-        with Image.open(file_path) as img:
-            format_name = img.format
-            original_size = img.size
-            mode = img.mode
-            
-            if max_dimension and max(img.size) > max_dimension:
-                img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-                logger.info(f"Resized image from {original_size} to {img.size}")
-            
-            if compress and img.mode in ('RGBA', 'LA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
-            
-            buffer = io.BytesIO()
-            save_format = 'JPEG' if compress else format_name
-            save_kwargs = {'quality': quality, 'optimize': True} if compress else {}
-            
-            img.save(buffer, format=save_format, **save_kwargs)
-            image_bytes = buffer.getvalue()
-        
-        schema_hint = json.dumps({
-            'media_type': 'image',
-            'format': format_name,
-            'original_size': original_size,
-            'current_size': list(img.size),
-            'mode': mode,
-            'compressed': compress,
-            'quality': quality if compress else None,
-            'file_size_bytes': len(image_bytes),
-            'timestamp': datetime.now().isoformat()
-        })
+        if max_bytes is not None or min_ssim is not None:
+            image_bytes, image_info = run_image_task(encode_adaptive, file_path, max_bytes, min_ssim, max_dimension)
+        else:
+            image_bytes, image_info = run_image_task(encode_image, file_path, compress, quality, max_dimension)
+        schema_hint = json.dumps({**image_info, 'timestamp': datetime.now().isoformat()})
         
         object_id = add_object(
             name=name,
@@ -84,6 +74,140 @@ class MediaStorage:
         logger.info(f"Saved image '{name}' with ID {object_id} ({len(image_bytes)} bytes) in {elapsed:.2f} ms")
         return object_id
     
+    @staticmethod
+    def save_images_batch(
+        file_paths: List[str],
+        names: Optional[List[str]] = None,
+        tags: str = "image",
+        description: Optional[str] = None,
+        compress: bool = True,
+        quality: int = 85,
+        max_dimension: Optional[int] = None,
+        batch_size: int = BATCH_SIZE,
+        max_bytes: Optional[int] = None,
+        min_ssim: Optional[float] = None
+    ) -> Dict:
+        """
+        Encode several images like save_image and store them with one array
+        insert per batch. Returns add_objects_many's result; images that fail
+        to decode are reported in its errors like rows the database rejected.
+        """
+        start_time = time.time()
+        names = names or [Path(file_path).stem for file_path in file_paths]
+        
+        for file_path in file_paths:
+            path = Path(file_path)
+            if path.suffix.lower() not in MediaStorage.SUPPORTED_IMAGE_FORMATS:
+                raise ValueError(f"Unsupported image format: {path.suffix}")
+        
+        # Encoded in parallel when image workers are configured
+        if max_bytes is not None or min_ssim is not None:
+            encoded = run_image_tasks(
+                encode_adaptive,
+                [(file_path, max_bytes, min_ssim, max_dimension) for file_path in file_paths],
+                return_exceptions=True
+            )
+        else:
+            encoded = run_image_tasks(
+                encode_image,
+                [(file_path, compress, quality, max_dimension) for file_path in file_paths],
+                return_exceptions=True
+            )
+
+        # Images that failed to decode are left out of the insert, keeping their index
+        errors = []
+        indexes = []
+        records = []
+        for index, (name, result) in enumerate(zip(names, encoded)):
+            if isinstance(result, Exception):
+                logger.warning(f"Image '{name}' could not be encoded: {result}")
+                errors.append({"index": index, "name": name, "error": str(result)})
+                continue
+            image_bytes, image_info = result
+            indexes.append(index)
+            records.append({
+                'name': name,
+                'obj_type': 'IMAGE',
+                'content': image_bytes,
+                'tags': tags,
+                'description': description or f"Image: {name}",
+                'schema_hint': json.dumps({**image_info, 'timestamp': datetime.now().isoformat()})
+            })
+
+        stored = add_objects_many(records, batch_size=batch_size) if records else {"object_ids": [], "errors": []}
+        object_ids = [None] * len(file_paths)
+        for index, object_id in zip(indexes, stored["object_ids"]):
+            object_ids[index] = object_id
+        errors.extend({**error, "index": indexes[error["index"]]} for error in stored["errors"])
+        errors.sort(key=lambda error: error["index"])
+
+        elapsed = (time.time() - start_time) * 1000
+        logger.info(f"Saved {len(file_paths) - len(errors)}/{len(file_paths)} images in {elapsed:.2f} ms")
+        return {"object_ids": object_ids, "errors": errors}
+    
+    @staticmethod
+    def save_image_renditions(
+        file_path: str,
+        renditions: List[Dict],
+        name: Optional[str] = None,
+        tags: str = "image",
+        description: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Store an image file as is plus renditions derived from a single
+        decode, e.g. [{"name": "web", "max_dimension": 1920, "quality": 75},
+        {"name": "thumb", "size": (200, 200), "format": "WEBP"}]. Each
+        rendition becomes an object named <name>_<rendition name>, linked to
+        the original for lookup with get_rendition. Everything is written in
+        one transaction. Returns {"source": id, <rendition name>: id, ...}.
+        """
+        start_time = time.time()
+        path = Path(file_path)
+        
+        if path.suffix.lower() not in MediaStorage.SUPPORTED_IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {path.suffix}")
+        rendition_names = [spec['name'] for spec in renditions]
+        if len(set(rendition_names)) != len(rendition_names) or 'source' in rendition_names:
+            raise ValueError("Rendition names must be unique and not 'source'")
+        if any('/' in rendition_name for rendition_name in rendition_names):
+            # Names with a slash are reserved for on-demand renditions (see image_renditions)
+            raise ValueError("Rendition names must not contain '/'")
+        
+        name = name or path.stem
+        timestamp = datetime.now().isoformat()
+        source_info, encoded = run_image_task(render_renditions, file_path, renditions)
+        
+        def record(object_name: str, content: bytes, image_info: Dict, label: str) -> Dict:
+            return {
+                'name': object_name,
+                'obj_type': 'IMAGE',
+                'content': content,
+                'tags': tags,
+                'description': description or f"{label}: {name}",
+                'schema_hint': json.dumps({**image_info, 'timestamp': timestamp})
+            }
+        
+        source = record(name, path.read_bytes(), source_info, "Image")
+        result = add_object_renditions(source, {
+            spec['name']: record(f"{name}_{spec['name']}", image_bytes, image_info, f"{spec['name']} rendition")
+            for spec, (image_bytes, image_info) in zip(renditions, encoded)
+        })
+        
+        elapsed = (time.time() - start_time) * 1000
+        logger.info(f"Saved image '{name}' (ID {result['source']}) with {len(renditions)} renditions in {elapsed:.2f} ms")
+        return result
+    
+    @staticmethod
+    def get_rendition(source_id: int, rendition_name: str, save_to: Optional[str] = None) -> Tuple[bytes, Dict]:
+        """
+        Fetch the rendition_name rendition of image source_id, like get_image.
+        Renditions of an earlier version of the source are not returned.
+        """
+        object_id = find_rendition(source_id, rendition_name)
+        if object_id is None:
+            raise ValueError(f"Image with ID {source_id} has no '{rendition_name}' rendition")
+        return MediaStorage.get_image(object_id, save_to)
+    
     @staticmethod
     def save_video(
         file_path: str,
@@ -100,28 +224,28 @@ class MediaStorage:
         
         name = name or path.stem
         
-        with open(file_path, 'rb') as f:
-            video_bytes = f.read()
-        
+        file_size = path.stat().st_size
         schema_hint = json.dumps({
             'media_type': 'video',
             'format': path.suffix.lower()[1:],
-            'file_size_bytes': len(video_bytes),
+            'file_size_bytes': file_size,
             'timestamp': datetime.now().isoformat(),
             'original_filename': path.name
         })
         
-        object_id = add_object(
-            name=name,
-            obj_type='VIDEO',
-            content=video_bytes,
-            tags=tags,
-            description=description or f"Video: {name}",
-            schema_hint=schema_hint
-        )
+        with open(file_path, 'rb') as f:
+            object_id = add_object(
+                name=name,
+                obj_type='VIDEO',
+                content=f,
+                tags=tags,
+                description=description or f"Video: {name}",
+                schema_hint=schema_hint,
+                chunk_size=chunk_size
+            )
         
         elapsed = (time.time() - start_time) * 1000
-        logger.info(f"Saved video '{name}' with ID {object_id} ({len(video_bytes)} bytes) in {elapsed:.2f} ms")
+        logger.info(f"Saved video '{name}' with ID {object_id} ({file_size} bytes) in {elapsed:.2f} ms")
         return object_id
     
     @staticmethod
@@ -132,13 +256,11 @@ class MediaStorage:
         if image_bytes is None:
             raise ValueError(f"Image with ID {object_id} not found")
         
-        img = Image.open(io.BytesIO(image_bytes))
-        metadata = {
-            'format': img.format,
-            'size': img.size,
-            'mode': img.mode,
-            'file_size_bytes': len(image_bytes)
-        }
+        # Header only; no pixels are decoded
+        metadata = probe_image(image_bytes)
+        if metadata is None:
+            raise ValueError(f"Object with ID {object_id} is not a readable image")
+        metadata['file_size_bytes'] = len(image_bytes)
         
         if save_to:
             with open(save_to, 'wb') as f:
@@ -149,6 +271,36 @@ class MediaStorage:
         logger.info(f"Retrieved image ID {object_id} in {elapsed:.2f} ms")
         return image_bytes, metadata
     
+    @staticmethod
+    def probe_image(object_id: int) -> Dict:
+        """
+        Format, size and mode of a stored image, like get_image's metadata,
+        read from the first bytes of the object instead of the whole BLOB.
+        """
+        start_time = time.time()
+        info = get_object_info(object_id)
+        if info is None:
+            raise ValueError(f"Image with ID {object_id} not found")
+        
+        length = PROBE_BYTES
+        while True:
+            chunks = iter_object(object_id, offset=0, length=length)
+            if chunks is None:
+                header = b""
+            else:
+                with chunks:
+                    header = b"".join(chunks)
+            metadata = probe_image(header)
+            if metadata is not None or len(header) < length:
+                break
+            length *= 4
+        if metadata is None:
+            raise ValueError(f"Object with ID {object_id} is not a readable image")
+        
+        elapsed = (time.time() - start_time) * 1000
+        logger.info(f"Probed image ID {object_id} from {len(header)} bytes in {elapsed:.2f} ms")
+        return {**metadata, 'file_size_bytes': info['size_bytes']}
+    
     @staticmethod
     def get_video(object_id: int, save_to: Optional[str] = None) -> Tuple[bytes, Dict]:
         start_time = time.time()
@@ -181,24 +333,7 @@ class MediaStorage:
         start_time = time.time()
         path = Path(file_path)
         
-        with Image.open(file_path) as img:
-            format_name = img.format
-            original_size = img.size
-            mode = img.mode
-            
-            if max_dimension and max(img.size) > max_dimension:
-                img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-            
-            if compress and img.mode in ('RGBA', 'LA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
-            
-            buffer = io.BytesIO()
-            save_format = 'JPEG' if compress else format_name
-            save_kwargs = {'quality': quality, 'optimize': True} if compress else {}
-            img.save(buffer, format=save_format, **save_kwargs)
-            image_bytes = buffer.getvalue()
+        image_bytes, _ = run_image_task(encode_image, file_path, compress, quality, max_dimension)
         
         result = update_object(
             name=name,
@@ -217,24 +352,25 @@ class MediaStorage:
         name: str,
         file_path: str,
         tags: str = "video",
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        chunk_size: int = 10 * 1024 * 1024
     ) -> bool:
         start_time = time.time()
         path = Path(file_path)
         
+        file_size = path.stat().st_size
         with open(file_path, 'rb') as f:
-            video_bytes = f.read()
-        
-        result = update_object(
-            name=name,
-            obj_type='VIDEO',
-            content=video_bytes,
-            tags=tags,
-            description=description or f"Updated video: {name}"
-        )
+            result = update_object(
+                name=name,
+                obj_type='VIDEO',
+                content=f,
+                tags=tags,
+                description=description or f"Updated video: {name}",
+                chunk_size=chunk_size
+            )
         
         elapsed = (time.time() - start_time) * 1000
-        logger.info(f"Updated video '{name}' ({len(video_bytes)} bytes) in {elapsed:.2f} ms")
+        logger.info(f"Updated video '{name}' ({file_size} bytes) in {elapsed:.2f} ms")
         return result
     
     @staticmethod
@@ -284,16 +420,7 @@ def convert_image_format(
     if image_bytes is None:
         raise ValueError(f"Image with ID {object_id} not found")
     
-    with Image.open(io.BytesIO(image_bytes)) as img:
-        buffer = io.BytesIO()
-        if output_format.upper() == 'JPEG' and img.mode in ('RGBA', 'LA', 'P'):
-            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = rgb_img
-        
-        save_kwargs = {'quality': quality} if output_format.upper() in ['JPEG', 'WEBP'] else {}
-        img.save(buffer, format=output_format.upper(), **save_kwargs)
-        converted = buffer.getvalue()
+    converted = run_image_task(convert_bytes, image_bytes, output_format, quality)
     
     elapsed = (time.time() - start_time) * 1000
     logger.info(f"Converted image ID {object_id} to {output_format.upper()} in {elapsed:.2f} ms")
@@ -312,11 +439,7 @@ def create_thumbnail(
     if image_bytes is None:
         raise ValueError(f"Image with ID {object_id} not found")
     
-    with Image.open(io.BytesIO(image_bytes)) as img:
-        img.thumbnail(size, Image.Resampling.LANCZOS)
-        buffer = io.BytesIO()
-        img.save(buffer, format='JPEG', quality=85, optimize=True)
-        thumbnail_bytes = buffer.getvalue()
+    thumbnail_bytes = run_image_task(make_thumbnail, image_bytes, size)
     
     if save_as_new:
         name = thumbnail_name or f"thumbnail_{object_id}"
@@ -334,3 +457,27 @@ def create_thumbnail(
     elapsed = (time.time() - start_time) * 1000
     logger.info(f"Generated thumbnail for image ID {object_id} in {elapsed:.2f} ms")
     return thumbnail_bytes
+
+
+def create_thumbnails_by_tag(tag: str, size: Tuple[int, int] = (150, 150)) -> Dict[int, bytes]:
+    """
+    Thumbnails of every image carrying a tag, by object id. Originals are
+    fetched a few at a time (one per queued image task) rather than all at
+    once. Each is decoded at reduced scale, so memory stays proportional to
+    that window.
+    """
+    start_time = time.time()
+    objects = fetch_objects_by_tag(tag, include_content=False)
+    object_ids = [obj['object_id'] for obj in objects if (obj['object_type'] or '').upper() == 'IMAGE']
+    window = max(1, settings.image_worker_queue_depth or 2 * settings.image_workers)
+    
+    thumbnails = {}
+    for start in range(0, len(object_ids), window):
+        sources = [(object_id, get_object(object_id)) for object_id in object_ids[start:start + window]]
+        sources = [(object_id, image_bytes) for object_id, image_bytes in sources if image_bytes is not None]
+        rendered = run_image_tasks(make_thumbnail, [(image_bytes, size) for _, image_bytes in sources])
+        thumbnails.update(zip((object_id for object_id, _ in sources), rendered))
+    
+    elapsed = (time.time() - start_time) * 1000
+    logger.info(f"Generated {len(thumbnails)} thumbnails for tag '{tag}' in {elapsed:.2f} ms")
+    return thumbnails
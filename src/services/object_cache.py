@@ -0,0 +1,103 @@
+"""
+In-process read-through cache for object content.
+
+Entries are keyed by (object_id, version_num), so a stale entry can never be
+served for a newer version; writes through the service layer also drop an
+object's entries eagerly. The cache is bounded by total bytes rather than by
+entry count and evicts least recently used entries first.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import threading
+
+from src.config import settings
+
+
+class ObjectCache:
+    """Byte-bounded LRU cache of object content keyed by (object_id, version)."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        # Keep one large video from flushing every hot entry
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, int], bytes]" = OrderedDict()
+        self._names: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, object_id: int, version: int) -> Optional[bytes]:
+        key = (object_id, version)
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def put(self, object_id: int, version: int, content: bytes,
+            name: Optional[str] = None, obj_type: Optional[str] = None):
+        if not self.enabled or len(content) > self.max_entry_bytes:
+            return
+        key = (object_id, version)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = content
+            self._names[key] = (name, obj_type)
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes:
+                old_key, old_content = self._entries.popitem(last=False)
+                self._names.pop(old_key, None)
+                self._bytes -= len(old_content)
+                self.evictions += 1
+
+    def _drop(self, keys):
+        for key in keys:
+            self._bytes -= len(self._entries.pop(key))
+            self._names.pop(key, None)
+            self.invalidations += 1
+
+    def invalidate(self, object_id: int):
+        """Drop every cached version of an object."""
+        with self._lock:
+            self._drop([key for key in self._entries if key[0] == object_id])
+
+    def invalidate_name(self, name: str, obj_type: str):
+        """Drop cached versions of the object(s) with this name and type."""
+        with self._lock:
+            self._drop([key for key, owner in self._names.items() if owner == (name, obj_type)])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._names.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+object_cache = ObjectCache(settings.object_cache_bytes)
@@ -1,17 +1,384 @@
 from src import logger
-from src.database import pool
-from typing import List, Optional
+from src.config import settings
+from src.database import connect_oracledb, idle_connections
+from src.services.codecs import (
+    AUTO_SAMPLE_BYTES, ByteWindow, choose_codec, codec_mode, compress, compressor, decode, decode_stream
+)
+from src.services.object_cache import object_cache
+from src.services.oralake_core import (
+    ADD_OBJECT_ROW_SQL,
+    BATCH_SIZE,
+    CHUNK_SQL,
+    DEDUP_PROBE_MIN_BYTES,
+    DEFAULT_LOB_CHUNK_SIZE,
+    DISCARD_CHUNKS_SQL,
+    HASH_READ_SIZE,
+    INSERT_BLOB_SQL,
+    INSERT_CHUNK_SQL,
+    INSERT_MANIFEST_SQL,
+    LIST_MAX_PAGE_SIZE,
+    LIST_PAGE_SIZE,
+    LOB_CHUNKS_PER_READ,
+    OBJECT_ID_SQL,
+    OBJECT_INFO_SQL,
+    OBJECT_LOB_SQL,
+    OBJECT_TYPE_SQL,
+    QUERY_ARRAYSIZE,
+    INSERT_RENDITION_SQL,
+    RENDITION_SQL,
+    RENDITIONS_SQL,
+    SOURCE_VERSION_LOCK_SQL,
+    SNAPSHOT_SQL,
+    VERSION_DELTA_SQL,
+    Content,
+    Manifest,
+    _apply_version_delta,
+    _chunk_count,
+    _chunk_span,
+    _chunkable,
+    _delta_binds,
+    _delta_candidate,
+    _delta_plan,
+    _encode_bytes,
+    _inline_lobs,
+    _inline_text,
+    _is_seekable,
+    _list_objects_query,
+    _list_page,
+    _lob_row,
+    _manifest_binds,
+    _read_size,
+    _restore_binds,
+    _snapshot_base,
+    _stored_hashes_sql,
+    _tag_query_sql,
+    decode_cursor,
+    encode_cursor,
+)
+from src.services.single_flight import object_flights
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import itertools
 import oracledb
+import threading
 
-def add_object(name: str, obj_type: str, content: bytes, tags: str,
-               description: str = None, schema_hint: str = None):
+
+def _iter_source(content: Content, chunk_size: int) -> Iterator[bytes]:
+    if hasattr(content, "read"):
+        while True:
+            piece = content.read(chunk_size)
+            if not piece:
+                break
+            yield piece
+    else:
+        for piece in content:
+            if piece:
+                yield piece
+
+
+def _stream_to_lob(conn, content: Content, chunk_size: Optional[int] = None,
+                   digest=None, codec: Optional[str] = None) -> Tuple[Any, int]:
+    """
+    Copy a file-like or iterable source into a temporary BLOB in chunks,
+    so only one chunk is held in Python memory at a time. A hashlib digest,
+    if given, is fed every raw chunk; with a codec the chunks are compressed
+    on their way into the LOB. Returns the LOB and the raw byte count.
+    """
+    lob = conn.createlob(oracledb.DB_TYPE_BLOB)
+    if chunk_size is None:
+        chunk_size = (lob.getchunksize() or DEFAULT_LOB_CHUNK_SIZE) * LOB_CHUNKS_PER_READ
+    comp = compressor(codec) if codec else None
+
+    offset = 1
+    size = 0
+    buffer = bytearray()
+    for piece in _iter_source(content, chunk_size):
+        size += len(piece)
+        if digest is not None:
+            digest.update(piece)
+        buffer += comp.compress(piece) if comp else piece
+        while len(buffer) >= chunk_size:
+            lob.write(bytes(buffer[:chunk_size]), offset)
+            offset += chunk_size
+            del buffer[:chunk_size]
+    if comp:
+        buffer += comp.flush()
+    if buffer:
+        lob.write(bytes(buffer), offset)
+    return lob, size
+
+
+def _peek(content: Content, size: int) -> Tuple[bytes, Content]:
+    """Return the leading bytes of content and a source that still yields all of it."""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return bytes(content[:size]), content
+    if _is_seekable(content):
+        position = content.tell()
+        head = content.read(size)
+        content.seek(position)
+        return head, content
+    pieces = _iter_source(content, size)
+    head = next(pieces, b"")
+    return head, itertools.chain([head], pieces)
+
+
+def _encode_payload(conn, content: Content, mode: str,
+                    chunk_size: Optional[int] = None) -> Tuple[Optional[str], Any]:
+    """Compress bytes or a seekable file for a new blob row. Returns (codec, value to bind)."""
+    sample, content = _peek(content, AUTO_SAMPLE_BYTES)
+    codec, encoded = choose_codec(mode, sample)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return _encode_bytes(content, sample, codec, encoded)
+    return codec, _stream_to_lob(conn, content, chunk_size, codec=codec)[0]
+
+
+def _digest_content(conn, content: Content, chunk_size: Optional[int] = None,
+                    mode: str = "none") -> Tuple[str, int, Callable[[], Tuple[Optional[str], Any]]]:
+    """
+    SHA-256 the content. Returns (hex digest, size, encode), where encode()
+    gives (codec, value to bind) for a new blob row and is only called when
+    the hash is not stored yet. Bytes and seekable files are hashed in a
+    first pass (files are rewound), so duplicates are never compressed or
+    sent. One-shot streams cannot be read twice; they are hashed and
+    compressed while being spooled into a temporary BLOB. Seekable sources
+    that already carry content_hash and size, like ingest.SpooledUpload, are
+    not read again.
+    """
+    if getattr(content, "content_hash", None) and _is_seekable(content):
+        return content.content_hash, content.size, lambda: _encode_payload(conn, content, mode, chunk_size)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        content_hash = hashlib.sha256(content).hexdigest()
+        return content_hash, len(content), lambda: _encode_payload(conn, content, mode, chunk_size)
+
+    digest = hashlib.sha256()
+    if _is_seekable(content):
+        position = content.tell()
+        size = 0
+        for piece in _iter_source(content, chunk_size or HASH_READ_SIZE):
+            digest.update(piece)
+            size += len(piece)
+        content.seek(position)
+        return digest.hexdigest(), size, lambda: _encode_payload(conn, content, mode, chunk_size)
+
+    sample, content = _peek(content, AUTO_SAMPLE_BYTES)
+    codec, _ = choose_codec(mode, sample)
+    lob, size = _stream_to_lob(conn, content, chunk_size, digest, codec)
+    return digest.hexdigest(), size, lambda: (codec, lob)
+
+
+def _stored_hashes(cursor, hashes: Iterable[str]) -> Set[str]:
+    hashes = list(hashes)
+    if not hashes:
+        return set()
+    cursor.execute(_stored_hashes_sql(len(hashes)), hashes)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _claim_blob(cursor, sql: str, binds: Dict) -> bool:
+    """
+    Insert a blob (or chunk manifest) row and return True, or lock the row
+    stored already and return False. When a concurrent release_blob deletes
+    that row between the failed insert and the lock, the insert is retried.
+    """
+    while True:
+        if "content" in binds:
+            cursor.setinputsizes(content=oracledb.DB_TYPE_BLOB)
+        try:
+            cursor.execute(sql, binds)
+            return True
+        except oracledb.IntegrityError as e:
+            # Stored already, possibly by a concurrent writer
+            if e.args[0].code != 1:
+                raise
+        if _stored_hashes(cursor, [binds["content_hash"]]):
+            return False
+
+
+def _chunk_reader(content: Content, chunk_size: int) -> Callable[[int], bytes]:
+    """Thread-safe read of the n-th chunk of bytes or a seekable file."""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        view = memoryview(content)
+        return lambda n: bytes(view[n * chunk_size:(n + 1) * chunk_size])
+
+    position = content.tell()
+    lock = threading.Lock()
+
+    def read(n: int) -> bytes:
+        with lock:
+            content.seek(position + n * chunk_size)
+            return content.read(chunk_size)
+    return read
+
+
+def _write_chunks(cursor, content_hash: str, content: Content, size: int,
+                  codec: Optional[str], chunk_size: int):
+    """
+    Insert the chunk rows of a blob. Chunks are compressed one by one and
+    inserted over the caller's connection plus up to
+    settings.chunk_parallelism - 1 idle pooled connections, which commit
+    their rows themselves.
+    """
+    read = _chunk_reader(content, chunk_size)
+    numbers = iter(range(_chunk_count(size, chunk_size)))
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def work(conn):
+        writer = conn.cursor()
+        try:
+            while not failed.is_set():
+                with lock:
+                    chunk_no = next(numbers, None)
+                if chunk_no is None:
+                    return
+                data = read(chunk_no)
+                writer.setinputsizes(content=oracledb.DB_TYPE_BLOB)
+                writer.execute(INSERT_CHUNK_SQL, content_hash=content_hash, chunk_no=chunk_no,
+                               content=compress(codec, data) if codec else data)
+        except Exception:
+            failed.set()
+            raise
+
+    def helper():
+        with connect_oracledb() as conn:
+            work(conn)
+            conn.commit()
+
+    helpers = min(settings.chunk_parallelism - 1, idle_connections())
+    if helpers <= 0:
+        work(cursor.connection)
+        return
+    with ThreadPoolExecutor(max_workers=helpers) as executor:
+        futures = [executor.submit(helper) for _ in range(helpers)]
+        try:
+            work(cursor.connection)
+        finally:
+            for future in futures:
+                future.result()
+
+
+def _discard_chunks(content_hash: str):
+    """Delete chunk rows committed by helper connections of a failed write."""
+    try:
+        with connect_oracledb() as conn:
+            conn.cursor().execute(DISCARD_CHUNKS_SQL, [content_hash])
+            conn.commit()
+    except Exception as e:
+        logger.warning(
+            f"Could not discard chunks of {content_hash[:12]}; they stay until a purge_blobs "
+            f"run finds them older than its grace period: {e}"
+        )
+
+
+def _store_chunked(cursor, content_hash: str, content: Content, size: int, mode: str = "none"):
+    """
+    Store content as a manifest row plus settings.chunk_bytes chunk rows.
+    The manifest is inserted first, in the caller's transaction, so a
+    concurrent writer of the same content blocks on its primary key and
+    then finds it stored instead of writing the chunks a second time.
+    """
+    chunk_size = settings.chunk_bytes
+    sample, content = _peek(content, AUTO_SAMPLE_BYTES)
+    codec, _ = choose_codec(mode, sample)
+    if not _claim_blob(cursor, INSERT_MANIFEST_SQL, _manifest_binds(content_hash, size, codec, chunk_size)):
+        return
+
+    try:
+        _write_chunks(cursor, content_hash, content, size, codec, chunk_size)
+    except Exception:
+        _discard_chunks(content_hash)
+        raise
+    logger.info(f"Content {content_hash[:12]} stored as {_chunk_count(size, chunk_size)} chunks")
+
+
+def _fetch_chunk(content_hash: str, chunk_no: int, codec: Optional[str]) -> bytes:
+    with connect_oracledb() as conn:
+        cursor = conn.cursor()
+        cursor.outputtypehandler = _inline_lobs
+        cursor.execute(CHUNK_SQL, content_hash=content_hash, chunk_no=chunk_no)
+        row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Chunk {chunk_no} of blob {content_hash[:12]} is missing")
+    return decode(codec, row[0])
+
+
+def _iter_chunks(manifest: Manifest, codec: Optional[str],
+                 offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield the byte range [offset, offset + length) of a chunked blob. Only
+    the chunks covering the range are read; up to settings.chunk_parallelism
+    of them are fetched ahead, each over its own pooled connection, and
+    yielded in order.
+    """
+    span = _chunk_span(manifest.size, manifest.chunk_size, offset, length)
+    if not span:
+        return
+    window = ByteWindow(offset - span.start * manifest.chunk_size, length)
+    numbers = iter(span)
+    workers = max(1, min(settings.chunk_parallelism, idle_connections()))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk_no in itertools.islice(numbers, workers):
+            pending.append(executor.submit(_fetch_chunk, manifest.content_hash, chunk_no, codec))
+        while pending:
+            data = pending.popleft().result()
+            for chunk_no in itertools.islice(numbers, 1):
+                pending.append(executor.submit(_fetch_chunk, manifest.content_hash, chunk_no, codec))
+            piece = window.take(data)
+            if piece:
+                yield piece
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def store_content(cursor, content: Content, chunk_size: Optional[int] = None,
+                   mode: str = "none") -> Tuple[str, int]:
+    """
+    Make sure ora_lake_blobs holds the content and return its (hash, size).
+
+    The blob row is written here with ref_count 0, in the caller's
+    transaction, so the *_hashed procedures are passed a NULL content and
+    only add references. When a blob with the same hash already exists,
+    nothing is compressed or sent. Large payloads are checked with a
+    lookup first; small ones just attempt the insert, which is cheaper
+    than the extra round trip. Payloads of settings.chunked_min_bytes or
+    more are split into chunk rows when they can be re-read. A blob found
+    stored is locked until the caller commits, so it cannot be released
+    away before the caller's reference is added.
+    """
+    content_hash, size, encode = _digest_content(cursor.connection, content, chunk_size, mode)
+    if size >= DEDUP_PROBE_MIN_BYTES and _stored_hashes(cursor, [content_hash]):
+        logger.info(f"Content {content_hash[:12]} already stored, adding a reference only")
+        return content_hash, size
+
+    if _chunkable(content, size):
+        _store_chunked(cursor, content_hash, content, size, mode)
+        return content_hash, size
+
+    codec, payload = encode()
+    _claim_blob(cursor, INSERT_BLOB_SQL,
+                {"content_hash": content_hash, "content": payload, "size_bytes": size, "codec": codec})
+    return content_hash, size
+
+
+def add_object(name: str, obj_type: str, content: Content, tags: str,
+               description: str = None, schema_hint: str = None,
+               chunk_size: Optional[int] = None, compression: Optional[str] = None):
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
+            content_hash, size = store_content(cursor, content, chunk_size, codec_mode(obj_type, compression))
             object_id = cursor.callfunc(
-                "ora_lake_ops.add_object",
+                "ora_lake_ops.add_object_hashed",
                 oracledb.NUMBER,
-                [name, obj_type, content, tags, description, schema_hint]
+                [name, obj_type, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB),
+                 tags, description, schema_hint]
             )
             conn.commit()
             logger.info(f"Object added with ID {object_id}")
@@ -20,36 +387,395 @@ def add_object(name: str, obj_type: str, content: bytes, tags: str,
         logger.error(f"Error Occurred at add_object: {e}")
         raise
 
-def get_object(object_id: int)->bytes:
+def _insert_objects(conn, cursor, batch: List[Dict]) -> Tuple[List[Optional[int]], Dict[int, str], int]:
+    """
+    Write one batch of add_objects_many records without committing. Returns
+    the new object ids aligned with batch (None for failed rows), the error
+    of each failed row by index and the number of blobs stored.
+    """
+    digests = [
+        _digest_content(conn, record["content"],
+                        mode=codec_mode(record["obj_type"], record.get("compression")))
+        for record in batch
+    ]
+
+    stored = _stored_hashes(cursor, {content_hash for content_hash, _, _ in digests})
+    new_blobs = {}
+    chunked = set()
+    for record, (content_hash, size, encode) in zip(batch, digests):
+        if content_hash in stored or content_hash in new_blobs or content_hash in chunked:
+            continue
+        if _chunkable(record["content"], size):
+            _store_chunked(cursor, content_hash, record["content"], size,
+                           codec_mode(record["obj_type"], record.get("compression")))
+            chunked.add(content_hash)
+        else:
+            codec, payload = encode()
+            new_blobs[content_hash] = {
+                "content_hash": content_hash, "content": payload,
+                "size_bytes": size, "codec": codec,
+            }
+
+    if new_blobs:
+        cursor.setinputsizes(content=oracledb.DB_TYPE_BLOB)
+        cursor.executemany(INSERT_BLOB_SQL, list(new_blobs.values()), batcherrors=True)
+        rows = list(new_blobs.values())
+        duplicates = []
+        for error in cursor.getbatcherrors():
+            # A concurrent writer stored the same content first; its row serves as well
+            if error.code != 1:
+                raise oracledb.DatabaseError(error)
+            duplicates.append(rows[error.offset])
+        locked = _stored_hashes(cursor, [row["content_hash"] for row in duplicates])
+        for row in duplicates:
+            if row["content_hash"] not in locked:
+                _claim_blob(cursor, INSERT_BLOB_SQL, row)
+
+    id_var = cursor.var(oracledb.NUMBER, arraysize=len(batch))
+    error_var = cursor.var(str, 4000, arraysize=len(batch))
+    cursor.setinputsizes(tags=oracledb.DB_TYPE_CLOB, description=oracledb.DB_TYPE_CLOB,
+                         schema_hint=oracledb.DB_TYPE_CLOB, object_id=id_var, error=error_var)
+    cursor.executemany(
+        ADD_OBJECT_ROW_SQL,
+        [
+            {
+                "name": record["name"],
+                "obj_type": record["obj_type"],
+                "content_hash": content_hash,
+                "size_bytes": size,
+                "tags": record.get("tags"),
+                "description": record.get("description"),
+                "schema_hint": record.get("schema_hint"),
+            }
+            for record, (content_hash, size, _) in zip(batch, digests)
+        ]
+    )
+
+    failed = {i: error_var.getvalue(i) for i in range(len(batch)) if error_var.getvalue(i)}
+    object_ids = [
+        None if i in failed else int(id_var.getvalue(i))
+        for i in range(len(batch))
+    ]
+
+    if new_blobs or chunked:
+        # Blobs stored only for rows that then failed
+        orphans = [(content_hash,) for content_hash in itertools.chain(new_blobs, chunked)]
+        cursor.executemany(
+            "DELETE FROM ora_lake_blobs WHERE content_hash = :1 AND ref_count = 0",
+            orphans
+        )
+        if chunked:
+            cursor.executemany(
+                """
+                DELETE FROM ora_lake_chunks c WHERE content_hash = :1 AND NOT EXISTS
+                    (SELECT 1 FROM ora_lake_blobs b WHERE b.content_hash = c.content_hash)
+                """,
+                [(content_hash,) for content_hash in chunked]
+            )
+
+    return object_ids, failed, len(new_blobs) + len(chunked)
+
+
+def add_objects_many(records: List[Dict], batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    Insert many objects in batches, committing once per batch.
+
+    Each record is a dict with the keyword arguments of add_object (name,
+    obj_type, content and optionally tags, description, schema_hint,
+    compression). Every row goes through ora_lake_ops.add_object_row, the
+    insert logic of add_object_hashed, in one executemany() per batch.
+    Content is hashed up front and only blobs not already stored are
+    compressed and sent, once each even when repeated within the batch.
+    Rows that fail, such as a duplicate name/type, are rolled back to their
+    savepoint and reported instead of aborting the batch.
+
+    Returns {"object_ids": [...], "errors": [...]}, where object_ids is aligned
+    with records (None for failed rows) and each error carries the record
+    index, name and message.
+    """
+    object_ids = [None] * len(records)
+    errors = []
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
-            
-            # Use oracledb.BLOB for proper BLOB handling
-            result = cursor.var(oracledb.BLOB)
-            cursor.execute(
-                "BEGIN :result := ora_lake_ops.get_object(:id); END;",
-                result=result,
-                id=object_id
+            for start in range(0, len(records), batch_size):
+                batch = records[start:start + batch_size]
+                ids, failed, new_blobs = _insert_objects(conn, cursor, batch)
+                object_ids[start:start + len(batch)] = ids
+                errors.extend(
+                    {"index": start + i, "name": batch[i]["name"], "error": message}
+                    for i, message in failed.items()
+                )
+
+                conn.commit()
+                logger.info(
+                    f"Batch of {len(batch)} objects added ({len(batch) - len(failed)} ok, {len(failed)} failed, "
+                    f"{new_blobs} new blobs)"
+                )
+        return {"object_ids": object_ids, "errors": errors}
+    except Exception as e:
+        logger.error(f"Error Occurred at add_objects_many: {e}")
+        raise
+
+def add_object_renditions(source: Dict, renditions: Dict[str, Dict]) -> Dict[str, int]:
+    """
+    Store a source object and its renditions (e.g. resized copies) in one
+    transaction and link each rendition to the source under its name.
+    source and the values of renditions are add_objects_many records.
+    Returns {"source": source_id, <rendition name>: object_id, ...}; any
+    failed row rolls the whole write back.
+    """
+    names = list(renditions)
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            ids, failed, new_blobs = _insert_objects(conn, cursor, [source, *renditions.values()])
+            if failed:
+                conn.rollback()
+                index, message = next(iter(failed.items()))
+                raise oracledb.DatabaseError(
+                    f"Could not store {'source' if index == 0 else names[index - 1]} of '{source['name']}': {message}"
+                )
+
+            source_id = ids[0]
+            cursor.executemany(
+                INSERT_RENDITION_SQL,
+                [(source_id, name, object_id, 1) for name, object_id in zip(names, ids[1:])]
             )
-            
-            # Read the BLOB data
-            if result.getvalue() is not None:
-                blob_data = result.getvalue().read()
-                logger.info(f"Object found: {len(blob_data)} bytes")
-                return blob_data
-            else:
+            conn.commit()
+            logger.info(
+                f"Object {source_id} added with {len(names)} renditions ({new_blobs} new blobs)"
+            )
+            return {"source": source_id, **dict(zip(names, ids[1:]))}
+    except Exception as e:
+        logger.error(f"Error Occurred at add_object_renditions: {e}")
+        raise
+
+
+def add_derived_rendition(source_id: int, source_version: int, rendition_name: str,
+                          record: Dict) -> Optional[int]:
+    """
+    Store record (an add_objects_many record) as the rendition_name
+    rendition of version source_version of source_id. Returns the new
+    object id, or None when another writer stored the same rendition
+    first or the source is no longer at source_version, since such a
+    rendition would never be served.
+    """
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SOURCE_VERSION_LOCK_SQL, id=source_id)
+            row = cursor.fetchone()
+            if row is None or row[0] != source_version:
+                conn.rollback()
+                logger.info(f"Rendition {rendition_name} of object {source_id} not stored: source changed version")
+                return None
+
+            ids, failed, _ = _insert_objects(conn, cursor, [record])
+            if failed:
+                conn.rollback()
+                logger.warning(f"Rendition {rendition_name} of object {source_id} not stored: {failed[0]}")
+                return None
+            cursor.execute(INSERT_RENDITION_SQL, [source_id, rendition_name, ids[0], source_version])
+            conn.commit()
+            logger.info(f"Rendition {rendition_name} of object {source_id} stored as object {ids[0]}")
+            return ids[0]
+    except Exception as e:
+        logger.error(f"Error Occurred at add_derived_rendition: {e}")
+        raise
+
+
+def list_renditions(source_id: int) -> Dict[str, int]:
+    """Rendition name -> object id of the renditions linked to source_id."""
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            cursor.execute(RENDITIONS_SQL, source_id=source_id)
+            return dict(cursor.fetchall())
+    except Exception as e:
+        logger.error(f"Error occured at list_renditions: {e}")
+        raise
+
+
+def find_rendition(source_id: int, rendition_name: str) -> Optional[int]:
+    """
+    Object id of the rendition_name rendition of source_id, or None when
+    there is none or it was derived from an earlier version of the source.
+    """
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            cursor.execute(RENDITION_SQL, source_id=source_id, rendition_name=rendition_name)
+            row = cursor.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Error occured at find_rendition: {e}")
+        raise
+
+class ObjectStream:
+    """
+    An object's content as an iterator of byte chunks, owning the pooled
+    connection that holds its LOB locator. info carries the version,
+    content hash, size and update time selected together with the locator,
+    so it describes exactly the bytes streamed. Iterating to the end
+    releases the connection; close() (or a with block) releases it whether
+    or not the stream was read. Chunked content is fetched over connections
+    of its own, so the stream releases its connection straight away.
+    """
+
+    def __init__(self, conn, lob, codec: Optional[str], info: Dict, chunk_size: Optional[int] = None,
+                 offset: int = 0, length: Optional[int] = None):
+        self.info = info
+        self._conn = conn
+        self._lob = lob
+        self._codec = codec
+        self._chunk_size = chunk_size
+        self._offset = offset
+        self._length = length
+        if isinstance(lob, Manifest):
+            self.close()
+
+    @property
+    def version(self) -> int:
+        return self.info["version_num"]
+
+    def read_range(self, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Bytes [offset, offset + length) of the content, read through this
+        stream's locator; several ranges can be read before close().
+        """
+        if isinstance(self._lob, Manifest):
+            return _iter_chunks(self._lob, self._codec, offset, length)
+        if self._conn is None:
+            raise ValueError("Object stream is closed")
+        if not self._codec:
+            return _read_lob_chunks(self._lob, self._chunk_size, offset, length)
+        return decode_stream(_read_lob_chunks(self._lob, self._chunk_size), self._codec, offset, length)
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            yield from self.read_range(self._offset, self._length)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.close()
+
+    def __enter__(self) -> "ObjectStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open_object(object_id: int, chunk_size: Optional[int] = None,
+                 offset: int = 0, length: Optional[int] = None) -> Optional[ObjectStream]:
+    """
+    Acquire a connection and select the object's LOB locator together with
+    its version, in one read-consistent statement. Returns None (with the
+    connection released) if the object does not exist, otherwise an
+    ObjectStream owning the connection.
+    """
+    conn = connect_oracledb()
+    try:
+        cursor = conn.cursor()
+        cursor.outputtypehandler = _inline_text
+        cursor.execute(OBJECT_LOB_SQL, id=object_id)
+        row = cursor.fetchone()
+    except Exception:
+        conn.close()
+        raise
+
+    opened = _lob_row(row)
+    if opened is None:
+        conn.close()
+        logger.warning(f"Object with ID: {object_id} was not found")
+        return None
+    return ObjectStream(conn, *opened, chunk_size=chunk_size, offset=offset, length=length)
+
+
+def _read_lob_chunks(lob, chunk_size: Optional[int],
+                     offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    chunk_size = _read_size(lob.getchunksize(), chunk_size)
+    size = lob.size()
+    end = size if length is None else min(size, offset + length)
+    position = offset + 1  # LOB offsets are 1-based
+    while position <= end:
+        data = lob.read(position, min(chunk_size, end - position + 1))
+        if not data:
+            break
+        position += len(data)
+        yield data
+
+
+def iter_object(object_id: int, chunk_size: Optional[int] = None,
+                offset: int = 0, length: Optional[int] = None) -> Optional[ObjectStream]:
+    """
+    Stream an object's content in chunks instead of reading the whole BLOB.
+
+    Reads are issued at successive LOB offsets and sized to a multiple of the
+    LOB's native chunk size, and compressed content is decompressed on the
+    fly. offset (0-based) and length restrict the read to a byte range of
+    the original content; for chunked content only the chunks covering it
+    are fetched, several at a time. Returns None if the object does not
+    exist, otherwise an ObjectStream, which holds a pooled connection until
+    it is exhausted or closed.
+    """
+    try:
+        return _open_object(object_id, chunk_size, offset, length)
+    except Exception as e:
+        logger.error(f"Error occured at iter_object: {e}")
+        raise
+
+
+def get_object_info(object_id: int) -> Optional[Dict]:
+    """
+    Return an object's name, type, version, timestamps, size and first
+    metadata row without reading its content, or None if it does not exist.
+    """
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            cursor.outputtypehandler = _inline_lobs
+            cursor.execute(OBJECT_INFO_SQL, id=object_id)
+
+            columns = [col[0].lower() for col in cursor.description]
+            row = cursor.fetchone()
+            if row is None:
                 logger.warning(f"Object with ID: {object_id} was not found")
                 return None
-                
-    except oracledb.DatabaseError as e:
-        error_obj = e.args[0]
-        error_msg = str(error_obj)
+            return dict(zip(columns, row))
+    except Exception as e:
+        logger.error(f"Error occured at get_object_info: {e}")
+        raise
 
-        if "ORA-01403" in error_msg:
-            logger.warning(f"Object with ID: {object_id} was not found")
+
+def get_object(object_id: int)->bytes:
+    try:
+        stream = _open_object(object_id)
+        if stream is None:
             return None
+        version = stream.version
+
+        # The locator query is cheap; skip the LOB transfer on a cache hit
+        cached = object_cache.get(object_id, version) if object_cache.enabled else None
+        if cached is not None:
+            stream.close()
+            logger.info(f"Object found in cache: {len(cached)} bytes")
+            return cached
 
+        def fetch() -> bytes:
+            data = b"".join(stream)
+            object_cache.put(object_id, version, data, stream.info["object_name"], stream.info["object_type"])
+            return data
+
+        # Concurrent readers of this version wait for one transfer instead of starting their own
+        blob_data, shared = object_flights.do((object_id, version), fetch, on_wait=stream.close)
+        logger.info(f"Object found: {len(blob_data)} bytes{' (shared read)' if shared else ''}")
+        return blob_data
+    except oracledb.DatabaseError as e:
         logger.error(f"Database Error occurred at get_object: {e}")
         raise
     except Exception as e:
@@ -58,7 +784,7 @@ def get_object(object_id: int)->bytes:
 
 def tag_object(object_id: int, tag: str, description: str = None, schema_hint: str = None)->bool:
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
             cursor.callproc(
                 "ora_lake_ops.tag_object",
@@ -85,53 +811,156 @@ def tag_object(object_id: int, tag: str, description: str = None, schema_hint: s
         logger.error(f"Error occured at get_object: {e}")
         raise
 
-def query_by_tag(tag: str)->List[bytes]:
+def read_chunked(content_hash: str, size: int, chunk_size: int, codec: Optional[str]) -> bytes:
+    """Whole content of a chunked blob. Takes pooled connections, so call it holding none."""
+    return b"".join(_iter_chunks(Manifest(content_hash, size, chunk_size), codec))
+
+
+def fetch_objects_by_tag(tag: str, include_content: bool = True,
+                         arraysize: int = QUERY_ARRAYSIZE,
+                         prefetchrows: Optional[int] = None) -> List[Dict]:
+    """
+    Fetch every object carrying a tag from a single cursor on one connection.
+
+    Each row is a dict with the object's id, name, type, version, timestamps,
+    size, description and schema_hint, plus its content when include_content
+    is set. LOBs are fetched inline, so the number of round trips depends on
+    arraysize/prefetchrows rather than on the number of objects. Chunked
+    contents are read after the query's connection is back in the pool.
+    """
+    sql = _tag_query_sql(include_content)
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize if prefetchrows is None else prefetchrows
+            cursor.outputtypehandler = _inline_lobs
+            cursor.execute(sql, tag=tag)
 
-            ref_cursor = cursor.callfunc(
-                "ora_lake_ops.query_objects_by_tag",
-                oracledb.CURSOR,
-                [tag]
-            )
-            results = ref_cursor.fetchall()
-            objects = []
-            for res in results:
-                object_id = res[0]
-                obj_content = get_object(object_id=object_id)
-                if obj_content:
-                    objects.append(obj_content)
-            logger.info(f"Fetched {len(results)} objects for tag='{tag}'")
-            return objects
-    except oracledb.DatabaseError as e:
-        error_obj = e.args[0]
-        error_msg = str(error_obj)
-
-        if "PLS-00302" in error_msg:
-            logger.error("Procedure 'query_object_by_tag' does not exist in ORA_LAKE_OPS package.")
-            return False
+            columns = [col[0].lower() for col in cursor.description]
+            cursor.rowfactory = lambda *row: dict(zip(columns, row))
+            objects = cursor.fetchall()
+        if include_content:
+            # read_chunked takes pooled connections of its own
+            for obj in objects:
+                if obj["chunk_size"]:
+                    obj["content"] = read_chunked(obj["content_hash"], obj["size_bytes"],
+                                                   obj["chunk_size"], obj["codec"])
+                else:
+                    obj["content"] = decode(obj["codec"], obj["content"])
+        logger.info(f"Fetched {len(objects)} objects for tag='{tag}'")
+        return objects
+    except Exception as e:
+        logger.error(f"Error occured at fetch_objects_by_tag: {e}")
+        raise
 
-        if "ORA-02291" in error_msg:
-            logger.warning(f"Object with ID: {object_id} was not found")
-            return False
 
-        logger.error(f"Database Error occurred at get_object: {e}")
+def query_by_tag(tag: str)->List[bytes]:
+    try:
+        objects = fetch_objects_by_tag(tag, include_content=True)
+        return [obj["content"] for obj in objects if obj["content"]]
+    except Exception as e:
+        logger.error(f"Error occured at query_by_tag: {e}")
         raise
+
+def list_objects(tag: Optional[str] = None, obj_type: Optional[str] = None,
+                 created_after: Optional[datetime] = None, min_size: Optional[int] = None,
+                 limit: int = LIST_PAGE_SIZE, after_id: Optional[int] = None) -> Dict:
+    """
+    List object metadata one page at a time, ordered by object id.
+
+    Returns {"objects": [...], "next_cursor": str | None}; pass
+    decode_cursor(next_cursor) as after_id to fetch the following page.
+    """
+    limit = max(1, min(limit, LIST_MAX_PAGE_SIZE))
+    sql, binds = _list_objects_query(tag, obj_type, created_after, min_size, limit, after_id)
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = limit + 1
+            cursor.prefetchrows = limit + 1
+            cursor.execute(sql, binds)
+
+            columns = [col[0].lower() for col in cursor.description]
+            cursor.rowfactory = lambda *row: dict(zip(columns, row))
+            page = _list_page(cursor.fetchall(), limit)
+            logger.info(f"Listed {len(page['objects'])} objects after id {after_id or 0}")
+            return page
     except Exception as e:
-        logger.error(f"Error occured at get_object: {e}")
+        logger.error(f"Error occured at list_objects: {e}")
         raise
 
-def update_object(name: str, obj_type: str, content: bytes, tags: str,
-                  description: Optional[str] = None) -> bool:
+
+def _find_object_id(cursor, name: str, obj_type: str) -> Optional[int]:
+    cursor.execute(OBJECT_ID_SQL, name=name, obj_type=obj_type)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _object_type(cursor, object_id: int) -> Optional[str]:
+    cursor.execute(OBJECT_TYPE_SQL, id=object_id)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _plan_delta(cursor, object_id: Optional[int], content: Content) -> Tuple[Optional[bytes], Optional[int]]:
+    """
+    Decide how the next version of object_id is stored. Returns
+    (delta, base_version) to store a binary diff against the latest full
+    snapshot, or (None, None) to store a full snapshot. Deltas always
+    target a snapshot, never another delta, and a snapshot is forced every
+    settings.version_snapshot_interval versions, so restoring any version
+    costs at most one snapshot read plus one delta.
+    """
+    if object_id is None or not _delta_candidate(content):
+        return None, None
+
+    cursor.execute(SNAPSHOT_SQL, id=object_id)
+    base = _snapshot_base(cursor.fetchone())
+    if base is None:
+        return None, None
+    base_version, lob, codec = base
+    return _delta_plan(object_id, base_version, decode(codec, lob.read()), content)
+
+
+def _rebuild_version(conn, object_id: int, version: int) -> Optional[bytes]:
+    """Reconstruct a delta-encoded version from its snapshot; None if it is stored in full."""
+    cursor = conn.cursor()
+    cursor.outputtypehandler = _inline_lobs
+    cursor.execute(VERSION_DELTA_SQL, id=object_id, version=version)
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return _apply_version_delta(object_id, version, row)
+
+
+def _restore_args(cursor, object_id: Optional[int], version: int, mode: str = "none") -> Optional[Dict]:
+    """Keyword arguments handing a rebuilt delta version to restore_version/rollback_object."""
+    if object_id is None:
+        return None
+    content = _rebuild_version(cursor.connection, object_id, version)
+    if content is None:
+        return None
+    return _restore_binds(*store_content(cursor, content, mode=mode))
+
+
+def update_object(name: str, obj_type: str, content: Content, tags: str,
+                  description: Optional[str] = None,
+                  chunk_size: Optional[int] = None, compression: Optional[str] = None) -> bool:
+    """Store content as a new version; content identical to the current one only updates metadata."""
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
+            object_id = _find_object_id(cursor, name, obj_type) if _delta_candidate(content) else None
+            delta, base_version = _plan_delta(cursor, object_id, content)
+            content_hash, size = store_content(cursor, content, chunk_size, codec_mode(obj_type, compression))
             cursor.callproc(
-                "ora_lake_ops.update_object",
-                [name, obj_type, content, tags, description]
+                "ora_lake_ops.update_object_hashed",
+                [name, obj_type, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB), tags, description],
+                _delta_binds(delta, base_version)
             )
             conn.commit()
+            object_cache.invalidate_name(name, obj_type)
             logger.info(f"Object '{name}' updated successfully.")
             return True
     except Exception as e:
@@ -141,13 +970,17 @@ def update_object(name: str, obj_type: str, content: bytes, tags: str,
 
 def rollback_object(name: str, obj_type: str, version: int) -> bool:
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
+            object_id = _find_object_id(cursor, name, obj_type)
+            restore_args = _restore_args(cursor, object_id, version, codec_mode(obj_type))
             cursor.callproc(
                 "ora_lake_ops.rollback_object",
-                [name, obj_type, version]
+                [name, obj_type, version],
+                restore_args
             )
             conn.commit()
+            object_cache.invalidate_name(name, obj_type)
             logger.info(f"Rolled back '{name}' ({obj_type}) to version {version}.")
             return True
     except Exception as e:
@@ -0,0 +1,696 @@
+"""
+Asyncio variant of the OraLake service layer.
+
+Mirrors src.services.oralake on top of oracledb's async pool so that
+FastAPI handlers can await database round trips instead of blocking
+the event loop.
+"""
+
+from src import logger
+from src.database import acquire_async, async_idle_connections, connect_oracledb_async
+from src.config import settings
+from src.services.codecs import (
+    AUTO_SAMPLE_BYTES, ByteWindow, StreamDecoder, choose_codec, codec_mode, compress, compressor, decode
+)
+from src.services.object_cache import object_cache
+from src.services.single_flight import object_flights
+from src.services.oralake_core import (
+    CHUNK_SQL,
+    DEDUP_PROBE_MIN_BYTES,
+    DISCARD_CHUNKS_SQL,
+    HASH_READ_SIZE,
+    INSERT_BLOB_SQL,
+    INSERT_CHUNK_SQL,
+    INSERT_MANIFEST_SQL,
+    LIST_MAX_PAGE_SIZE,
+    LIST_PAGE_SIZE,
+    OBJECT_ID_SQL,
+    OBJECT_INFO_SQL,
+    OBJECT_LOB_SQL,
+    OBJECT_TYPE_SQL,
+    QUERY_ARRAYSIZE,
+    RENDITION_SQL,
+    SNAPSHOT_SQL,
+    VERSION_DELTA_SQL,
+    Manifest,
+    _apply_version_delta,
+    _chunk_count,
+    _chunk_span,
+    _chunkable,
+    _delta_binds,
+    _delta_candidate,
+    _delta_plan,
+    _encode_bytes,
+    _inline_lobs,
+    _inline_text,
+    _is_seekable,
+    _list_objects_query,
+    _list_page,
+    _lob_row,
+    _manifest_binds,
+    _read_size,
+    _restore_binds,
+    _snapshot_base,
+    _stored_hashes_sql,
+    _tag_query_sql,
+)
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import inspect
+import io
+import itertools
+import oracledb
+
+
+async def _read(content: Any, size: int) -> bytes:
+    """
+    Read from an awaitable reader such as UploadFile or SpooledUpload, or
+    from a plain file in a worker thread so disk reads never block the loop.
+    """
+    if inspect.iscoroutinefunction(content.read) or isinstance(content, io.BytesIO):
+        return await _maybe_await(content.read(size))
+    return await _maybe_await(await asyncio.to_thread(content.read, size))
+
+
+async def _aiter_source(content: Any, chunk_size: int) -> AsyncIterator[bytes]:
+    if hasattr(content, "read"):
+        # Works for plain files as well as awaitable readers such as UploadFile
+        while True:
+            piece = await _read(content, chunk_size)
+            if not piece:
+                break
+            yield piece
+    elif hasattr(content, "__aiter__"):
+        async for piece in content:
+            if piece:
+                yield piece
+    else:
+        for piece in content:
+            if piece:
+                yield piece
+
+
+async def _maybe_await(value):
+    return await value if inspect.isawaitable(value) else value
+
+
+async def _stream_to_lob(conn, content: Any, chunk_size: Optional[int] = None,
+                         digest=None, codec: Optional[str] = None) -> Tuple[Any, int]:
+    lob = await conn.createlob(oracledb.DB_TYPE_BLOB)
+    if chunk_size is None:
+        chunk_size = _read_size(await lob.getchunksize(), None)
+    comp = compressor(codec) if codec else None
+
+    offset = 1
+    size = 0
+    buffer = bytearray()
+    async for piece in _aiter_source(content, chunk_size):
+        size += len(piece)
+        if digest is not None:
+            digest.update(piece)
+        buffer += comp.compress(piece) if comp else piece
+        while len(buffer) >= chunk_size:
+            await lob.write(bytes(buffer[:chunk_size]), offset)
+            offset += chunk_size
+            del buffer[:chunk_size]
+    if comp:
+        buffer += comp.flush()
+    if buffer:
+        await lob.write(bytes(buffer), offset)
+    return lob, size
+
+
+async def _peek(content: Any, size: int) -> Tuple[bytes, Any]:
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return bytes(content[:size]), content
+    if _is_seekable(content):
+        position = await _maybe_await(content.tell()) if hasattr(content, "tell") else 0
+        head = await _read(content, size)
+        await _maybe_await(content.seek(position))
+        return head, content
+
+    pieces = _aiter_source(content, size)
+    head = await anext(pieces, b"")
+
+    async def replay():
+        if head:
+            yield head
+        async for piece in pieces:
+            yield piece
+    return head, replay()
+
+
+async def _encode_payload(conn, content: Any, mode: str,
+                          chunk_size: Optional[int] = None) -> Tuple[Optional[str], Any]:
+    sample, content = await _peek(content, AUTO_SAMPLE_BYTES)
+    codec, encoded = choose_codec(mode, sample)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return _encode_bytes(content, sample, codec, encoded)
+    return codec, (await _stream_to_lob(conn, content, chunk_size, codec=codec))[0]
+
+
+async def _digest_content(conn, content: Any, chunk_size: Optional[int] = None,
+                          mode: str = "none") -> Tuple[str, int, Callable[[], Awaitable[Tuple[Optional[str], Any]]]]:
+    """Async counterpart of oralake._digest_content; also rewinds UploadFile."""
+    if getattr(content, "content_hash", None) and _is_seekable(content):
+        return content.content_hash, content.size, lambda: _encode_payload(conn, content, mode, chunk_size)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        content_hash = hashlib.sha256(content).hexdigest()
+        return content_hash, len(content), lambda: _encode_payload(conn, content, mode, chunk_size)
+
+    digest = hashlib.sha256()
+    if _is_seekable(content):
+        position = await _maybe_await(content.tell()) if hasattr(content, "tell") else 0
+        size = 0
+        async for piece in _aiter_source(content, chunk_size or HASH_READ_SIZE):
+            digest.update(piece)
+            size += len(piece)
+        await _maybe_await(content.seek(position))
+        return digest.hexdigest(), size, lambda: _encode_payload(conn, content, mode, chunk_size)
+
+    sample, content = await _peek(content, AUTO_SAMPLE_BYTES)
+    codec, _ = choose_codec(mode, sample)
+    lob, size = await _stream_to_lob(conn, content, chunk_size, digest, codec)
+
+    async def spooled():
+        return codec, lob
+    return digest.hexdigest(), size, spooled
+
+
+async def _write_chunks(cursor, content_hash: str, content: Any, size: int,
+                        codec: Optional[str], chunk_size: int):
+    """
+    Async counterpart of oralake._write_chunks: the caller's connection and
+    the helper connections are concurrent tasks, and chunks are compressed
+    in worker threads.
+    """
+    numbers = iter(range(_chunk_count(size, chunk_size)))
+    lock = asyncio.Lock()
+    failed = []
+    in_memory = isinstance(content, (bytes, bytearray, memoryview))
+    position = 0 if in_memory else await _maybe_await(content.tell()) if hasattr(content, "tell") else 0
+
+    async def read(n: int) -> bytes:
+        if in_memory:
+            return bytes(memoryview(content)[n * chunk_size:(n + 1) * chunk_size])
+        async with lock:
+            await _maybe_await(content.seek(position + n * chunk_size))
+            return await _read(content, chunk_size)
+
+    async def work(conn):
+        writer = conn.cursor()
+        try:
+            while not failed:
+                chunk_no = next(numbers, None)
+                if chunk_no is None:
+                    return
+                data = await read(chunk_no)
+                if codec:
+                    data = await asyncio.to_thread(compress, codec, data)
+                writer.setinputsizes(content=oracledb.DB_TYPE_BLOB)
+                await writer.execute(INSERT_CHUNK_SQL, content_hash=content_hash, chunk_no=chunk_no, content=data)
+        except Exception as e:
+            failed.append(e)
+            raise
+
+    async def helper():
+        async with connect_oracledb_async() as conn:
+            await work(conn)
+            await conn.commit()
+
+    helpers = max(0, min(settings.chunk_parallelism - 1, async_idle_connections()))
+    results = await asyncio.gather(
+        work(cursor.connection), *(helper() for _ in range(helpers)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def _discard_chunks(content_hash: str):
+    try:
+        async with connect_oracledb_async() as conn:
+            await conn.cursor().execute(DISCARD_CHUNKS_SQL, [content_hash])
+            await conn.commit()
+    except Exception as e:
+        logger.warning(
+            f"Could not discard chunks of {content_hash[:12]}; they stay until a purge_blobs "
+            f"run finds them older than its grace period: {e}"
+        )
+
+
+async def _claim_blob(cursor, sql: str, binds: Dict) -> bool:
+    """Async counterpart of oralake._claim_blob."""
+    while True:
+        if "content" in binds:
+            cursor.setinputsizes(content=oracledb.DB_TYPE_BLOB)
+        try:
+            await cursor.execute(sql, binds)
+            return True
+        except oracledb.IntegrityError as e:
+            if e.args[0].code != 1:
+                raise
+        await cursor.execute(_stored_hashes_sql(1), [binds["content_hash"]])
+        if await cursor.fetchone():
+            return False
+
+
+async def _store_chunked(cursor, content_hash: str, content: Any, size: int, mode: str = "none"):
+    """Async counterpart of oralake._store_chunked."""
+    chunk_size = settings.chunk_bytes
+    sample, content = await _peek(content, AUTO_SAMPLE_BYTES)
+    codec, _ = choose_codec(mode, sample)
+    if not await _claim_blob(cursor, INSERT_MANIFEST_SQL, _manifest_binds(content_hash, size, codec, chunk_size)):
+        return
+
+    try:
+        await _write_chunks(cursor, content_hash, content, size, codec, chunk_size)
+    except Exception:
+        await _discard_chunks(content_hash)
+        raise
+    logger.info(f"Content {content_hash[:12]} stored as {_chunk_count(size, chunk_size)} chunks")
+
+
+async def _fetch_chunk(content_hash: str, chunk_no: int, codec: Optional[str]) -> bytes:
+    async with connect_oracledb_async() as conn:
+        cursor = conn.cursor()
+        cursor.outputtypehandler = _inline_lobs
+        await cursor.execute(CHUNK_SQL, content_hash=content_hash, chunk_no=chunk_no)
+        row = await cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Chunk {chunk_no} of blob {content_hash[:12]} is missing")
+    return await asyncio.to_thread(decode, codec, row[0]) if codec else row[0]
+
+
+async def _iter_chunks(manifest: Manifest, codec: Optional[str],
+                       offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Async counterpart of oralake._iter_chunks; chunks are fetched by concurrent tasks."""
+    span = _chunk_span(manifest.size, manifest.chunk_size, offset, length)
+    if not span:
+        return
+    window = ByteWindow(offset - span.start * manifest.chunk_size, length)
+    numbers = iter(span)
+    workers = max(1, min(settings.chunk_parallelism, async_idle_connections()))
+    pending = deque(
+        asyncio.ensure_future(_fetch_chunk(manifest.content_hash, chunk_no, codec))
+        for chunk_no in itertools.islice(numbers, workers)
+    )
+    try:
+        while pending:
+            data = await pending.popleft()
+            for chunk_no in itertools.islice(numbers, 1):
+                pending.append(asyncio.ensure_future(_fetch_chunk(manifest.content_hash, chunk_no, codec)))
+            piece = window.take(data)
+            if piece:
+                yield piece
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def read_chunked(content_hash: str, size: int, chunk_size: int, codec: Optional[str]) -> bytes:
+    """Async counterpart of oralake.read_chunked."""
+    return b"".join([piece async for piece in _iter_chunks(Manifest(content_hash, size, chunk_size), codec)])
+
+
+async def store_content(cursor, content: Any, chunk_size: Optional[int] = None,
+                         mode: str = "none") -> Tuple[str, int]:
+    """Async counterpart of oralake.store_content."""
+    content_hash, size, encode = await _digest_content(cursor.connection, content, chunk_size, mode)
+    if size >= DEDUP_PROBE_MIN_BYTES:
+        await cursor.execute(_stored_hashes_sql(1), [content_hash])
+        if await cursor.fetchone():
+            logger.info(f"Content {content_hash[:12]} already stored, adding a reference only")
+            return content_hash, size
+
+    if _chunkable(content, size):
+        await _store_chunked(cursor, content_hash, content, size, mode)
+        return content_hash, size
+
+    codec, payload = await encode()
+    await _claim_blob(cursor, INSERT_BLOB_SQL,
+                      {"content_hash": content_hash, "content": payload, "size_bytes": size, "codec": codec})
+    return content_hash, size
+
+
+async def add_object(name: str, obj_type: str, content: Any, tags: str,
+                     description: str = None, schema_hint: str = None,
+                     chunk_size: Optional[int] = None, compression: Optional[str] = None):
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            content_hash, size = await store_content(
+                cursor, content, chunk_size, codec_mode(obj_type, compression)
+            )
+            object_id = await cursor.callfunc(
+                "ora_lake_ops.add_object_hashed",
+                oracledb.NUMBER,
+                [name, obj_type, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB),
+                 tags, description, schema_hint]
+            )
+            await conn.commit()
+            logger.info(f"Object added with ID {object_id}")
+            return object_id
+    except Exception as e:
+        logger.error(f"Error Occurred at async add_object: {e}")
+        raise
+
+
+class AsyncObjectStream:
+    """Async counterpart of oralake.ObjectStream; release it with aclose() or async with."""
+
+    def __init__(self, conn, lob, codec: Optional[str], info: Dict, chunk_size: Optional[int] = None,
+                 offset: int = 0, length: Optional[int] = None):
+        self.info = info
+        self._conn = conn
+        self._lob = lob
+        self._codec = codec
+        self._chunk_size = chunk_size
+        self._offset = offset
+        self._length = length
+
+    @property
+    def version(self) -> int:
+        return self.info["version_num"]
+
+    def read_range(self, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        if isinstance(self._lob, Manifest):
+            return _iter_chunks(self._lob, self._codec, offset, length)
+        if self._conn is None:
+            raise ValueError("Object stream is closed")
+        if not self._codec:
+            return _read_lob_chunks(self._lob, self._chunk_size, offset, length)
+        return _adecode_stream(_read_lob_chunks(self._lob, self._chunk_size), self._codec, offset, length)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for piece in self.read_range(self._offset, self._length):
+                yield piece
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await conn.close()
+
+    async def __aenter__(self) -> "AsyncObjectStream":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def _open_object(object_id: int, chunk_size: Optional[int] = None,
+                       offset: int = 0, length: Optional[int] = None) -> Optional[AsyncObjectStream]:
+    """Async counterpart of oralake._open_object."""
+    conn = await acquire_async()
+    try:
+        cursor = conn.cursor()
+        cursor.outputtypehandler = _inline_text
+        await cursor.execute(OBJECT_LOB_SQL, id=object_id)
+        row = await cursor.fetchone()
+    except Exception:
+        await conn.close()
+        raise
+
+    opened = _lob_row(row)
+    if opened is None:
+        await conn.close()
+        logger.warning(f"Object with ID: {object_id} was not found")
+        return None
+    if isinstance(opened[0], Manifest):
+        # Chunks are fetched over connections of their own
+        await conn.close()
+        conn = None
+    return AsyncObjectStream(conn, *opened, chunk_size=chunk_size, offset=offset, length=length)
+
+
+async def _read_lob_chunks(lob, chunk_size: Optional[int],
+                           offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+    chunk_size = _read_size(await lob.getchunksize(), chunk_size)
+    size = await lob.size()
+    end = size if length is None else min(size, offset + length)
+    position = offset + 1
+    while position <= end:
+        data = await lob.read(position, min(chunk_size, end - position + 1))
+        if not data:
+            break
+        position += len(data)
+        yield data
+
+
+async def _adecode_stream(chunks: AsyncIterator[bytes], codec: str,
+                          offset: int, length: Optional[int]) -> AsyncIterator[bytes]:
+    """Async counterpart of codecs.decode_stream."""
+    decoder, window = StreamDecoder(codec), ByteWindow(offset, length)
+    try:
+        async for chunk in chunks:
+            for data in decoder.feed(chunk):
+                piece = window.take(data)
+                if piece:
+                    yield piece
+                if window.done:
+                    return
+        for data in decoder.finish():
+            piece = window.take(data)
+            if piece:
+                yield piece
+    finally:
+        await chunks.aclose()
+
+
+async def iter_object(object_id: int, chunk_size: Optional[int] = None,
+                      offset: int = 0, length: Optional[int] = None) -> Optional[AsyncObjectStream]:
+    """
+    Async counterpart of oralake.iter_object. Returns None if the object
+    does not exist, otherwise an AsyncObjectStream over the requested bytes.
+    """
+    try:
+        return await _open_object(object_id, chunk_size, offset, length)
+    except Exception as e:
+        logger.error(f"Error occured at async iter_object: {e}")
+        raise
+
+
+async def get_object_info(object_id: int) -> Optional[Dict]:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            cursor.outputtypehandler = _inline_lobs
+            await cursor.execute(OBJECT_INFO_SQL, id=object_id)
+
+            columns = [col[0].lower() for col in cursor.description]
+            row = await cursor.fetchone()
+            if row is None:
+                logger.warning(f"Object with ID: {object_id} was not found")
+                return None
+            return dict(zip(columns, row))
+    except Exception as e:
+        logger.error(f"Error occured at async get_object_info: {e}")
+        raise
+
+
+async def find_rendition(source_id: int, rendition_name: str) -> Optional[int]:
+    """Async find_rendition: only renditions of the source's current version."""
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(RENDITION_SQL, source_id=source_id, rendition_name=rendition_name)
+            row = await cursor.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Error occured at async find_rendition: {e}")
+        raise
+
+
+async def get_object(object_id: int) -> Optional[bytes]:
+    try:
+        stream = await _open_object(object_id)
+        if stream is None:
+            return None
+        version = stream.version
+
+        cached = object_cache.get(object_id, version) if object_cache.enabled else None
+        if cached is not None:
+            await stream.aclose()
+            logger.info(f"Object found in cache: {len(cached)} bytes")
+            return cached
+
+        async def fetch() -> bytes:
+            data = b"".join([chunk async for chunk in stream])
+            object_cache.put(object_id, version, data, stream.info["object_name"], stream.info["object_type"])
+            return data
+
+        blob_data, shared = await object_flights.do_async((object_id, version), fetch, on_wait=stream.aclose)
+        logger.info(f"Object found: {len(blob_data)} bytes{' (shared read)' if shared else ''}")
+        return blob_data
+    except Exception as e:
+        logger.error(f"Error occured at async get_object: {e}")
+        raise
+
+
+async def tag_object(object_id: int, tag: str, description: str = None, schema_hint: str = None) -> bool:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            await cursor.callproc(
+                "ora_lake_ops.tag_object",
+                [object_id, tag, description, schema_hint]
+            )
+            await conn.commit()
+            logger.info(f"Object with object_id {object_id} was tagged")
+            return True
+    except oracledb.DatabaseError as e:
+        if "ORA-02291" in str(e.args[0]):
+            logger.warning(f"Object with ID: {object_id} was not found")
+            return False
+        logger.error(f"Database Error occurred at async tag_object: {e}")
+        raise
+
+
+async def fetch_objects_by_tag(tag: str, include_content: bool = True,
+                               arraysize: int = QUERY_ARRAYSIZE,
+                               prefetchrows: Optional[int] = None) -> List[Dict]:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = arraysize
+            cursor.prefetchrows = arraysize if prefetchrows is None else prefetchrows
+            cursor.outputtypehandler = _inline_lobs
+            await cursor.execute(_tag_query_sql(include_content), tag=tag)
+
+            columns = [col[0].lower() for col in cursor.description]
+            cursor.rowfactory = lambda *row: dict(zip(columns, row))
+            objects = await cursor.fetchall()
+        if include_content:
+            # read_chunked takes pooled connections of its own
+            for obj in objects:
+                if obj["chunk_size"]:
+                    obj["content"] = await read_chunked(obj["content_hash"], obj["size_bytes"],
+                                                         obj["chunk_size"], obj["codec"])
+                else:
+                    obj["content"] = decode(obj["codec"], obj["content"])
+        logger.info(f"Fetched {len(objects)} objects for tag='{tag}'")
+        return objects
+    except Exception as e:
+        logger.error(f"Error occured at async fetch_objects_by_tag: {e}")
+        raise
+
+
+async def query_by_tag(tag: str) -> List[bytes]:
+    objects = await fetch_objects_by_tag(tag, include_content=True)
+    return [obj["content"] for obj in objects if obj["content"]]
+
+
+async def list_objects(tag: Optional[str] = None, obj_type: Optional[str] = None,
+                       created_after: Optional[datetime] = None, min_size: Optional[int] = None,
+                       limit: int = LIST_PAGE_SIZE, after_id: Optional[int] = None) -> Dict:
+    limit = max(1, min(limit, LIST_MAX_PAGE_SIZE))
+    sql, binds = _list_objects_query(tag, obj_type, created_after, min_size, limit, after_id)
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = limit + 1
+            cursor.prefetchrows = limit + 1
+            await cursor.execute(sql, binds)
+
+            columns = [col[0].lower() for col in cursor.description]
+            cursor.rowfactory = lambda *row: dict(zip(columns, row))
+            page = _list_page(await cursor.fetchall(), limit)
+            logger.info(f"Listed {len(page['objects'])} objects after id {after_id or 0}")
+            return page
+    except Exception as e:
+        logger.error(f"Error occured at async list_objects: {e}")
+        raise
+
+
+async def _find_object_id(cursor, name: str, obj_type: str) -> Optional[int]:
+    await cursor.execute(OBJECT_ID_SQL, name=name, obj_type=obj_type)
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def _object_type(cursor, object_id: int) -> Optional[str]:
+    await cursor.execute(OBJECT_TYPE_SQL, id=object_id)
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def _plan_delta(cursor, object_id: Optional[int], content: Any) -> Tuple[Optional[bytes], Optional[int]]:
+    """Async counterpart of oralake._plan_delta."""
+    if object_id is None or not _delta_candidate(content):
+        return None, None
+
+    await cursor.execute(SNAPSHOT_SQL, id=object_id)
+    base = _snapshot_base(await cursor.fetchone())
+    if base is None:
+        return None, None
+    base_version, lob, codec = base
+    return _delta_plan(object_id, base_version, decode(codec, await lob.read()), content)
+
+
+async def _rebuild_version(conn, object_id: int, version: int) -> Optional[bytes]:
+    cursor = conn.cursor()
+    cursor.outputtypehandler = _inline_lobs
+    await cursor.execute(VERSION_DELTA_SQL, id=object_id, version=version)
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return _apply_version_delta(object_id, version, row)
+
+
+async def _restore_args(cursor, object_id: Optional[int], version: int, mode: str = "none") -> Optional[Dict]:
+    if object_id is None:
+        return None
+    content = await _rebuild_version(cursor.connection, object_id, version)
+    if content is None:
+        return None
+    return _restore_binds(*await store_content(cursor, content, mode=mode))
+
+
+async def update_object(name: str, obj_type: str, content: Any, tags: str,
+                        description: Optional[str] = None,
+                        chunk_size: Optional[int] = None, compression: Optional[str] = None) -> bool:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            object_id = await _find_object_id(cursor, name, obj_type) if _delta_candidate(content) else None
+            delta, base_version = await _plan_delta(cursor, object_id, content)
+            content_hash, size = await store_content(
+                cursor, content, chunk_size, codec_mode(obj_type, compression)
+            )
+            await cursor.callproc(
+                "ora_lake_ops.update_object_hashed",
+                [name, obj_type, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB), tags, description],
+                _delta_binds(delta, base_version)
+            )
+            await conn.commit()
+            object_cache.invalidate_name(name, obj_type)
+            logger.info(f"Object '{name}' updated successfully.")
+            return True
+    except Exception as e:
+        logger.error(f"Error occurred at async update_object: {e}")
+        raise
+
+
+async def rollback_object(name: str, obj_type: str, version: int) -> bool:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            object_id = await _find_object_id(cursor, name, obj_type)
+            await cursor.callproc(
+                "ora_lake_ops.rollback_object",
+                [name, obj_type, version],
+                await _restore_args(cursor, object_id, version, codec_mode(obj_type))
+            )
+            await conn.commit()
+            object_cache.invalidate_name(name, obj_type)
+            logger.info(f"Rolled back '{name}' ({obj_type}) to version {version}.")
+            return True
+    except Exception as e:
+        logger.error(f"Error occurred at async rollback_object: {e}")
+        raise
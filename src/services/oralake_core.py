@@ -0,0 +1,400 @@
+"""
+SQL and pure planning logic shared by src.services.oralake and its asyncio
+counterpart src.services.oralake_async.
+
+Nothing here touches a connection: the two service modules only differ in
+how they run these statements and read LOBs, so a change to a query or to
+a storage decision is made once, here.
+"""
+
+from src import logger
+from src.config import settings
+from src.services.codecs import compress, decode
+from src.services.delta import apply_delta, encode_delta
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+import base64
+import hashlib
+import oracledb
+
+# Fallback when the server does not report a LOB chunk size
+DEFAULT_LOB_CHUNK_SIZE = 8132
+# Native LOB chunks fetched per round trip by iter_object
+LOB_CHUNKS_PER_READ = 32
+# Rows fetched per round trip by set-based queries
+QUERY_ARRAYSIZE = 100
+# Rows per executemany() call and commit in add_objects_many
+BATCH_SIZE = 100
+# Default and maximum page size for list_objects
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 1000
+# Payloads below this size are inserted without first probing ora_lake_blobs for their hash
+DEDUP_PROBE_MIN_BYTES = 64 * 1024
+# Read size when hashing a seekable file ahead of the upload
+HASH_READ_SIZE = 1024 * 1024
+# Content sizes for which a new version is delta-encoded against the latest
+# snapshot; diffing holds the decompressed base and the new content in memory
+DELTA_MIN_BYTES = 16 * 1024
+DELTA_MAX_BYTES = 4 * 1024 * 1024
+# Deltas larger than this fraction of the content are stored as a full snapshot instead
+DELTA_MAX_RATIO = 0.5
+
+# Objects and versions reference a shared blob by SHA-256; rows written
+# before deduplication still carry their content inline
+CONTENT_JOIN = "LEFT JOIN ora_lake_blobs b ON b.content_hash = o.content_hash"
+CONTENT_COLUMN = "NVL(b.content, o.content)"
+SIZE_COLUMN = "NVL(b.size_bytes, DBMS_LOB.GETLENGTH(o.content))"
+
+# Object content may be raw bytes, a binary file-like object or an iterable of byte chunks
+Content = Union[bytes, BinaryIO, Iterable[bytes]]
+
+
+INSERT_BLOB_SQL = """
+    INSERT INTO ora_lake_blobs (content_hash, content, size_bytes, codec, ref_count, created_at)
+    VALUES (:content_hash, :content, :size_bytes, :codec, 0, SYSTIMESTAMP)
+"""
+
+# One add_objects_many row; the blob is stored beforehand, so no content is passed
+ADD_OBJECT_ROW_SQL = """
+    BEGIN
+        ora_lake_ops.add_object_row(:name, :obj_type, :content_hash, :size_bytes, NULL,
+                                    :tags, :description, :schema_hint, :object_id, :error);
+    END;
+"""
+
+# Chunked blobs: the ora_lake_blobs row is the manifest, the pieces live in ora_lake_chunks
+INSERT_MANIFEST_SQL = """
+    INSERT INTO ora_lake_blobs (content_hash, size_bytes, codec, chunk_size, chunk_count, ref_count, created_at)
+    VALUES (:content_hash, :size_bytes, :codec, :chunk_size, :chunk_count, 0, SYSTIMESTAMP)
+"""
+
+INSERT_CHUNK_SQL = """
+    INSERT INTO ora_lake_chunks (content_hash, chunk_no, content)
+    VALUES (:content_hash, :chunk_no, :content)
+"""
+
+CHUNK_SQL = "SELECT content FROM ora_lake_chunks WHERE content_hash = :content_hash AND chunk_no = :chunk_no"
+
+DISCARD_CHUNKS_SQL = "DELETE FROM ora_lake_chunks WHERE content_hash = :1"
+
+INSERT_RENDITION_SQL = """
+    INSERT INTO ora_lake_renditions (source_id, rendition_name, object_id, source_version)
+    VALUES (:1, :2, :3, :4)
+"""
+
+# Only renditions derived from the source's current version are served
+RENDITION_SQL = """
+    SELECT r.object_id
+    FROM ora_lake_renditions r
+    JOIN ora_lake_objects o ON o.object_id = r.source_id
+    WHERE r.source_id = :source_id AND r.rendition_name = :rendition_name
+      AND r.source_version = o.version_num
+"""
+
+# Held until commit, so a rendition link cannot be added while the source changes version
+SOURCE_VERSION_LOCK_SQL = "SELECT version_num FROM ora_lake_objects WHERE object_id = :id FOR UPDATE"
+
+RENDITIONS_SQL = """
+    SELECT rendition_name, object_id FROM ora_lake_renditions
+    WHERE source_id = :source_id
+    ORDER BY rendition_name
+"""
+
+# The locator plus everything a content response needs for its headers and
+# conditional checks, so a 304 costs this one indexed lookup
+OBJECT_LOB_SQL = f"""
+    SELECT {CONTENT_COLUMN} AS content, b.codec, b.chunk_size,
+           o.object_id, o.version_num, o.object_name, o.object_type, o.content_hash,
+           {SIZE_COLUMN} AS size_bytes, o.updated_at, m.schema_hint
+    FROM ora_lake_objects o
+    {CONTENT_JOIN}
+    LEFT JOIN ora_lake_metadata m
+      ON m.meta_id = (SELECT MIN(meta_id) FROM ora_lake_metadata WHERE object_id = o.object_id)
+    WHERE o.object_id = :id
+"""
+
+OBJECT_INFO_SQL = f"""
+    SELECT o.object_id, o.object_name, o.object_type, o.version_num,
+           o.created_at, o.updated_at,
+           {SIZE_COLUMN} AS size_bytes, o.content_hash,
+           b.codec, b.chunk_count,
+           NVL(DBMS_LOB.GETLENGTH({CONTENT_COLUMN}),
+               (SELECT SUM(DBMS_LOB.GETLENGTH(c.content)) FROM ora_lake_chunks c
+                WHERE c.content_hash = b.content_hash)) AS stored_bytes,
+           m.tag, m.description, m.schema_hint
+    FROM ora_lake_objects o
+    {CONTENT_JOIN}
+    LEFT JOIN ora_lake_metadata m ON o.object_id = m.object_id
+    WHERE o.object_id = :id
+    ORDER BY m.meta_id
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+OBJECT_TYPE_SQL = "SELECT object_type FROM ora_lake_objects WHERE object_id = :id"
+
+OBJECT_ID_SQL = """
+    SELECT object_id FROM ora_lake_objects
+    WHERE object_name = :name AND object_type = :obj_type
+    ORDER BY created_at DESC
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+# Latest full snapshot of an object, plus its newest version number
+SNAPSHOT_SQL = """
+    SELECT s.version_num, NVL(b.content, s.content) AS content, b.codec,
+           NVL(b.size_bytes, DBMS_LOB.GETLENGTH(s.content)) AS size_bytes,
+           (SELECT MAX(version_num) FROM ora_lake_versions WHERE object_id = :id) AS latest_version
+    FROM ora_lake_versions s
+    LEFT JOIN ora_lake_blobs b ON b.content_hash = s.content_hash
+    WHERE s.object_id = :id AND s.delta_hash IS NULL
+    ORDER BY s.version_num DESC
+    FETCH FIRST 1 ROWS ONLY
+"""
+
+VERSION_DELTA_SQL = """
+    SELECT v.delta_hash, v.delta, NVL(b.content, s.content) AS base_content, b.codec AS base_codec
+    FROM ora_lake_versions v
+    JOIN ora_lake_versions s ON s.object_id = v.object_id AND s.version_num = v.delta_base
+    LEFT JOIN ora_lake_blobs b ON b.content_hash = s.content_hash
+    WHERE v.object_id = :id AND v.version_num = :version AND v.delta_hash IS NOT NULL
+"""
+
+VERSION_CONTENT_SQL = """
+    SELECT NVL(b.content, v.content) AS content, b.codec, b.content_hash, b.size_bytes, b.chunk_size
+    FROM ora_lake_versions v
+    LEFT JOIN ora_lake_blobs b ON b.content_hash = v.content_hash
+    WHERE v.object_id = :id AND v.version_num = :version
+"""
+
+
+def _stored_hashes_sql(count: int) -> str:
+    # The rows found stay locked until the caller commits, so a concurrent
+    # release_blob cannot delete them before the caller adds its references
+    placeholders = ", ".join(f":{i + 1}" for i in range(count))
+    return f"SELECT content_hash FROM ora_lake_blobs WHERE content_hash IN ({placeholders}) FOR UPDATE"
+
+
+class Manifest:
+    """Stands in for the LOB locator of a blob stored as chunk rows."""
+
+    def __init__(self, content_hash: str, size: int, chunk_size: int):
+        self.content_hash = content_hash
+        self.size = size
+        self.chunk_size = chunk_size
+
+
+def _is_seekable(content: Content) -> bool:
+    # UploadFile exposes awaitable read/seek without seekable()
+    if not hasattr(content, "read") or not hasattr(content, "seek"):
+        return False
+    return content.seekable() if hasattr(content, "seekable") else True
+
+
+def _chunkable(content: Content, size: int) -> bool:
+    """Large payloads that can be re-read at any offset are stored in chunks."""
+    if not 0 < settings.chunked_min_bytes <= size:
+        return False
+    return isinstance(content, (bytes, bytearray, memoryview)) or _is_seekable(content)
+
+
+def _chunk_count(size: int, chunk_size: int) -> int:
+    return -(-size // chunk_size)
+
+
+def _chunk_span(size: int, chunk_size: int, offset: int = 0, length: Optional[int] = None) -> range:
+    """Numbers of the chunks covering the byte range [offset, offset + length)."""
+    end = size if length is None else min(size, offset + length)
+    if offset >= end:
+        return range(0)
+    return range(offset // chunk_size, (end - 1) // chunk_size + 1)
+
+
+def _manifest_binds(content_hash: str, size: int, codec: Optional[str], chunk_size: int) -> Dict:
+    return {"content_hash": content_hash, "size_bytes": size, "codec": codec,
+            "chunk_size": chunk_size, "chunk_count": _chunk_count(size, chunk_size)}
+
+
+def _encode_bytes(content: bytes, sample: bytes, codec: Optional[str],
+                  encoded: Optional[bytes]) -> Tuple[Optional[str], Any]:
+    """(codec, value to bind) for in-memory content, reusing the sample's encoding when it is the whole payload."""
+    if codec is None:
+        return None, content
+    if len(sample) == len(content):
+        return codec, encoded
+    return codec, compress(codec, bytes(content))
+
+
+def _read_size(native: Optional[int], chunk_size: Optional[int]) -> int:
+    """LOB read size: chunk_size rounded up to whole native LOB chunks."""
+    native = native or DEFAULT_LOB_CHUNK_SIZE
+    if chunk_size is None:
+        return native * LOB_CHUNKS_PER_READ
+    return max(1, -(-chunk_size // native)) * native
+
+
+# get_object_info keys of the OBJECT_LOB_SQL columns after content, codec and chunk_size
+LOB_INFO_COLUMNS = (
+    "object_id", "version_num", "object_name", "object_type", "content_hash", "size_bytes", "updated_at",
+    "schema_hint",
+)
+
+
+def _lob_row(row) -> Optional[Tuple[Any, Optional[str], Dict]]:
+    """
+    (lob, codec, info) from an OBJECT_LOB_SQL row, where lob is the blob's
+    Manifest for chunked content and info holds the row's id, version,
+    name, type, content hash, size, update time and schema hint under
+    get_object_info's keys;
+    None if the object does not exist or has no content.
+    """
+    if row is None:
+        return None
+    lob, codec, chunk_size = row[:3]
+    info = dict(zip(LOB_INFO_COLUMNS, row[3:]))
+    if lob is None and chunk_size is not None:
+        lob = Manifest(info["content_hash"], info["size_bytes"], chunk_size)
+    if lob is None:
+        return None
+    return lob, codec, info
+
+
+def _inline_text(cursor, metadata):
+    """Output type handler that fetches CLOB columns as str, leaving BLOB locators alone."""
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def _inline_lobs(cursor, metadata):
+    """Output type handler that fetches LOB columns as bytes/str in the row itself."""
+    if metadata.type_code is oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def _tag_query_sql(include_content: bool) -> str:
+    content_column = f", {CONTENT_COLUMN} AS content" if include_content else ""
+    return f"""
+        SELECT o.object_id, o.object_name, o.object_type, o.version_num,
+               o.created_at, o.updated_at,
+               {SIZE_COLUMN} AS size_bytes, b.codec, b.content_hash, b.chunk_size,
+               m.description, m.schema_hint{content_column}
+        FROM ora_lake_objects o
+        {CONTENT_JOIN}
+        JOIN ora_lake_metadata m ON o.object_id = m.object_id
+        WHERE m.tag = :tag
+        ORDER BY o.object_id
+    """
+
+
+def encode_cursor(after_id: int) -> str:
+    """Opaque page cursor handed to API clients."""
+    return base64.urlsafe_b64encode(f"id:{after_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(value)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+
+
+def _list_objects_query(tag: Optional[str], obj_type: Optional[str],
+                        created_after: Optional[datetime], min_size: Optional[int],
+                        limit: int, after_id: Optional[int]):
+    """
+    Keyset-paginated listing over the object id primary key. Only stored
+    sizes are consulted, never the content itself.
+    """
+    conditions = ["o.object_id > :after_id"]
+    binds = {"after_id": after_id or 0, "page_rows": limit + 1}
+    if tag is not None:
+        conditions.append(
+            "EXISTS (SELECT 1 FROM ora_lake_metadata m WHERE m.object_id = o.object_id AND m.tag = :tag)"
+        )
+        binds["tag"] = tag
+    if obj_type is not None:
+        conditions.append("o.object_type = :obj_type")
+        binds["obj_type"] = obj_type
+    if created_after is not None:
+        conditions.append("o.created_at > :created_after")
+        binds["created_after"] = created_after
+    if min_size is not None:
+        conditions.append(f"{SIZE_COLUMN} >= :min_size")
+        binds["min_size"] = min_size
+
+    sql = f"""
+        SELECT o.object_id, o.object_name, o.object_type, o.version_num,
+               o.created_at, o.updated_at,
+               {SIZE_COLUMN} AS size_bytes
+        FROM ora_lake_objects o
+        {CONTENT_JOIN}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY o.object_id
+        FETCH FIRST :page_rows ROWS ONLY
+    """
+    return sql, binds
+
+
+def _list_page(rows: List[Dict], limit: int) -> Dict:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "objects": rows,
+        "next_cursor": encode_cursor(rows[-1]["object_id"]) if has_more else None,
+    }
+
+
+def _delta_candidate(content: Content) -> bool:
+    return isinstance(content, (bytes, bytearray, memoryview)) and \
+        DELTA_MIN_BYTES <= len(content) <= DELTA_MAX_BYTES
+
+
+def _snapshot_base(row) -> Optional[Tuple[int, Any, Optional[str]]]:
+    """
+    (base version, LOB, codec) of a SNAPSHOT_SQL row to diff the next
+    version against, or None to store that version as a full snapshot:
+    there is no inline snapshot, it is larger than DELTA_MAX_BYTES once
+    decompressed, or settings.version_snapshot_interval versions have
+    passed since it.
+    """
+    if row is None or row[1] is None:
+        return None
+    base_version, lob, codec, size, latest_version = row
+    if size > DELTA_MAX_BYTES:
+        return None
+    if latest_version + 1 - base_version >= settings.version_snapshot_interval:
+        return None
+    return base_version, lob, codec
+
+
+def _delta_plan(object_id: int, base_version: int, base: bytes,
+                content: Content) -> Tuple[Optional[bytes], Optional[int]]:
+    """(delta, base_version), or (None, None) when the delta would not be small enough to pay off."""
+    delta = encode_delta(base, bytes(content))
+    if len(delta) > len(content) * DELTA_MAX_RATIO:
+        return None, None
+    logger.info(f"Storing object {object_id} version as a {len(delta)} byte delta on version {base_version}")
+    return delta, base_version
+
+
+def _apply_version_delta(object_id: int, version: int, row) -> bytes:
+    """Rebuild a version from a VERSION_DELTA_SQL row and verify it against its content hash."""
+    delta_hash, delta, base, base_codec = row
+    content = apply_delta(decode(base_codec, base) or b"", delta)
+    if hashlib.sha256(content).hexdigest() != delta_hash:
+        raise ValueError(f"Version {version} of object {object_id} failed its content hash check")
+    return content
+
+
+def _restore_binds(content_hash: str, size: int) -> Dict:
+    """Keyword arguments handing a rebuilt delta version to restore_version/rollback_object."""
+    return {"p_hash": content_hash, "p_size": size}
+
+
+def _delta_binds(delta: Optional[bytes], base_version: Optional[int]) -> Optional[Dict]:
+    return {"p_delta": delta, "p_delta_base": base_version} if delta else None
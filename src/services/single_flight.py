@@ -0,0 +1,90 @@
+"""
+Request coalescing for concurrent reads.
+
+While a call for a key is in flight, further callers with the same key wait
+for it and share its result (or exception) instead of running their own.
+Threads and asyncio tasks are tracked separately, so each side only ever
+waits the way it normally would.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           on_wait: Optional[Callable[[], Any]] = None) -> Tuple[Any, bool]:
+        """
+        Return (fn(), shared). Only the first caller for key runs fn; callers
+        arriving while it runs call on_wait (e.g. to release a connection),
+        block until it finishes and get shared=True.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                       on_wait: Optional[Callable[[], Awaitable[Any]]] = None) -> Tuple[Any, bool]:
+        """
+        Async counterpart of do(). fn runs in a task of its own, so a
+        cancelled caller neither cancels nor fails the others.
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+            if on_wait is not None:
+                await on_wait()
+        else:
+            self.calls += 1
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "shared": self.shared}
+
+
+# Concurrent full reads of the same (object_id, version)
+object_flights = SingleFlight()
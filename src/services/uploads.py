@@ -0,0 +1,283 @@
+"""
+Staging area for resumable multipart uploads.
+
+Each session is a directory under settings.upload_staging_dir holding a
+session.json with the target object's name, type and metadata, plus one
+file per received part named <part number>.<sha256>.part. Parts are written
+under a temporary name and renamed into place, so a part is either
+complete or absent, and sending a part again replaces it: of several files
+for one part number, the one renamed into place last wins. Clients can
+upload parts in any order and in parallel, and resume by listing the parts
+already received.
+"""
+
+from src import logger
+from src.config import settings
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+import asyncio
+import bisect
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+MAX_PART_NUMBER = 10000
+SESSION_FILE = "session.json"
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_PART_FILE = re.compile(r"^(\d{5})\.([0-9a-f]{64})\.part$")
+
+
+class UploadNotFound(LookupError):
+    pass
+
+
+class InvalidPart(ValueError):
+    pass
+
+
+def _session_dir(upload_id: str) -> str:
+    # The id becomes a path component, so only accept what create_upload hands out
+    path = os.path.join(settings.upload_staging_dir, upload_id) if _UPLOAD_ID.match(upload_id) else None
+    if path is None or not os.path.isfile(os.path.join(path, SESSION_FILE)):
+        raise UploadNotFound(f"Upload {upload_id} was not found")
+    return path
+
+
+def _part_rank(path: str, entry: str) -> Tuple[int, str]:
+    """
+    Order of the files of one part number: the file renamed into place last
+    wins, by the mtime write_part stamps just before renaming, with the name
+    breaking ties so every reader picks the same file.
+    """
+    try:
+        return os.stat(os.path.join(path, entry)).st_mtime_ns, entry
+    except FileNotFoundError:
+        # Superseded and removed meanwhile
+        return -1, entry
+
+
+def _part_files(path: str) -> Dict[int, List[str]]:
+    """Part number -> file names of that part, the current one last."""
+    files = {}
+    for entry in os.listdir(path):
+        match = _PART_FILE.match(entry)
+        if match:
+            files.setdefault(int(match.group(1)), []).append(entry)
+    for entries in files.values():
+        if len(entries) > 1:
+            entries.sort(key=lambda entry: _part_rank(path, entry))
+    return files
+
+
+def _parts(path: str) -> Dict[int, Tuple[str, str]]:
+    """Part number -> (file name, sha256) of the parts received so far."""
+    return {
+        number: (entries[-1], _PART_FILE.match(entries[-1]).group(2))
+        for number, entries in _part_files(path).items()
+    }
+
+
+def _place_part(path: str, temp_path: str, part_number: int, etag: str):
+    """Rename a written part into place and remove the files it supersedes."""
+    entry = f"{part_number:05d}.{etag}.part"
+    # Stamp the rename time, which decides between parallel uploads of one part
+    os.utime(temp_path)
+    os.replace(temp_path, os.path.join(path, entry))
+
+    entries = _part_files(path).get(part_number, [])
+    # Only files ranked below the newest seen here: they lose to any file placed later too
+    for other in entries[:-1]:
+        try:
+            os.remove(os.path.join(path, other))
+        except FileNotFoundError:
+            pass
+    if entries and entries[-1] != entry:
+        logger.info(f"Part {part_number} ({etag[:12]}) was superseded by a later upload of the part")
+
+
+def expire_uploads():
+    """Remove sessions untouched for settings.upload_expiry_hours."""
+    root = settings.upload_staging_dir
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - settings.upload_expiry_hours * 3600
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        try:
+            if _UPLOAD_ID.match(entry) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Expired upload session {entry}")
+        except OSError:
+            continue
+
+
+def create_upload(name: str, obj_type: str, tags: str = "", description: Optional[str] = None,
+                  schema_hint: Optional[str] = None) -> str:
+    expire_uploads()
+    upload_id = uuid.uuid4().hex
+    path = os.path.join(settings.upload_staging_dir, upload_id)
+    os.makedirs(path)
+    session = {
+        "upload_id": upload_id,
+        "name": name,
+        "obj_type": obj_type,
+        "tags": tags,
+        "description": description,
+        "schema_hint": schema_hint,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(path, SESSION_FILE), "w") as f:
+        json.dump(session, f)
+    logger.info(f"Upload session {upload_id} started for '{name}' ({obj_type})")
+    return upload_id
+
+
+def get_upload(upload_id: str) -> Dict:
+    """The session with its received parts, ordered by part number."""
+    path = _session_dir(upload_id)
+    with open(os.path.join(path, SESSION_FILE)) as f:
+        session = json.load(f)
+    session["parts"] = [
+        {
+            "part_number": number,
+            "etag": etag,
+            "size": os.path.getsize(os.path.join(path, entry)),
+        }
+        for number, (entry, etag) in sorted(_parts(path).items())
+    ]
+    return session
+
+
+async def write_part(upload_id: str, part_number: int, chunks: AsyncIterable[bytes]) -> Dict:
+    """
+    Stream one part to disk and return its number, size and etag (the
+    SHA-256 of the part). A part larger than settings.upload_part_max_bytes
+    is rejected with InvalidPart.
+    """
+    if not 1 <= part_number <= MAX_PART_NUMBER:
+        raise InvalidPart(f"Part number must be between 1 and {MAX_PART_NUMBER}")
+    path = _session_dir(upload_id)
+
+    temp_path = os.path.join(path, f".{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        # File I/O runs on worker threads, keeping the event loop free
+        f = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.upload_part_max_bytes:
+                    raise InvalidPart(f"Part exceeds {settings.upload_part_max_bytes} bytes")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+        etag = digest.hexdigest()
+        await asyncio.to_thread(_place_part, path, temp_path, part_number, etag)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    logger.info(f"Upload {upload_id}: part {part_number} received ({size} bytes)")
+    return {"part_number": part_number, "etag": etag, "size": size}
+
+
+class PartsReader(io.RawIOBase):
+    """Seekable read-only view of part files laid end to end."""
+
+    def __init__(self, paths: List[str]):
+        self._paths = paths
+        self._starts = []
+        total = 0
+        for path in paths:
+            self._starts.append(total)
+            total += os.path.getsize(path)
+        self._size = total
+        self._position = 0
+        self._index = None
+        self._file = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def _open(self, index: int):
+        if self._index != index:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._paths[index], "rb")
+            self._index = index
+        return self._file
+
+    def readinto(self, buffer) -> int:
+        # Fill the whole buffer across part boundaries; callers rely on full reads before EOF
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view) and self._position < self._size:
+            index = bisect.bisect_right(self._starts, self._position) - 1
+            f = self._open(index)
+            f.seek(self._position - self._starts[index])
+            count = f.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+            self._position += count
+        return filled
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+
+def open_parts(upload_id: str, parts: Optional[List[Dict]] = None) -> Tuple[Dict, PartsReader]:
+    """
+    Return the session and a reader over the parts to assemble. parts is an
+    ascending list of {"part_number", "etag"}; without it every received
+    part is used. The part files are read in place, never copied.
+    """
+    path = _session_dir(upload_id)
+    session = get_upload(upload_id)
+    received = _parts(path)
+    if not received:
+        raise InvalidPart("No parts have been uploaded")
+
+    if parts is None:
+        numbers = sorted(received)
+    else:
+        numbers = [part["part_number"] for part in parts]
+        if numbers != sorted(set(numbers)):
+            raise InvalidPart("Parts must be listed once each in ascending order")
+        for part in parts:
+            stored = received.get(part["part_number"])
+            if stored is None:
+                raise InvalidPart(f"Part {part['part_number']} has not been uploaded")
+            if part.get("etag") and part["etag"] != stored[1]:
+                raise InvalidPart(f"Part {part['part_number']} does not match its etag")
+
+    return session, PartsReader([os.path.join(path, received[number][0]) for number in numbers])
+
+
+def abort_upload(upload_id: str):
+    shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
+    logger.info(f"Upload session {upload_id} removed")
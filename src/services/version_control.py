@@ -1,13 +1,66 @@
 from src import logger
-from src.database import pool
+from src.database import connect_oracledb
+from src.services.codecs import codec_mode, decode
+from src.services.oralake import read_chunked, store_content
+from src.services.oralake_core import (
+    OBJECT_TYPE_SQL, SNAPSHOT_SQL, VERSION_CONTENT_SQL, VERSION_DELTA_SQL, Content,
+    _apply_version_delta, _delta_binds, _delta_candidate, _delta_plan, _inline_lobs, _restore_binds,
+    _snapshot_base,
+)
+from src.services.object_cache import object_cache
+from typing import Dict, Optional, Tuple
 import oracledb
 
-def create_new_version(object_id: int, content: bytes):
+
+def _object_type(cursor, object_id: int) -> Optional[str]:
+    cursor.execute(OBJECT_TYPE_SQL, id=object_id)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _plan_delta(cursor, object_id: int, content: Content) -> Tuple[Optional[bytes], Optional[int]]:
+    """(delta, base_version) for the next version of object_id, as oralake._plan_delta."""
+    if not _delta_candidate(content):
+        return None, None
+    cursor.execute(SNAPSHOT_SQL, id=object_id)
+    base = _snapshot_base(cursor.fetchone())
+    if base is None:
+        return None, None
+    base_version, lob, codec = base
+    return _delta_plan(object_id, base_version, decode(codec, lob.read()), content)
+
+
+def _rebuild_version(cursor, object_id: int, version: int) -> Optional[bytes]:
+    """Content of a delta-encoded version; None if it is stored in full."""
+    cursor.outputtypehandler = _inline_lobs
+    cursor.execute(VERSION_DELTA_SQL, id=object_id, version=version)
+    row = cursor.fetchone()
+    return _apply_version_delta(object_id, version, row) if row else None
+
+
+def _restore_args(cursor, object_id: int, version: int) -> Optional[Dict]:
+    """Binds handing a rebuilt delta version to ora_lake_version_ops.restore_version."""
+    mode = codec_mode(_object_type(cursor, object_id))
+    content = _rebuild_version(cursor.connection.cursor(), object_id, version)
+    if content is None:
+        return None
+    return _restore_binds(*store_content(cursor, content, mode=mode))
+
+
+def create_new_version(object_id: int, content: Content, compression: Optional[str] = None):
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
-            cursor.callproc("ora_lake_version_ops.create_new_version", [object_id, content])
+            mode = codec_mode(_object_type(cursor, object_id), compression)
+            delta, base_version = _plan_delta(cursor, object_id, content)
+            content_hash, size = store_content(cursor, content, mode=mode)
+            cursor.callproc(
+                "ora_lake_version_ops.create_new_version_hashed",
+                [object_id, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB)],
+                _delta_binds(delta, base_version)
+            )
             conn.commit()
+            object_cache.invalidate(object_id)
             logger.info(f"New version created for object_id={object_id}")
     except Exception as e:
         logger.error(f"Error at create_new_version: {e}")
@@ -16,7 +69,7 @@ def create_new_version(object_id: int, content: bytes):
 
 def get_version_history(object_id: int):
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
             ref_cursor = cursor.callfunc(
                 "ora_lake_version_ops.get_version_history",
@@ -31,12 +84,40 @@ def get_version_history(object_id: int):
         raise
 
 
+def get_version_content(object_id: int, version_number: int) -> Optional[bytes]:
+    """Content of one version, rebuilt from its snapshot if it is delta-encoded."""
+    try:
+        with connect_oracledb() as conn:
+            cursor = conn.cursor()
+            content = _rebuild_version(cursor, object_id, version_number)
+            if content is not None:
+                return content
+
+            cursor.execute(VERSION_CONTENT_SQL, id=object_id, version=version_number)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        content, codec, content_hash, size, chunk_size = row
+        if chunk_size:
+            # Read with the version's connection released; chunks take their own
+            return read_chunked(content_hash, size, chunk_size, codec)
+        return decode(codec, content)
+    except Exception as e:
+        logger.error(f"Error at get_version_content: {e}")
+        raise
+
+
 def restore_version(object_id: int, version_number: int):
     try:
-        with pool.acquire() as conn:
+        with connect_oracledb() as conn:
             cursor = conn.cursor()
-            cursor.callproc("ora_lake_version_ops.restore_version", [object_id, version_number])
+            cursor.callproc(
+                "ora_lake_version_ops.restore_version",
+                [object_id, version_number],
+                _restore_args(cursor, object_id, version_number)
+            )
             conn.commit()
+            object_cache.invalidate(object_id)
             logger.info(f"Restored object_id={object_id} to version {version_number}")
     except Exception as e:
         logger.error(f"Error at restore_version: {e}")
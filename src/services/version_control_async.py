@@ -0,0 +1,128 @@
+from src import logger
+from src.database import connect_oracledb_async
+from src.services.codecs import codec_mode, decode
+from src.services.oralake_async import read_chunked, store_content
+from src.services.oralake_core import (
+    OBJECT_TYPE_SQL, SNAPSHOT_SQL, VERSION_CONTENT_SQL, VERSION_DELTA_SQL,
+    _apply_version_delta, _delta_binds, _delta_candidate, _delta_plan, _inline_lobs, _restore_binds,
+    _snapshot_base,
+)
+from typing import Any, Dict, Optional, Tuple
+from src.services.object_cache import object_cache
+import asyncio
+import oracledb
+
+
+async def _object_type(cursor, object_id: int) -> Optional[str]:
+    await cursor.execute(OBJECT_TYPE_SQL, id=object_id)
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def _plan_delta(cursor, object_id: int, content: Any) -> Tuple[Optional[bytes], Optional[int]]:
+    """Async counterpart of version_control._plan_delta; the diff is computed in a worker thread."""
+    if not _delta_candidate(content):
+        return None, None
+    await cursor.execute(SNAPSHOT_SQL, id=object_id)
+    base = _snapshot_base(await cursor.fetchone())
+    if base is None:
+        return None, None
+    base_version, lob, codec = base
+    base_bytes = await lob.read()
+    return await asyncio.to_thread(
+        lambda: _delta_plan(object_id, base_version, decode(codec, base_bytes), content)
+    )
+
+
+async def _rebuild_version(cursor, object_id: int, version: int) -> Optional[bytes]:
+    """Async counterpart of version_control._rebuild_version; the delta is applied in a worker thread."""
+    cursor.outputtypehandler = _inline_lobs
+    await cursor.execute(VERSION_DELTA_SQL, id=object_id, version=version)
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return await asyncio.to_thread(_apply_version_delta, object_id, version, row)
+
+
+async def _restore_args(cursor, object_id: int, version: int) -> Optional[Dict]:
+    mode = codec_mode(await _object_type(cursor, object_id))
+    content = await _rebuild_version(cursor.connection.cursor(), object_id, version)
+    if content is None:
+        return None
+    return _restore_binds(*await store_content(cursor, content, mode=mode))
+
+
+async def create_new_version(object_id: int, content: Any, compression: Optional[str] = None):
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            mode = codec_mode(await _object_type(cursor, object_id), compression)
+            delta, base_version = await _plan_delta(cursor, object_id, content)
+            content_hash, size = await store_content(cursor, content, mode=mode)
+            await cursor.callproc(
+                "ora_lake_version_ops.create_new_version_hashed",
+                [object_id, content_hash, size, cursor.var(oracledb.DB_TYPE_BLOB)],
+                _delta_binds(delta, base_version)
+            )
+            await conn.commit()
+            object_cache.invalidate(object_id)
+            logger.info(f"New version created for object_id={object_id}")
+    except Exception as e:
+        logger.error(f"Error at async create_new_version: {e}")
+        raise
+
+
+async def get_version_history(object_id: int):
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            ref_cursor = await cursor.callfunc(
+                "ora_lake_version_ops.get_version_history",
+                oracledb.CURSOR,
+                [object_id]
+            )
+            versions = await ref_cursor.fetchall()
+            logger.info(f"Fetched {len(versions)} versions for object_id={object_id}")
+            return versions
+    except Exception as e:
+        logger.error(f"Error at async get_version_history: {e}")
+        raise
+
+
+async def get_version_content(object_id: int, version_number: int) -> Optional[bytes]:
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            content = await _rebuild_version(cursor, object_id, version_number)
+            if content is not None:
+                return content
+
+            await cursor.execute(VERSION_CONTENT_SQL, id=object_id, version=version_number)
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        content, codec, content_hash, size, chunk_size = row
+        if chunk_size:
+            # Read with the version's connection released; chunks take their own
+            return await read_chunked(content_hash, size, chunk_size, codec)
+        return await asyncio.to_thread(decode, codec, content) if codec else content
+    except Exception as e:
+        logger.error(f"Error at async get_version_content: {e}")
+        raise
+
+
+async def restore_version(object_id: int, version_number: int):
+    try:
+        async with connect_oracledb_async() as conn:
+            cursor = conn.cursor()
+            await cursor.callproc(
+                "ora_lake_version_ops.restore_version",
+                [object_id, version_number],
+                await _restore_args(cursor, object_id, version_number)
+            )
+            await conn.commit()
+            object_cache.invalidate(object_id)
+            logger.info(f"Restored object_id={object_id} to version {version_number}")
+    except Exception as e:
+        logger.error(f"Error at async restore_version: {e}")
+        raise
@@ -34,6 +34,9 @@ BEGIN
     DBMS_OUTPUT.PUT_LINE('Deleted ' || v_count || ' object records');
     
     COMMIT;
+
+    -- Drop blobs no longer referenced by any object or version
+    ora_lake_ops.purge_blobs;
     DBMS_OUTPUT.PUT_LINE('Cleanup complete!');
     
 EXCEPTION
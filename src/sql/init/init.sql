@@ -1,4 +1,50 @@
 CREATE OR REPLACE PACKAGE ora_lake_ops AS
+  -- Content-addressed blob store (SHA-256, reference counted)
+  FUNCTION content_hash(p_content BLOB) RETURN VARCHAR2;
+
+  PROCEDURE retain_blob(
+    p_hash     VARCHAR2,
+    p_size     NUMBER,
+    p_content  BLOB,
+    p_refs     NUMBER DEFAULT 1
+  );
+
+  PROCEDURE release_blob(p_hash VARCHAR2, p_refs NUMBER DEFAULT 1);
+
+  -- Recount blob references and delete unreferenced blobs, plus the chunks
+  -- of failed writes once they are older than p_grace_hours
+  PROCEDURE purge_blobs(p_grace_hours NUMBER DEFAULT 24);
+
+  -- Delete an object with its versions, metadata and rendition objects,
+  -- releasing their blobs
+  PROCEDURE delete_object(p_id NUMBER);
+
+  -- Insert one object without committing; a failed row is rolled back and
+  -- reported through p_error instead of raising
+  PROCEDURE add_object_row(
+    p_name         VARCHAR2,
+    p_type         VARCHAR2,
+    p_hash         VARCHAR2,
+    p_size         NUMBER,
+    p_content      BLOB,
+    p_tags         CLOB,
+    p_description  CLOB,
+    p_schema_hint  CLOB,
+    p_id           OUT NUMBER,
+    p_error        OUT VARCHAR2
+  );
+
+  FUNCTION add_object_hashed(
+    p_name         VARCHAR2,
+    p_type         VARCHAR2,
+    p_hash         VARCHAR2,
+    p_size         NUMBER,
+    p_content      BLOB,
+    p_tags         CLOB DEFAULT NULL,
+    p_description  CLOB DEFAULT NULL,
+    p_schema_hint  CLOB DEFAULT NULL
+  ) RETURN NUMBER;
+
   FUNCTION add_object(
     p_name         VARCHAR2,
     p_type         VARCHAR2,
@@ -19,8 +65,31 @@ CREATE OR REPLACE PACKAGE ora_lake_ops AS
 
   FUNCTION query_objects_by_tag(p_tag VARCHAR2) RETURN SYS_REFCURSOR;
 
+  -- Version changes (increment_version, add_version, restore_version) also
+  -- delete the object's renditions of other versions
   PROCEDURE increment_version(p_id NUMBER);
 
+  PROCEDURE add_version(
+      p_id         IN NUMBER,
+      p_hash       IN VARCHAR2,
+      p_size       IN NUMBER,
+      p_content    IN BLOB,
+      p_delta      IN BLOB DEFAULT NULL,
+      p_delta_base IN NUMBER DEFAULT NULL
+  );
+
+  PROCEDURE update_object_hashed(
+      p_name        IN VARCHAR2,
+      p_obj_type    IN VARCHAR2,
+      p_hash        IN VARCHAR2,
+      p_size        IN NUMBER,
+      p_content     IN BLOB,
+      p_tags        IN VARCHAR2,
+      p_description IN VARCHAR2,
+      p_delta       IN BLOB DEFAULT NULL,
+      p_delta_base  IN NUMBER DEFAULT NULL
+  );
+
   PROCEDURE update_object(
       p_name        IN VARCHAR2,
       p_obj_type    IN VARCHAR2,
@@ -29,10 +98,21 @@ CREATE OR REPLACE PACKAGE ora_lake_ops AS
       p_description IN VARCHAR2
   );
 
+  PROCEDURE restore_version(
+      p_id             NUMBER,
+      p_target_version NUMBER,
+      p_hash           VARCHAR2 DEFAULT NULL,
+      p_size           NUMBER DEFAULT NULL,
+      p_content        BLOB DEFAULT NULL
+  );
+
   PROCEDURE rollback_object(
       p_name           IN VARCHAR2,
       p_obj_type       IN VARCHAR2,
-      p_target_version IN NUMBER
+      p_target_version IN NUMBER,
+      p_hash           IN VARCHAR2 DEFAULT NULL,
+      p_size           IN NUMBER DEFAULT NULL,
+      p_content        IN BLOB DEFAULT NULL
   );
 END ora_lake_ops;
 /
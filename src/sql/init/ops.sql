@@ -1,38 +1,247 @@
 CREATE OR REPLACE PACKAGE BODY ora_lake_ops AS
 
-  FUNCTION add_object(
+  FUNCTION content_hash(p_content BLOB) RETURN VARCHAR2 IS
+  BEGIN
+    IF p_content IS NULL THEN
+      RETURN NULL;
+    END IF;
+    RETURN LOWER(RAWTOHEX(DBMS_CRYPTO.HASH(p_content, DBMS_CRYPTO.HASH_SH256)));
+  END content_hash;
+
+
+  PROCEDURE retain_blob(
+    p_hash     VARCHAR2,
+    p_size     NUMBER,
+    p_content  BLOB,
+    p_refs     NUMBER DEFAULT 1
+  ) IS
+  BEGIN
+    IF p_hash IS NULL THEN
+      RETURN;
+    END IF;
+
+    UPDATE ora_lake_blobs
+    SET ref_count = ref_count + p_refs
+    WHERE content_hash = p_hash;
+
+    IF SQL%ROWCOUNT > 0 THEN
+      RETURN;
+    END IF;
+
+    IF p_content IS NULL THEN
+      RAISE_APPLICATION_ERROR(-20002,
+          'Blob ' || p_hash || ' is not stored and no content was supplied');
+    END IF;
+
+    BEGIN
+      INSERT INTO ora_lake_blobs(content_hash, content, size_bytes, ref_count, created_at)
+      VALUES(p_hash, p_content, NVL(p_size, DBMS_LOB.GETLENGTH(p_content)), p_refs, SYSTIMESTAMP);
+    EXCEPTION
+      WHEN DUP_VAL_ON_INDEX THEN
+        -- Another session stored the same content first
+        UPDATE ora_lake_blobs
+        SET ref_count = ref_count + p_refs
+        WHERE content_hash = p_hash;
+    END;
+  END retain_blob;
+
+
+  PROCEDURE release_blob(p_hash VARCHAR2, p_refs NUMBER DEFAULT 1) IS
+  BEGIN
+    IF p_hash IS NULL THEN
+      RETURN;
+    END IF;
+
+    UPDATE ora_lake_blobs
+    SET ref_count = ref_count - p_refs
+    WHERE content_hash = p_hash;
+
+    DELETE FROM ora_lake_blobs
+    WHERE content_hash = p_hash AND ref_count <= 0;
+
+    IF SQL%ROWCOUNT > 0 THEN
+      DELETE FROM ora_lake_chunks WHERE content_hash = p_hash;
+    END IF;
+  END release_blob;
+
+
+  PROCEDURE purge_blobs(p_grace_hours NUMBER DEFAULT 24) IS
+  BEGIN
+    -- Recount references after rows were deleted outside this package
+    UPDATE ora_lake_blobs b
+    SET ref_count = (SELECT COUNT(*) FROM ora_lake_objects o WHERE o.content_hash = b.content_hash)
+                  + (SELECT COUNT(*) FROM ora_lake_versions v WHERE v.content_hash = b.content_hash);
+
+    DELETE FROM ora_lake_blobs WHERE ref_count = 0;
+
+    -- Chunks of chunked writes that never committed. Helper sessions commit
+    -- their chunks before the blob row is committed, so sets written to in
+    -- the last p_grace_hours may belong to a write still in progress
+    DELETE FROM ora_lake_chunks c
+    WHERE NOT EXISTS (SELECT 1 FROM ora_lake_blobs b WHERE b.content_hash = c.content_hash)
+      AND c.content_hash IN (
+        SELECT content_hash FROM ora_lake_chunks
+        GROUP BY content_hash
+        HAVING MAX(created_at) < SYSTIMESTAMP - NUMTODSINTERVAL(p_grace_hours, 'HOUR')
+      );
+    COMMIT;
+  END purge_blobs;
+
+
+  PROCEDURE delete_object(p_id NUMBER) IS
+    TYPE t_hashes IS TABLE OF VARCHAR2(64);
+    TYPE t_ids IS TABLE OF NUMBER;
+    l_hashes      t_hashes;
+    l_renditions  t_ids;
+  BEGIN
+    -- Renditions are objects of their own; they go with their source
+    SELECT object_id BULK COLLECT INTO l_renditions
+    FROM ora_lake_renditions WHERE source_id = p_id;
+    FOR i IN 1 .. l_renditions.COUNT LOOP
+      delete_object(l_renditions(i));
+    END LOOP;
+
+    SELECT content_hash BULK COLLECT INTO l_hashes
+    FROM (
+      SELECT content_hash FROM ora_lake_objects WHERE object_id = p_id
+      UNION ALL
+      SELECT content_hash FROM ora_lake_versions WHERE object_id = p_id
+    )
+    WHERE content_hash IS NOT NULL;
+
+    -- Versions, metadata and rendition links go with the object (ON DELETE CASCADE);
+    -- blobs are released afterwards, once nothing references them
+    DELETE FROM ora_lake_objects WHERE object_id = p_id;
+
+    FOR i IN 1 .. l_hashes.COUNT LOOP
+      release_blob(l_hashes(i));
+    END LOOP;
+  END delete_object;
+
+
+  -- Renditions derived from any other version than the object's current one
+  -- are never served again; delete them with their blobs. Does not commit
+  PROCEDURE drop_stale_renditions(p_id NUMBER) IS
+    TYPE t_ids IS TABLE OF NUMBER;
+    l_renditions t_ids;
+  BEGIN
+    SELECT r.object_id BULK COLLECT INTO l_renditions
+    FROM ora_lake_renditions r
+    JOIN ora_lake_objects o ON o.object_id = r.source_id
+    WHERE r.source_id = p_id AND r.source_version <> o.version_num;
+    FOR i IN 1 .. l_renditions.COUNT LOOP
+      delete_object(l_renditions(i));
+    END LOOP;
+  END drop_stale_renditions;
+
+
+  -- Shared by add_object_hashed and add_object_row; does not commit
+  FUNCTION insert_object(
     p_name         VARCHAR2,
     p_type         VARCHAR2,
+    p_hash         VARCHAR2,
+    p_size         NUMBER,
     p_content      BLOB,
-    p_tags         CLOB DEFAULT NULL,
-    p_description  CLOB DEFAULT NULL,
-    p_schema_hint  CLOB DEFAULT NULL
+    p_tags         CLOB,
+    p_description  CLOB,
+    p_schema_hint  CLOB
   ) RETURN NUMBER IS
     l_id NUMBER;
   BEGIN
-    INSERT INTO ora_lake_objects(object_name, object_type, content, created_at, updated_at, version_num)
-    VALUES(p_name, p_type, p_content, SYSTIMESTAMP, SYSTIMESTAMP, 1)
+    -- One reference for the object row and one for version 1
+    retain_blob(p_hash, p_size, p_content, 2);
+
+    INSERT INTO ora_lake_objects(object_name, object_type, content_hash, created_at, updated_at, version_num)
+    VALUES(p_name, p_type, p_hash, SYSTIMESTAMP, SYSTIMESTAMP, 1)
     RETURNING object_id INTO l_id;
 
-    INSERT INTO ora_lake_versions(object_id, version_num, content, created_at)
-    VALUES(l_id, 1, p_content, SYSTIMESTAMP);
+    INSERT INTO ora_lake_versions(object_id, version_num, content_hash, created_at)
+    VALUES(l_id, 1, p_hash, SYSTIMESTAMP);
 
     IF p_tags IS NOT NULL OR p_description IS NOT NULL OR p_schema_hint IS NOT NULL THEN
       INSERT INTO ora_lake_metadata(object_id, tag, description, schema_hint)
       VALUES(l_id, p_tags, p_description, p_schema_hint);
     END IF;
+    RETURN l_id;
+  END insert_object;
+
 
+  FUNCTION add_object_hashed(
+    p_name         VARCHAR2,
+    p_type         VARCHAR2,
+    p_hash         VARCHAR2,
+    p_size         NUMBER,
+    p_content      BLOB,
+    p_tags         CLOB DEFAULT NULL,
+    p_description  CLOB DEFAULT NULL,
+    p_schema_hint  CLOB DEFAULT NULL
+  ) RETURN NUMBER IS
+    l_id NUMBER;
+  BEGIN
+    l_id := insert_object(p_name, p_type, p_hash, p_size, p_content, p_tags, p_description, p_schema_hint);
     COMMIT;
     RETURN l_id;
+  END add_object_hashed;
+
+
+  PROCEDURE add_object_row(
+    p_name         VARCHAR2,
+    p_type         VARCHAR2,
+    p_hash         VARCHAR2,
+    p_size         NUMBER,
+    p_content      BLOB,
+    p_tags         CLOB,
+    p_description  CLOB,
+    p_schema_hint  CLOB,
+    p_id           OUT NUMBER,
+    p_error        OUT VARCHAR2
+  ) IS
+  BEGIN
+    SAVEPOINT add_object_row;
+    p_id := insert_object(p_name, p_type, p_hash, p_size, p_content, p_tags, p_description, p_schema_hint);
+  EXCEPTION
+    WHEN OTHERS THEN
+      -- Undo only this row, so a batch can go on with the next one
+      ROLLBACK TO add_object_row;
+      p_id := NULL;
+      p_error := SQLERRM;
+  END add_object_row;
+
+
+  FUNCTION add_object(
+    p_name         VARCHAR2,
+    p_type         VARCHAR2,
+    p_content      BLOB,
+    p_tags         CLOB DEFAULT NULL,
+    p_description  CLOB DEFAULT NULL,
+    p_schema_hint  CLOB DEFAULT NULL
+  ) RETURN NUMBER IS
+  BEGIN
+    RETURN add_object_hashed(
+      p_name, p_type, content_hash(p_content), DBMS_LOB.GETLENGTH(p_content), p_content,
+      p_tags, p_description, p_schema_hint
+    );
   END add_object;
 
 
   FUNCTION get_object(p_id NUMBER) RETURN BLOB IS
     l_content BLOB;
+    l_hash    VARCHAR2(64);
+    l_chunks  NUMBER;
   BEGIN
-    SELECT content INTO l_content
-    FROM ora_lake_objects
-    WHERE object_id = p_id;
+    SELECT NVL(b.content, o.content), b.content_hash, b.chunk_count
+    INTO l_content, l_hash, l_chunks
+    FROM ora_lake_objects o
+    LEFT JOIN ora_lake_blobs b ON b.content_hash = o.content_hash
+    WHERE o.object_id = p_id;
+
+    IF l_chunks IS NOT NULL THEN
+      -- Reassemble chunked content in a temporary LOB
+      DBMS_LOB.CREATETEMPORARY(l_content, TRUE);
+      FOR c IN (SELECT content FROM ora_lake_chunks WHERE content_hash = l_hash ORDER BY chunk_no) LOOP
+        DBMS_LOB.APPEND(l_content, c.content);
+      END LOOP;
+    END IF;
     RETURN l_content;
   END get_object;
 
@@ -68,45 +277,93 @@ CREATE OR REPLACE PACKAGE BODY ora_lake_ops AS
     SET version_num = version_num + 1,
         updated_at = SYSTIMESTAMP
     WHERE object_id = p_id;
+    drop_stale_renditions(p_id);
     COMMIT;
   END increment_version;
 
 
-  PROCEDURE update_object(
+  PROCEDURE add_version(
+      p_id         IN NUMBER,
+      p_hash       IN VARCHAR2,
+      p_size       IN NUMBER,
+      p_content    IN BLOB,
+      p_delta      IN BLOB DEFAULT NULL,
+      p_delta_base IN NUMBER DEFAULT NULL
+  ) IS
+      v_old_hash VARCHAR2(64);
+      v_new_ver  NUMBER;
+  BEGIN
+      SELECT content_hash INTO v_old_hash
+      FROM ora_lake_objects
+      WHERE object_id = p_id
+      FOR UPDATE;
+
+      -- Compute next version number
+      SELECT NVL(MAX(version_num), 0) + 1 INTO v_new_ver
+      FROM ora_lake_versions
+      WHERE object_id = p_id;
+
+      IF p_delta IS NULL THEN
+          -- Full snapshot: one reference for the version row and one for the object row
+          retain_blob(p_hash, p_size, p_content, 2);
+
+          INSERT INTO ora_lake_versions(object_id, version_num, content_hash, created_at)
+          VALUES (p_id, v_new_ver, p_hash, SYSTIMESTAMP);
+      ELSE
+          -- Delta version: only the object row references the full content
+          retain_blob(p_hash, p_size, p_content, 1);
+
+          INSERT INTO ora_lake_versions(
+              object_id, version_num, delta_base, delta, delta_hash, delta_size, created_at
+          )
+          VALUES (p_id, v_new_ver, p_delta_base, p_delta, p_hash, p_size, SYSTIMESTAMP);
+      END IF;
+
+      -- Inline content of pre-dedup rows is dropped once the object moves to a blob
+      UPDATE ora_lake_objects
+      SET content = NULL,
+          content_hash = p_hash,
+          version_num = v_new_ver,
+          updated_at = SYSTIMESTAMP
+      WHERE object_id = p_id;
+
+      release_blob(v_old_hash);
+      drop_stale_renditions(p_id);
+  END add_version;
+
+
+  PROCEDURE update_object_hashed(
       p_name        IN VARCHAR2,
       p_obj_type    IN VARCHAR2,
+      p_hash        IN VARCHAR2,
+      p_size        IN NUMBER,
       p_content     IN BLOB,
       p_tags        IN VARCHAR2,
-      p_description IN VARCHAR2
+      p_description IN VARCHAR2,
+      p_delta       IN BLOB DEFAULT NULL,
+      p_delta_base  IN NUMBER DEFAULT NULL
   ) IS
       v_object_id NUMBER;
-      v_new_ver   NUMBER;
+      v_old_hash  VARCHAR2(64);
   BEGIN
       -- Find object_id for given name + type (get the most recent one)
-      SELECT object_id INTO v_object_id
+      SELECT object_id, content_hash INTO v_object_id, v_old_hash
       FROM (
-          SELECT object_id 
+          SELECT object_id, content_hash
           FROM ora_lake_objects
           WHERE object_name = p_name AND object_type = p_obj_type
           ORDER BY created_at DESC
       )
       WHERE ROWNUM = 1;
 
-      -- Compute next version number
-      SELECT NVL(MAX(version_num), 0) + 1 INTO v_new_ver
-      FROM ora_lake_versions
-      WHERE object_id = v_object_id;
-
-      -- Insert new version
-      INSERT INTO ora_lake_versions(object_id, version_num, content, created_at)
-      VALUES (v_object_id, v_new_ver, p_content, SYSTIMESTAMP);
-
-      -- Update main object
-      UPDATE ora_lake_objects
-      SET content = p_content,
-          version_num = v_new_ver,
-          updated_at = SYSTIMESTAMP
-      WHERE object_id = v_object_id;
+      IF v_old_hash = p_hash THEN
+          -- Unchanged content: metadata-only write, no new version
+          UPDATE ora_lake_objects
+          SET updated_at = SYSTIMESTAMP
+          WHERE object_id = v_object_id;
+      ELSE
+          add_version(v_object_id, p_hash, p_size, p_content, p_delta, p_delta_base);
+      END IF;
 
       -- Optionally update metadata
       IF p_tags IS NOT NULL OR p_description IS NOT NULL THEN
@@ -117,16 +374,87 @@ CREATE OR REPLACE PACKAGE BODY ora_lake_ops AS
       END IF;
 
       COMMIT;
+  END update_object_hashed;
+
+
+  PROCEDURE update_object(
+      p_name        IN VARCHAR2,
+      p_obj_type    IN VARCHAR2,
+      p_content     IN BLOB,
+      p_tags        IN VARCHAR2,
+      p_description IN VARCHAR2
+  ) IS
+  BEGIN
+      update_object_hashed(
+          p_name, p_obj_type, content_hash(p_content), DBMS_LOB.GETLENGTH(p_content), p_content,
+          p_tags, p_description
+      );
   END update_object;
 
 
+  PROCEDURE restore_version(
+      p_id             NUMBER,
+      p_target_version NUMBER,
+      p_hash           VARCHAR2 DEFAULT NULL,
+      p_size           NUMBER DEFAULT NULL,
+      p_content        BLOB DEFAULT NULL
+  ) IS
+      v_old_hash       VARCHAR2(64);
+      v_target_hash    VARCHAR2(64);
+      v_target_content BLOB;
+      v_delta_hash     VARCHAR2(64);
+  BEGIN
+      SELECT content_hash INTO v_old_hash
+      FROM ora_lake_objects
+      WHERE object_id = p_id
+      FOR UPDATE;
+
+      SELECT content_hash, content, delta_hash
+      INTO v_target_hash, v_target_content, v_delta_hash
+      FROM ora_lake_versions
+      WHERE object_id = p_id
+        AND version_num = p_target_version
+      FETCH FIRST 1 ROWS ONLY;
+
+      IF v_delta_hash IS NOT NULL THEN
+          -- Delta versions are rebuilt by the caller and handed back with their hash
+          IF p_hash IS NULL OR p_hash <> v_delta_hash THEN
+              RAISE_APPLICATION_ERROR(-20003,
+                  'Version ' || p_target_version || ' is delta encoded; reconstructed content is required');
+          END IF;
+          v_target_hash := p_hash;
+          retain_blob(v_target_hash, p_size, p_content);
+      ELSE
+          -- Retain before releasing so restoring identical content never drops the blob
+          retain_blob(v_target_hash, NULL, NULL);
+      END IF;
+
+      -- Versions written before dedup carry their content inline
+      IF v_target_hash IS NOT NULL THEN
+          v_target_content := NULL;
+      END IF;
+
+      UPDATE ora_lake_objects
+      SET content = v_target_content,
+          content_hash = v_target_hash,
+          updated_at = SYSTIMESTAMP,
+          version_num = p_target_version
+      WHERE object_id = p_id;
+
+      release_blob(v_old_hash);
+      drop_stale_renditions(p_id);
+  END restore_version;
+
+
   PROCEDURE rollback_object (
       p_name           IN VARCHAR2,
       p_obj_type       IN VARCHAR2,
-      p_target_version IN NUMBER
+      p_target_version IN NUMBER,
+      p_hash           IN VARCHAR2 DEFAULT NULL,
+      p_size           IN NUMBER DEFAULT NULL,
+      p_content        IN BLOB DEFAULT NULL
   ) IS
       v_object_id     NUMBER;
-      v_old_content   BLOB;
       v_old_tag       VARCHAR2(4000);
       v_description   VARCHAR2(4000);
       v_count         NUMBER;
@@ -153,21 +481,17 @@ CREATE OR REPLACE PACKAGE BODY ora_lake_ops AS
               'Initial version may not have been saved.');
       END IF;
 
-      -- Fetch old version's content and metadata
-      SELECT v.content, m.tag, m.description
-      INTO v_old_content, v_old_tag, v_description
+      -- Fetch old version's metadata
+      SELECT m.tag, m.description
+      INTO v_old_tag, v_description
       FROM ora_lake_versions v
       LEFT JOIN ora_lake_metadata m ON v.object_id = m.object_id
       WHERE v.object_id = v_object_id
         AND v.version_num = p_target_version
       FETCH FIRST 1 ROWS ONLY;
 
-      -- Update main object table
-      UPDATE ora_lake_objects
-      SET content = v_old_content,
-          updated_at = SYSTIMESTAMP,
-          version_num = p_target_version
-      WHERE object_id = v_object_id;
+      -- Point the main object at the old version's content
+      restore_version(v_object_id, p_target_version, p_hash, p_size, p_content);
 
       -- Update metadata if available
       IF v_old_tag IS NOT NULL OR v_description IS NOT NULL THEN
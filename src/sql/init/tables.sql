@@ -1,9 +1,39 @@
+-- Schema for new databases; upgrade existing ones with the scripts in src/sql/migrations
+
+-- Content-addressed blob store shared by objects and versions
+CREATE TABLE ora_lake_blobs (
+    content_hash  VARCHAR2(64) PRIMARY KEY,   -- SHA-256, hex encoded
+    content       BLOB,
+    size_bytes    NUMBER NOT NULL,             -- uncompressed size
+    codec         VARCHAR2(16),                -- zlib | lzma | zstd, NULL when stored raw
+    -- Manifest of large blobs split into ora_lake_chunks; content is NULL then
+    chunk_size    NUMBER,                      -- uncompressed bytes per chunk
+    chunk_count   NUMBER,
+    ref_count     NUMBER DEFAULT 0 NOT NULL,
+    created_at    TIMESTAMP DEFAULT SYSTIMESTAMP
+);
+
+-- Fixed-size pieces of chunked blobs, each compressed on its own with the
+-- blob's codec. Chunks are written over several sessions before the blob row
+-- commits, so they carry no foreign key. Chunks without a blob row belong to
+-- a write in progress or one that failed; purge_blobs only deletes sets whose
+-- newest chunk is older than its grace period.
+CREATE TABLE ora_lake_chunks (
+    content_hash  VARCHAR2(64) NOT NULL,
+    chunk_no      NUMBER NOT NULL,             -- 0-based, covers bytes chunk_no * chunk_size onwards
+    content       BLOB NOT NULL,
+    created_at    TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT pk_ora_lake_chunks PRIMARY KEY (content_hash, chunk_no)
+);
+
 -- Main objects table
+-- content holds legacy inline payloads; new rows reference ora_lake_blobs
 CREATE TABLE ora_lake_objects (
     object_id     NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
     object_name   VARCHAR2(255) NOT NULL,
     object_type   VARCHAR2(100) NOT NULL,
     content       BLOB,
+    content_hash  VARCHAR2(64) REFERENCES ora_lake_blobs(content_hash),
     created_at    TIMESTAMP DEFAULT SYSTIMESTAMP,
     updated_at    TIMESTAMP DEFAULT SYSTIMESTAMP,
     version_num   NUMBER DEFAULT 1,
@@ -25,5 +55,39 @@ CREATE TABLE ora_lake_versions (
     object_id    NUMBER REFERENCES ora_lake_objects(object_id) ON DELETE CASCADE,
     version_num  NUMBER,
     content      BLOB,
+    content_hash VARCHAR2(64) REFERENCES ora_lake_blobs(content_hash),
+    -- Delta-encoded versions leave content/content_hash NULL and store a
+    -- binary diff against the full snapshot version delta_base instead
+    delta_base   NUMBER,
+    delta        BLOB,
+    delta_hash   VARCHAR2(64),    -- SHA-256 of the reconstructed content
+    delta_size   NUMBER,          -- size of the reconstructed content
     created_at   TIMESTAMP DEFAULT SYSTIMESTAMP
-);
\ No newline at end of file
+);
+
+-- Derived images (resized, re-encoded) of a source object; each rendition
+-- is an object of its own, found by (source_id, rendition_name) and only
+-- served while the source is still at source_version. delete_object
+-- removes the rendition objects together with their source.
+CREATE TABLE ora_lake_renditions (
+    source_id       NUMBER NOT NULL REFERENCES ora_lake_objects(object_id) ON DELETE CASCADE,
+    rendition_name  VARCHAR2(100) NOT NULL,
+    object_id       NUMBER NOT NULL REFERENCES ora_lake_objects(object_id) ON DELETE CASCADE,
+    source_version  NUMBER NOT NULL,            -- version of the source it was derived from
+    CONSTRAINT pk_ora_lake_renditions PRIMARY KEY (source_id, rendition_name)
+);
+
+
+-- Keyset pagination and tag filtering for list_objects
+CREATE INDEX ix_ora_lake_meta_tag ON ora_lake_metadata (tag, object_id);
+CREATE INDEX ix_ora_lake_obj_type ON ora_lake_objects (object_type, object_id);
+
+-- Blob reference lookups
+CREATE INDEX ix_ora_lake_obj_hash ON ora_lake_objects (content_hash);
+CREATE INDEX ix_ora_lake_ver_hash ON ora_lake_versions (content_hash);
+
+-- Renditions pointing at an object, for cascading deletes
+CREATE INDEX ix_ora_lake_rend_obj ON ora_lake_renditions (object_id);
+
+-- Version lookups, including the latest full snapshot of an object
+CREATE INDEX ix_ora_lake_ver_obj ON ora_lake_versions (object_id, version_num);
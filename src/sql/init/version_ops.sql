@@ -0,0 +1,91 @@
+CREATE OR REPLACE PACKAGE ora_lake_version_ops AS
+  PROCEDURE create_new_version(p_id NUMBER, p_content BLOB);
+
+  PROCEDURE create_new_version_hashed(
+    p_id          NUMBER,
+    p_hash        VARCHAR2,
+    p_size        NUMBER,
+    p_content     BLOB,
+    p_delta       BLOB DEFAULT NULL,
+    p_delta_base  NUMBER DEFAULT NULL
+  );
+
+  FUNCTION get_version_history(p_id NUMBER) RETURN SYS_REFCURSOR;
+
+  PROCEDURE restore_version(
+    p_id       NUMBER,
+    p_version  NUMBER,
+    p_hash     VARCHAR2 DEFAULT NULL,
+    p_size     NUMBER DEFAULT NULL,
+    p_content  BLOB DEFAULT NULL
+  );
+END ora_lake_version_ops;
+/
+
+CREATE OR REPLACE PACKAGE BODY ora_lake_version_ops AS
+
+  PROCEDURE create_new_version_hashed(
+    p_id          NUMBER,
+    p_hash        VARCHAR2,
+    p_size        NUMBER,
+    p_content     BLOB,
+    p_delta       BLOB DEFAULT NULL,
+    p_delta_base  NUMBER DEFAULT NULL
+  ) IS
+    v_current_hash VARCHAR2(64);
+  BEGIN
+    SELECT content_hash INTO v_current_hash
+    FROM ora_lake_objects
+    WHERE object_id = p_id;
+
+    IF v_current_hash = p_hash THEN
+      -- Unchanged content: nothing to version
+      UPDATE ora_lake_objects
+      SET updated_at = SYSTIMESTAMP
+      WHERE object_id = p_id;
+    ELSE
+      ora_lake_ops.add_version(p_id, p_hash, p_size, p_content, p_delta, p_delta_base);
+    END IF;
+
+    COMMIT;
+  END create_new_version_hashed;
+
+
+  PROCEDURE create_new_version(p_id NUMBER, p_content BLOB) IS
+  BEGIN
+    create_new_version_hashed(
+      p_id, ora_lake_ops.content_hash(p_content), DBMS_LOB.GETLENGTH(p_content), p_content
+    );
+  END create_new_version;
+
+
+  FUNCTION get_version_history(p_id NUMBER) RETURN SYS_REFCURSOR IS
+    l_cursor SYS_REFCURSOR;
+  BEGIN
+    OPEN l_cursor FOR
+      SELECT v.version_num, v.created_at,
+             COALESCE(b.size_bytes, v.delta_size, DBMS_LOB.GETLENGTH(v.content)) AS size_bytes,
+             NVL(v.content_hash, v.delta_hash) AS content_hash,
+             v.delta_base
+      FROM ora_lake_versions v
+      LEFT JOIN ora_lake_blobs b ON b.content_hash = v.content_hash
+      WHERE v.object_id = p_id
+      ORDER BY v.version_num;
+    RETURN l_cursor;
+  END get_version_history;
+
+
+  PROCEDURE restore_version(
+    p_id       NUMBER,
+    p_version  NUMBER,
+    p_hash     VARCHAR2 DEFAULT NULL,
+    p_size     NUMBER DEFAULT NULL,
+    p_content  BLOB DEFAULT NULL
+  ) IS
+  BEGIN
+    ora_lake_ops.restore_version(p_id, p_version, p_hash, p_size, p_content);
+    COMMIT;
+  END restore_version;
+
+END ora_lake_version_ops;
+/
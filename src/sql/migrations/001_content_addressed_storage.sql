@@ -0,0 +1,114 @@
+-- Upgrade a database created from the original tables.sql (inline content
+-- in ora_lake_objects/ora_lake_versions) to content-addressed storage.
+-- Run it once as the schema owner, then re-run init/init.sql, init/ops.sql
+-- and init/version_ops.sql to recompile the packages. Steps that were
+-- applied already are skipped, so the script can be run again safely.
+
+SET SERVEROUTPUT ON;
+
+DECLARE
+    PROCEDURE run_ddl(p_sql VARCHAR2) IS
+    BEGIN
+        EXECUTE IMMEDIATE p_sql;
+    EXCEPTION
+        WHEN OTHERS THEN
+            -- ORA-00955 name in use, ORA-01430 column exists, ORA-01408 column list
+            -- indexed, ORA-01442 column is NOT NULL already
+            IF SQLCODE NOT IN (-955, -1430, -1408, -1442) THEN
+                RAISE;
+            END IF;
+    END;
+BEGIN
+    run_ddl(q'[
+        CREATE TABLE ora_lake_blobs (
+            content_hash  VARCHAR2(64) PRIMARY KEY,
+            content       BLOB,
+            size_bytes    NUMBER NOT NULL,
+            codec         VARCHAR2(16),
+            chunk_size    NUMBER,
+            chunk_count   NUMBER,
+            ref_count     NUMBER DEFAULT 0 NOT NULL,
+            created_at    TIMESTAMP DEFAULT SYSTIMESTAMP
+        )]');
+    run_ddl(q'[
+        CREATE TABLE ora_lake_chunks (
+            content_hash  VARCHAR2(64) NOT NULL,
+            chunk_no      NUMBER NOT NULL,
+            content       BLOB NOT NULL,
+            created_at    TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+            CONSTRAINT pk_ora_lake_chunks PRIMARY KEY (content_hash, chunk_no)
+        )]');
+    run_ddl(q'[
+        CREATE TABLE ora_lake_renditions (
+            source_id       NUMBER NOT NULL REFERENCES ora_lake_objects(object_id) ON DELETE CASCADE,
+            rendition_name  VARCHAR2(100) NOT NULL,
+            object_id       NUMBER NOT NULL REFERENCES ora_lake_objects(object_id) ON DELETE CASCADE,
+            source_version  NUMBER NOT NULL,
+            CONSTRAINT pk_ora_lake_renditions PRIMARY KEY (source_id, rendition_name)
+        )]');
+
+    run_ddl('ALTER TABLE ora_lake_chunks ADD created_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL');
+    -- Links made before versions were recorded are taken to match the current version
+    run_ddl('ALTER TABLE ora_lake_renditions ADD source_version NUMBER');
+    EXECUTE IMMEDIATE q'[
+        UPDATE ora_lake_renditions r
+        SET source_version = (SELECT version_num FROM ora_lake_objects o WHERE o.object_id = r.source_id)
+        WHERE source_version IS NULL]';
+    run_ddl('ALTER TABLE ora_lake_renditions MODIFY source_version NOT NULL');
+    run_ddl('ALTER TABLE ora_lake_objects ADD content_hash VARCHAR2(64) REFERENCES ora_lake_blobs(content_hash)');
+    run_ddl('ALTER TABLE ora_lake_versions ADD content_hash VARCHAR2(64) REFERENCES ora_lake_blobs(content_hash)');
+    run_ddl('ALTER TABLE ora_lake_versions ADD delta_base NUMBER');
+    run_ddl('ALTER TABLE ora_lake_versions ADD delta BLOB');
+    run_ddl('ALTER TABLE ora_lake_versions ADD delta_hash VARCHAR2(64)');
+    run_ddl('ALTER TABLE ora_lake_versions ADD delta_size NUMBER');
+
+    run_ddl('CREATE INDEX ix_ora_lake_meta_tag ON ora_lake_metadata (tag, object_id)');
+    run_ddl('CREATE INDEX ix_ora_lake_obj_type ON ora_lake_objects (object_type, object_id)');
+    run_ddl('CREATE INDEX ix_ora_lake_obj_hash ON ora_lake_objects (content_hash)');
+    run_ddl('CREATE INDEX ix_ora_lake_ver_hash ON ora_lake_versions (content_hash)');
+    run_ddl('CREATE INDEX ix_ora_lake_rend_obj ON ora_lake_renditions (object_id)');
+    run_ddl('CREATE INDEX ix_ora_lake_ver_obj ON ora_lake_versions (object_id, version_num)');
+END;
+/
+
+-- Move inline content into ora_lake_blobs, stored raw (codec NULL) and
+-- deduplicated by SHA-256, then count the references to every blob
+DECLARE
+    v_hash   VARCHAR2(64);
+    v_count  NUMBER := 0;
+
+    PROCEDURE store_blob(p_hash VARCHAR2, p_content BLOB) IS
+    BEGIN
+        INSERT INTO ora_lake_blobs(content_hash, content, size_bytes, ref_count, created_at)
+        VALUES(p_hash, p_content, DBMS_LOB.GETLENGTH(p_content), 0, SYSTIMESTAMP);
+    EXCEPTION
+        WHEN DUP_VAL_ON_INDEX THEN
+            NULL;
+    END;
+BEGIN
+    FOR r IN (SELECT ROWID AS rid, content FROM ora_lake_objects
+              WHERE content IS NOT NULL AND content_hash IS NULL) LOOP
+        v_hash := LOWER(RAWTOHEX(DBMS_CRYPTO.HASH(r.content, DBMS_CRYPTO.HASH_SH256)));
+        store_blob(v_hash, r.content);
+        UPDATE ora_lake_objects SET content_hash = v_hash, content = NULL WHERE ROWID = r.rid;
+        v_count := v_count + 1;
+    END LOOP;
+    DBMS_OUTPUT.PUT_LINE('Moved content of ' || v_count || ' objects');
+
+    v_count := 0;
+    FOR r IN (SELECT ROWID AS rid, content FROM ora_lake_versions
+              WHERE content IS NOT NULL AND content_hash IS NULL AND delta IS NULL) LOOP
+        v_hash := LOWER(RAWTOHEX(DBMS_CRYPTO.HASH(r.content, DBMS_CRYPTO.HASH_SH256)));
+        store_blob(v_hash, r.content);
+        UPDATE ora_lake_versions SET content_hash = v_hash, content = NULL WHERE ROWID = r.rid;
+        v_count := v_count + 1;
+    END LOOP;
+    DBMS_OUTPUT.PUT_LINE('Moved content of ' || v_count || ' versions');
+
+    UPDATE ora_lake_blobs b
+    SET ref_count = (SELECT COUNT(*) FROM ora_lake_objects o WHERE o.content_hash = b.content_hash)
+                  + (SELECT COUNT(*) FROM ora_lake_versions v WHERE v.content_hash = b.content_hash);
+
+    COMMIT;
+END;
+/
@@ -0,0 +1,112 @@
+"""
+Tests for MediaStorage writes that go through the database: renditions
+and byte-budget encoding
+"""
+
+from PIL import Image
+from src.database import get_pool
+from src.services.media_storage import MediaStorage
+from src.services.oralake import get_object_info
+from src.services.version_control import create_new_version
+import json
+import pytest
+
+NAME_PATTERNS = ("test_renditions_%", "test_budget_media")
+
+
+@pytest.fixture(autouse=True)
+def cleanup_test_media():
+    """Delete the objects these tests create, with their renditions and blobs"""
+    yield
+    try:
+        with get_pool().acquire() as conn:
+            cursor = conn.cursor()
+            for pattern in NAME_PATTERNS:
+                cursor.execute(
+                    "SELECT object_id FROM ora_lake_objects WHERE object_name LIKE :pattern",
+                    pattern=pattern
+                )
+                for (object_id,) in cursor.fetchall():
+                    cursor.callproc("ora_lake_ops.delete_object", [object_id])
+            conn.commit()
+    except Exception as e:
+        print(f"Cleanup error: {e}")
+
+
+def create_test_image(path, size=(800, 600), color='red'):
+    Image.new('RGB', size, color=color).save(str(path), 'JPEG')
+    return str(path)
+
+
+@pytest.mark.integration
+def test_save_image_renditions(tmp_path):
+    """Test storing an original with linked renditions"""
+    test_img = tmp_path / "hero.jpg"
+    create_test_image(test_img, size=(2400, 1600), color='green')
+
+    ids = MediaStorage.save_image_renditions(
+        file_path=str(test_img),
+        name="test_renditions_hero",
+        tags="test,renditions",
+        renditions=[
+            {"name": "web", "max_dimension": 1200, "quality": 75},
+            {"name": "thumb", "size": (200, 200), "format": "WEBP"},
+        ]
+    )
+    assert set(ids) == {"source", "web", "thumb"}
+
+    # The original is stored byte for byte
+    original_bytes, _ = MediaStorage.get_image(ids["source"])
+    assert original_bytes == test_img.read_bytes()
+
+    _, web_metadata = MediaStorage.get_rendition(ids["source"], "web")
+    assert web_metadata['size'] == (1200, 800)
+    _, thumb_metadata = MediaStorage.get_rendition(ids["source"], "thumb")
+    assert thumb_metadata['format'] == 'WEBP' and thumb_metadata['size'] == (200, 133)
+
+    with pytest.raises(ValueError):
+        MediaStorage.get_rendition(ids["source"], "missing")
+
+
+@pytest.mark.integration
+def test_renditions_follow_their_source(tmp_path):
+    """Test that renditions go stale with a new version and are deleted with the source"""
+    test_img = tmp_path / "lifecycle.jpg"
+    create_test_image(test_img, size=(1600, 1200))
+
+    ids = MediaStorage.save_image_renditions(
+        file_path=str(test_img),
+        name="test_renditions_lifecycle",
+        renditions=[{"name": "web", "max_dimension": 800}]
+    )
+
+    create_new_version(ids["source"], test_img.read_bytes())
+    with pytest.raises(ValueError):
+        MediaStorage.get_rendition(ids["source"], "web")
+
+    with get_pool().acquire() as conn:
+        cursor = conn.cursor()
+        cursor.callproc("ora_lake_ops.delete_object", [ids["source"]])
+        conn.commit()
+    assert get_object_info(ids["web"]) is None
+
+
+@pytest.mark.integration
+def test_save_image_to_byte_budget(tmp_path):
+    """Test adaptive encoding against a byte budget"""
+    large_img = tmp_path / "budget.png"
+    create_test_image(large_img, size=(1200, 900), color='green')
+
+    obj_id = MediaStorage.save_image(
+        file_path=str(large_img),
+        name="test_budget_media",
+        max_bytes=20_000
+    )
+
+    img_bytes, metadata = MediaStorage.get_image(obj_id)
+    schema_hint = json.loads(get_object_info(obj_id)['schema_hint'])
+
+    assert len(img_bytes) <= 20_000
+    assert schema_hint['format'] == metadata['format']
+    assert schema_hint['encoding']['target_met']
+    assert {c['format'] for c in schema_hint['encoding']['candidates']} == {'JPEG', 'WEBP', 'PNG'}
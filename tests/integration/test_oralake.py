@@ -1,4 +1,10 @@
-from src.services.oralake import add_object, get_object, tag_object, query_by_tag
+from src.services.oralake import (
+    add_object, add_objects_many, get_object, iter_object, tag_object, query_by_tag,
+    fetch_objects_by_tag, get_object_info
+)
+from src.config import settings
+import hashlib
+import io
 import pytest
 
 @pytest.mark.integration
@@ -18,6 +24,96 @@ def test_add_get_object():
     assert isinstance(fetched, (bytes, bytearray))
     assert b"Alice" in fetched
 
+@pytest.mark.integration
+def test_iter_object_chunks():
+    content = bytes(range(256)) * 4096
+    obj_id = add_object(
+        name="test_iter_object",
+        obj_type="BINARY",
+        content=content,
+        tags="demo,binary",
+        description="Chunked read test"
+    )
+
+    chunks = list(iter_object(obj_id, chunk_size=64 * 1024))
+    assert len(chunks) > 1, "Large objects should be read in several chunks"
+    assert b"".join(chunks) == content
+
+@pytest.mark.integration
+def test_add_object_from_stream():
+    content = b"0123456789" * 100_000
+    obj_id = add_object(
+        name="test_stream_upload",
+        obj_type="BINARY",
+        content=io.BytesIO(content),
+        tags="demo,binary",
+        description="Streamed write test",
+        chunk_size=64 * 1024
+    )
+    assert get_object(obj_id) == content
+
+@pytest.mark.integration
+def test_add_objects_many_reports_row_errors():
+    records = [
+        {"name": f"test_bulk_{i}", "obj_type": "JSON", "content": b'{"n": %d}' % i,
+         "tags": "pytest_bulk_tag"}
+        for i in range(5)
+    ]
+    # Duplicate name/type violates the unique constraint for this row only
+    records.append(dict(records[0]))
+
+    result = add_objects_many(records, batch_size=4)
+    assert all(isinstance(obj_id, int) for obj_id in result["object_ids"][:5])
+    assert result["object_ids"][5] is None
+    assert [error["index"] for error in result["errors"]] == [5]
+    assert get_object(result["object_ids"][3]) == b'{"n": 3}'
+
+@pytest.mark.integration
+def test_get_object_info():
+    content = b'{"name": "Frank"}'
+    obj_id = add_object(
+        name="test_info_obj",
+        obj_type="JSON",
+        content=content,
+        tags="pytest_info_tag",
+        description="Metadata only"
+    )
+    info = get_object_info(obj_id)
+    assert info["object_name"] == "test_info_obj"
+    assert info["size_bytes"] == len(content)
+    assert info["tag"] == "pytest_info_tag"
+    assert get_object_info(-1) is None
+
+@pytest.mark.integration
+def test_identical_content_shares_blob():
+    content = b"dedup payload " * 10_000
+    first = add_object(name="test_dedup_a", obj_type="BINARY", content=content, tags="pytest_dedup_tag")
+    second = add_object(name="test_dedup_b", obj_type="BINARY", content=io.BytesIO(content),
+                        tags="pytest_dedup_tag")
+
+    first_info, second_info = get_object_info(first), get_object_info(second)
+    assert first_info["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert second_info["content_hash"] == first_info["content_hash"]
+    assert get_object(second) == content
+
+@pytest.mark.integration
+def test_chunked_object_round_trip(monkeypatch):
+    monkeypatch.setattr(settings, "chunked_min_bytes", 256 * 1024)
+    monkeypatch.setattr(settings, "chunk_bytes", 64 * 1024)
+    content = bytes(range(256)) * 4096 + b"tail"
+    obj_id = add_object(name="test_chunked", obj_type="BINARY", content=io.BytesIO(content),
+                        tags="pytest_chunked_tag")
+
+    info = get_object_info(obj_id)
+    assert info["chunk_count"] == 17
+    assert info["size_bytes"] == len(content)
+    assert get_object(obj_id) == content
+    assert b"".join(iter_object(obj_id, offset=100_000, length=200_000)) == content[100_000:300_000]
+
+@pytest.mark.integration
+def test_iter_object_missing():
+    assert iter_object(-1) is None
+
 @pytest.mark.integration
 def test_tag_object():
     content = b'{"city": "Delhi"}'
@@ -52,11 +148,62 @@ def test_query_by_tag():
     assert isinstance(result, list)
     assert any(b'Charlie' in r for r in result), "Should find the object by tag"
 
+@pytest.mark.integration
+def test_fetch_objects_by_tag_metadata_only():
+    tag_name = "pytest_set_tag"
+    content = b'{"name": "Dana"}'
+    obj_id = add_object(
+        name="test_set_fetch_obj",
+        obj_type="JSON",
+        content=content,
+        tags=tag_name,
+        description="Set-based fetch"
+    )
+    rows = fetch_objects_by_tag(tag_name, include_content=False, arraysize=10)
+    row = next(r for r in rows if r["object_id"] == obj_id)
+    assert row["size_bytes"] == len(content)
+    assert "content" not in row
+
 @pytest.mark.integration
 def test_query_nonexistent_tag():
     result = query_by_tag("no_such_tag")
     assert isinstance(result, list)
     assert len(result) == 0
 
+@pytest.mark.integration
+def test_image_renditions_are_stored_and_replaced_per_version():
+    from PIL import Image
+    from src.services.image_renditions import RenditionParams, get_rendition
+    from src.services.oralake import find_rendition, list_renditions, update_object
+    import asyncio
+
+    def jpeg(color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), color).save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    obj_id = add_object(name="test_rendition_source", obj_type="IMAGE", content=jpeg("red"), tags="pytest_renditions")
+    params = RenditionParams.parse(200, None, fmt="webp")
+
+    first, source = asyncio.run(get_rendition(obj_id, 1, params))
+    assert source == "miss" and Image.open(io.BytesIO(first)).size == (200, 150)
+    second, source = asyncio.run(get_rendition(obj_id, 1, params))
+    assert source == "hit" and second == first
+    first_id = find_rendition(obj_id, params.key(1))
+
+    # The new version deletes the old version's renditions right away
+    update_object(name="test_rendition_source", obj_type="IMAGE", content=jpeg("blue"), tags="pytest_renditions")
+    assert params.key(1) not in list_renditions(obj_id)
+    assert get_object(first_id) is None
+
+    # A request pinned to version 1 that lands after the update still
+    # renders version 1, but nothing is stored for it
+    asyncio.run(get_rendition(obj_id, 2, params))
+    late = RenditionParams.parse(100, None)
+    pinned, source = asyncio.run(get_rendition(obj_id, 1, late))
+    assert source == "miss" and Image.open(io.BytesIO(pinned)).getpixel((50, 30))[0] > 200
+    assert late.key(1) not in list_renditions(obj_id)
+    assert find_rendition(obj_id, params.key(2)) is not None
+
 if __name__ == "__main__":
-    pytest.main(["-v", __file__])
\ No newline at end of file
+    pytest.main(["-v", __file__])
@@ -0,0 +1,26 @@
+import asyncio
+import io
+import pytest
+from src.services import oralake_async
+
+
+@pytest.mark.integration
+def test_async_add_get_and_query():
+    async def scenario():
+        content = b'{"name": "Erin"}' * 10_000
+        obj_id = await oralake_async.add_object(
+            name="test_async_obj",
+            obj_type="JSON",
+            content=io.BytesIO(content),
+            tags="pytest_async_tag",
+            description="Async service test"
+        )
+        assert await oralake_async.get_object(obj_id) == content
+
+        results = await oralake_async.query_by_tag("pytest_async_tag")
+        assert any(r == content for r in results)
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
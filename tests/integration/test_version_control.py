@@ -1,5 +1,6 @@
 import pytest
-from src.services.oralake import add_object, get_object, update_object, rollback_object
+from src.services.oralake import add_object, get_object, get_object_info, update_object, rollback_object
+from src.services.version_control import get_version_content, get_version_history, restore_version
 from src.database import pool
 
 @pytest.fixture(autouse=True)
@@ -31,6 +32,7 @@ def cleanup_test_data():
                 WHERE object_name = 'test_version_user'
             """)
             conn.commit()
+            cursor.callproc("ora_lake_ops.purge_blobs")
     except Exception as e:
         print(f"Cleanup error: {e}")
 
@@ -79,5 +81,41 @@ def test_update_and_rollback_object():
 
     print("\n✅ Version control and rollback test passed successfully!")
 
+@pytest.mark.integration
+def test_unchanged_update_is_metadata_only():
+    content = b'{"user": "Bob", "role": "viewer"}'
+    name = "test_version_user"
+    obj_id = add_object(name=name, obj_type="JSON", content=content, tags="versioning,test")
+
+    assert update_object(name, "JSON", content, "versioning,test", "Same bytes again")
+    info = get_object_info(obj_id)
+    assert info["version_num"] == 1, "Re-uploading identical content must not add a version"
+    assert info["description"] == "Same bytes again"
+
+
+@pytest.mark.integration
+def test_delta_versions_reconstruct():
+    rows = [b"%d,user_%d,viewer\n" % (i, i) for i in range(5000)]
+    name = "test_version_user"
+    obj_id = add_object(name=name, obj_type="CSV", content=b"".join(rows), tags="versioning,test")
+
+    contents = [b"".join(rows)]
+    for i in range(3):
+        rows[i * 100] = b"%d,user_%d,editor\n" % (i * 100, i * 100)
+        contents.append(b"".join(rows))
+        assert update_object(name, "CSV", contents[-1], "versioning,test", f"Edit {i}")
+
+    history = get_version_history(obj_id)
+    assert [row[0] for row in history] == [1, 2, 3, 4]
+    assert all(row[4] == 1 for row in history[1:]), "Edits should be stored as deltas on version 1"
+    assert [row[2] for row in history] == [len(content) for content in contents]
+
+    assert get_version_content(obj_id, 3) == contents[2]
+    restore_version(obj_id, 2)
+    assert get_object(obj_id) == contents[1]
+    assert rollback_object(name, "CSV", 3)
+    assert get_object(obj_id) == contents[2]
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
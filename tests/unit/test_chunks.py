@@ -0,0 +1,75 @@
+"""
+Tests for the chunk layout of large blobs
+"""
+
+import io
+from src.services.oralake import _chunk_reader, _chunk_span
+
+
+def test_chunk_span_covers_range():
+    assert _chunk_span(100, 10) == range(0, 10)
+    assert _chunk_span(100, 10, offset=15, length=10) == range(1, 3)
+    assert _chunk_span(100, 10, offset=20, length=10) == range(2, 3)
+    assert _chunk_span(95, 10, offset=90) == range(9, 10)
+
+
+def test_chunk_span_empty():
+    assert not _chunk_span(0, 10)
+    assert not _chunk_span(100, 10, offset=100)
+    assert not _chunk_span(100, 10, offset=5, length=0)
+
+
+def test_chunk_reader_bytes_and_files():
+    content = bytes(range(256)) * 10
+    stream = io.BytesIO(content)
+    stream.seek(6)
+    from_bytes, from_file = _chunk_reader(content[6:], 1000), _chunk_reader(stream, 1000)
+    for n in (2, 0, 1):
+        assert from_bytes(n) == from_file(n) == content[6 + n * 1000:6 + (n + 1) * 1000]
+
+
+class _OneConnectionPool:
+    """connect_oracledb over a pool of one: a nested acquire would wait forever."""
+
+    def __init__(self, rows, chunks):
+        self.rows, self.chunks, self.held = rows, chunks, False
+
+    def __call__(self):
+        pool = self
+
+        class Connection:
+            def __enter__(self):
+                assert not pool.held, "nested acquire on an exhausted pool"
+                pool.held = True
+                return self
+
+            def __exit__(self, *exc):
+                pool.held = False
+
+            def cursor(self):
+                return Cursor()
+
+        class Cursor:
+            description = [("OBJECT_ID",), ("CHUNK_SIZE",), ("CONTENT_HASH",), ("SIZE_BYTES",),
+                           ("CODEC",), ("CONTENT",)]
+
+            def execute(self, sql, **binds):
+                self.binds = binds
+
+            def fetchall(self):
+                return [self.rowfactory(*row) for row in pool.rows]
+
+            def fetchone(self):
+                return (pool.chunks[self.binds["chunk_no"]],)
+
+        return Connection()
+
+
+def test_tag_fetch_reads_chunks_after_releasing_its_connection(monkeypatch):
+    from src.services import oralake
+    pool = _OneConnectionPool([(1, 4, "ab" * 32, 10, None, None)], [b"abcd", b"efgh", b"ij"])
+    monkeypatch.setattr(oralake, "connect_oracledb", pool)
+    monkeypatch.setattr(oralake, "idle_connections", lambda: 0)
+
+    objects = oralake.fetch_objects_by_tag("photos")
+    assert objects[0]["content"] == b"abcdefghij"
@@ -0,0 +1,48 @@
+"""
+Tests for stored content compression codecs
+"""
+
+import os
+import pytest
+from src.services.codecs import (
+    available_codecs, choose_codec, codec_mode, compress, decode, decode_stream, is_precompressed
+)
+
+TEXT = b"id,name,role\n" + b"".join(b"%d,user_%d,viewer\n" % (i, i) for i in range(20_000))
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_round_trip(codec):
+    assert decode(codec, compress(codec, TEXT)) == TEXT
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_stream_range(codec):
+    encoded = compress(codec, TEXT)
+    chunks = iter([encoded[i:i + 1000] for i in range(0, len(encoded), 1000)])
+    assert b"".join(decode_stream(chunks, codec, offset=5000, length=70_000)) == TEXT[5000:75_000]
+
+
+def test_auto_keeps_smallest():
+    codec, encoded = choose_codec("auto", TEXT)
+    assert codec in available_codecs()
+    assert all(len(encoded) <= len(compress(other, TEXT)) for other in available_codecs())
+
+
+def test_precompressed_and_random_content_bypass():
+    assert is_precompressed(b"\xff\xd8\xff\xe0" + b"\x00" * 16)
+    assert is_precompressed(b"\x00\x00\x00\x18ftypmp42")
+    assert choose_codec("auto", b"\xff\xd8\xff\xe0" + TEXT) == (None, None)
+    assert choose_codec("zlib", os.urandom(4096)) == (None, None)
+    assert choose_codec("none", TEXT) == (None, None)
+
+
+def test_codec_mode_by_type():
+    assert codec_mode("json") == "auto"
+    assert codec_mode("VIDEO") == "none"
+    assert codec_mode("VIDEO", "zlib") == "zlib"
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        compress("brotli", TEXT)
@@ -0,0 +1,89 @@
+"""
+Tests for ETag and conditional request handling
+"""
+
+from datetime import datetime
+from src.routes.conditional import (
+    content_etag, last_modified, metadata_etag, not_modified, range_applies, rendition_etag
+)
+
+INFO = {"content_hash": "ab" * 32, "version_num": 3, "updated_at": datetime(2024, 5, 1, 12, 30, 15, 500)}
+
+
+def test_content_etag_combines_hash_and_version():
+    assert content_etag(INFO) == f'"{"ab" * 32}-v3"'
+    assert content_etag({**INFO, "version_num": 4}) != content_etag(INFO)
+    assert content_etag({**INFO, "content_hash": None}).startswith('"t')
+
+
+def test_rendition_etag_tracks_source_and_key():
+    etag = rendition_etag(INFO, "v3/300x/contain/q80.jpeg")
+    assert etag.startswith(f'"{"ab" * 32}-')
+    assert etag != rendition_etag(INFO, "v3/300x/contain/q80.webp")
+    assert etag != rendition_etag({**INFO, "content_hash": "cd" * 32}, "v3/300x/contain/q80.jpeg")
+
+
+def test_metadata_etag_tracks_payload():
+    assert metadata_etag({"a": 1, "b": 2}) == metadata_etag({"b": 2, "a": 1})
+    assert metadata_etag({"tag": "x"}) != metadata_etag({"tag": "y"})
+
+
+def test_if_none_match():
+    etag = content_etag(INFO)
+    assert not_modified({"if-none-match": etag}, etag)
+    assert not_modified({"if-none-match": f'"other", W/{etag}'}, etag)
+    assert not_modified({"if-none-match": "*"}, etag)
+    assert not not_modified({"if-none-match": '"other"'}, etag)
+    # If-None-Match wins over If-Modified-Since
+    assert not not_modified(
+        {"if-none-match": '"other"', "if-modified-since": "Wed, 01 May 2024 12:30:15 GMT"},
+        etag, INFO["updated_at"]
+    )
+
+
+def test_if_modified_since():
+    modified = INFO["updated_at"]
+    assert last_modified(modified) == "Wed, 01 May 2024 12:30:15 GMT"
+    assert not_modified({"if-modified-since": "Wed, 01 May 2024 12:30:15 GMT"}, '"x"', modified)
+    assert not not_modified({"if-modified-since": "Wed, 01 May 2024 12:30:14 GMT"}, '"x"', modified)
+    assert not not_modified({"if-modified-since": "not a date"}, '"x"', modified)
+    assert not not_modified({}, '"x"', modified)
+
+
+def test_if_range():
+    etag = content_etag(INFO)
+    assert range_applies({}, etag)
+    assert range_applies({"if-range": etag}, etag)
+    assert not range_applies({"if-range": '"stale"'}, etag)
+
+
+def test_content_304_comes_from_the_locator_lookup_alone(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import datalake_routes
+    from src.services import oralake_async
+
+    closed = []
+
+    class Stream:
+        info = {**INFO, "object_id": 7, "object_name": "photo", "object_type": "IMAGE",
+                "size_bytes": 10, "schema_hint": None}
+
+        async def aclose(self):
+            closed.append(True)
+
+    async def iter_object(object_id):
+        return Stream()
+
+    async def get_object_info(object_id):
+        raise AssertionError("a second lookup")
+
+    monkeypatch.setattr(oralake_async, "iter_object", iter_object)
+    monkeypatch.setattr(oralake_async, "get_object_info", get_object_info)
+    app = FastAPI()
+    app.include_router(datalake_routes.router)
+
+    response = TestClient(app).get("/datalake/objects/7/content",
+                                   headers={"If-None-Match": content_etag(INFO)})
+    assert response.status_code == 304 and response.headers["etag"] == content_etag(INFO)
+    assert closed == [True]
@@ -0,0 +1,77 @@
+"""
+Tests for content hashing ahead of deduplicated writes
+"""
+
+import hashlib
+import io
+import oracledb
+from types import SimpleNamespace
+from src.services.oralake import _claim_blob, _digest_content, _is_seekable, _peek
+
+
+def test_digest_bytes():
+    content = b"hello oralake"
+    content_hash, size, encode = _digest_content(None, content)
+    assert content_hash == hashlib.sha256(content).hexdigest()
+    assert size == len(content)
+    assert encode() == (None, content)
+
+
+def test_digest_bytes_compresses_on_encode():
+    content = b"a,b,c\n" * 10_000
+    _, size, encode = _digest_content(None, content, mode="zlib")
+    codec, payload = encode()
+    assert codec == "zlib"
+    assert len(payload) < size
+
+
+def test_digest_seekable_file_is_rewound():
+    content = b"x" * 100_000
+    stream = io.BytesIO(content)
+    stream.seek(10)
+
+    content_hash, size, _ = _digest_content(None, stream, chunk_size=4096)
+    assert content_hash == hashlib.sha256(content[10:]).hexdigest()
+    assert size == len(content) - 10
+    assert stream.tell() == 10
+
+
+def test_peek_replays_one_shot_streams():
+    head, source = _peek(iter([b"abc", b"def"]), 1024)
+    assert head == b"abc"
+    assert b"".join(source) == b"abcdef"
+
+
+def test_iterables_are_not_seekable():
+    assert _is_seekable(io.BytesIO(b"abc"))
+    assert not _is_seekable(iter([b"abc"]))
+    assert not _is_seekable(b"abc")
+
+
+class _RacingCursor:
+    """Cursor whose first insert hits a row that is released before the lock probe."""
+
+    def __init__(self):
+        self.statements = []
+        self.inserts = 0
+
+    def setinputsizes(self, **sizes):
+        pass
+
+    def execute(self, sql, binds):
+        self.statements.append(sql.split()[0])
+        if sql.lstrip().startswith("INSERT"):
+            self.inserts += 1
+            if self.inserts == 1:
+                raise oracledb.IntegrityError(SimpleNamespace(code=1))
+
+    def fetchall(self):
+        return []
+
+
+def test_claim_blob_retries_when_the_stored_row_was_released():
+    cursor = _RacingCursor()
+    binds = {"content_hash": "ab" * 32, "content": b"x", "size_bytes": 1, "codec": None}
+
+    assert _claim_blob(cursor, "INSERT INTO ora_lake_blobs ...", binds) is True
+    assert cursor.statements == ["INSERT", "SELECT", "INSERT"]
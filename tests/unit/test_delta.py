@@ -0,0 +1,53 @@
+"""
+Tests for the version delta codec
+"""
+
+import os
+import pytest
+from src.services.delta import apply_delta, encode_delta
+from src.services.oralake_core import DELTA_MAX_BYTES, _snapshot_base
+
+
+@pytest.mark.parametrize("base,target", [
+    (b"", b""),
+    (b"", b"new content"),
+    (b"old content", b""),
+    (b"same\nlines\n", b"same\nlines\n"),
+    (b"a\nb\nc\n", b"a\nx\nc\n"),
+    (b"header\n" + b"row\n" * 50, b"header\n" + b"row\n" * 25 + b"inserted\n" + b"row\n" * 25),
+])
+def test_round_trip(base, target):
+    assert apply_delta(base, encode_delta(base, target)) == target
+
+
+def test_random_binary_round_trip():
+    base, target = os.urandom(4096), os.urandom(5000)
+    assert apply_delta(base, encode_delta(base, target)) == target
+
+
+def test_small_edit_gives_small_delta():
+    base = b"".join(b"%d,name_%d\n" % (i, i) for i in range(10_000))
+    target = base.replace(b"5000,name_5000\n", b"5000,renamed\n")
+    delta = encode_delta(base, target)
+    assert len(delta) < 100
+    assert apply_delta(base, delta) == target
+
+
+def test_rejects_foreign_payload():
+    with pytest.raises(ValueError):
+        apply_delta(b"base", b"definitely not a delta")
+
+
+def test_rejects_wrong_base():
+    delta = encode_delta(b"0123456789" * 10, b"0123456789" * 10 + b"tail")
+    with pytest.raises(ValueError):
+        apply_delta(b"short", delta)
+
+
+def test_snapshot_base_is_limited_by_uncompressed_size():
+    lob = object()
+    # (version_num, content, codec, size_bytes, latest_version)
+    assert _snapshot_base((1, lob, "zlib", DELTA_MAX_BYTES, 2)) == (1, lob, "zlib")
+    # A snapshot that compresses well is still too big to diff in memory
+    assert _snapshot_base((1, lob, "zlib", DELTA_MAX_BYTES + 1, 2)) is None
+    assert _snapshot_base((1, None, None, None, 2)) is None
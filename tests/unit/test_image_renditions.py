@@ -0,0 +1,32 @@
+"""
+Tests for on-demand image rendition parameters and keys
+"""
+
+from src.services.image_renditions import RenditionParams
+import pytest
+
+
+def test_params_defaults_and_key():
+    params = RenditionParams.parse(300, None)
+    assert params == RenditionParams(300, None, "contain", "JPEG", 80)
+    assert params.media_type == "image/jpeg"
+    assert params.key(3) == "v3/300x/contain/q80.jpeg"
+    assert params.key(4) != params.key(3)
+
+
+def test_png_ignores_quality():
+    assert RenditionParams.parse(100, 100, "cover", "png", 50).key(1) == \
+        RenditionParams.parse(100, 100, "cover", "PNG").key(1) == "v1/100x100/cover/q0.png"
+
+
+@pytest.mark.parametrize("args", [
+    (None, None),
+    (0, 100),
+    (100, 5000),
+    (100, 100, "stretch"),
+    (100, 100, "contain", "gif"),
+    (100, 100, "contain", "webp", 101),
+])
+def test_invalid_params(args):
+    with pytest.raises(ValueError):
+        RenditionParams.parse(*args)
@@ -0,0 +1,198 @@
+"""
+Tests for the Pillow tasks and their worker-process execution mode
+"""
+
+from PIL import Image
+from src.config import settings
+from src.services import imaging
+import io
+import pytest
+
+
+def _png(tmp_path, size=(640, 480), mode="RGBA"):
+    path = tmp_path / "sample.png"
+    Image.new(mode, size, (200, 40, 40, 128) if mode == "RGBA" else (200, 40, 40)).save(path)
+    return str(path)
+
+
+def test_encode_image_inline(tmp_path):
+    image_bytes, info = imaging.encode_image(_png(tmp_path), compress=True, quality=80, max_dimension=320)
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        assert img.format == "JPEG" and img.size == (320, 240)
+    assert info["original_size"] == (640, 480)
+    assert info["current_size"] == [320, 240]
+    assert info["file_size_bytes"] == len(image_bytes)
+
+
+def test_thumbnail_flattens_transparency(tmp_path):
+    with open(_png(tmp_path), "rb") as f:
+        thumbnail = imaging.make_thumbnail(f.read(), (100, 100))
+    with Image.open(io.BytesIO(thumbnail)) as img:
+        assert img.format == "JPEG" and img.size == (100, 75)
+
+
+def test_thumbnail_of_large_jpeg():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4000, 3000), (30, 90, 160)).save(buffer, format="JPEG", quality=95)
+
+    thumbnail = imaging.make_thumbnail(buffer.getvalue(), (150, 150))
+    with Image.open(io.BytesIO(thumbnail)) as img:
+        assert img.format == "JPEG" and img.size == (150, 113)
+
+
+def test_probe_image_reads_header_only():
+    buffer = io.BytesIO()
+    Image.new("RGB", (4000, 3000), (30, 90, 160)).save(buffer, format="JPEG", quality=95)
+    image_bytes = buffer.getvalue()
+
+    assert imaging.probe_image(image_bytes[:4096]) == {"format": "JPEG", "size": (4000, 3000), "mode": "RGB"}
+    assert imaging.probe_image(image_bytes[:8]) is None
+
+
+def test_renditions_share_one_reduced_decode(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), (30, 90, 160)).save(path, quality=95)
+    renditions = [
+        {"name": "web", "max_dimension": 900, "quality": 75},
+        {"name": "thumb", "size": (200, 200), "format": "WEBP"},
+        {"name": "square", "size": (300, 100), "format": "PNG"},
+    ]
+
+    source_info, encoded = imaging.render_renditions(str(path), renditions)
+
+    assert source_info["original_size"] == (4000, 3000)
+    assert source_info["file_size_bytes"] == path.stat().st_size
+    sizes = []
+    for spec, (image_bytes, info) in zip(renditions, encoded):
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            assert img.format == info["format"] == spec.get("format", "JPEG")
+            sizes.append(img.size)
+        assert info["rendition"] == spec["name"] and info["current_size"] == list(sizes[-1])
+    assert sizes == [(900, 675), (200, 150), (133, 100)]
+
+
+def test_rendition_sizes_never_upscale():
+    assert imaging._fit((640, 480), (1920, 1920)) == (640, 480)
+    assert imaging._fit((640, 480), None) == (640, 480)
+    assert imaging._fit((640, 480), (320, 320)) == (320, 240)
+
+
+@pytest.mark.parametrize("width, height, fit, expected", [
+    (300, None, "contain", (300, 225)),
+    (None, 120, "contain", (160, 120)),
+    (300, 300, "contain", (300, 225)),
+    (300, 300, "cover", (300, 300)),
+    (300, 100, "fill", (300, 100)),
+    (2000, 2000, "cover", (1200, 900)),
+])
+def test_render_image_fits(width, height, fit, expected):
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), (10, 120, 60)).save(buffer, "JPEG")
+
+    rendered, info = imaging.render_image(buffer.getvalue(), width, height, fit, "webp", 70)
+
+    with Image.open(io.BytesIO(rendered)) as img:
+        assert img.format == "WEBP" and img.size == expected
+    assert info["current_size"] == list(expected) and info["quality"] == 70
+
+
+def _photo(tmp_path, size=(640, 480)):
+    # Smooth gradients plus noise, so quality settings make a measurable difference
+    import numpy as np
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, size[0], dtype=np.float32)
+    y = np.linspace(0, 255, size[1], dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) % 256], axis=-1)
+    path = tmp_path / "photo.png"
+    Image.fromarray(np.clip(base + rng.normal(0, 6, base.shape), 0, 255).astype(np.uint8)).save(path)
+    return str(path)
+
+
+def test_ssim():
+    import numpy as np
+    reference = np.tile(np.arange(64, dtype=np.uint8) * 4, (48, 1))
+    noisy = np.clip(reference + np.random.default_rng(0).normal(0, 20, reference.shape), 0, 255)
+
+    assert imaging.ssim(reference, reference) == pytest.approx(1.0)
+    assert imaging.ssim(reference, noisy) < 0.9
+    with pytest.raises(ValueError):
+        imaging.ssim(reference, reference[:10])
+
+
+def test_adaptive_encoding_meets_ssim_with_smallest_format(tmp_path):
+    image_bytes, info = imaging.encode_adaptive(_photo(tmp_path), min_ssim=0.9)
+
+    encoding = info["encoding"]
+    assert encoding["target_met"] and encoding["ssim"] >= 0.9
+    assert len(image_bytes) == min(c["file_size_bytes"] for c in encoding["candidates"] if c["target_met"])
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        assert img.format == info["format"] and img.size == (640, 480)
+
+
+def test_adaptive_encoding_keeps_the_best_quality_within_budget(tmp_path):
+    path = _photo(tmp_path)
+    image_bytes, info = imaging.encode_adaptive(path, max_bytes=20_000)
+    larger_bytes, larger_info = imaging.encode_adaptive(path, max_bytes=40_000)
+
+    assert len(image_bytes) <= 20_000 and info["encoding"]["target_met"]
+    assert info["format"] in ("JPEG", "WEBP") and info["quality"] is not None
+    assert len(larger_bytes) <= 40_000
+    assert larger_info["encoding"]["ssim"] > info["encoding"]["ssim"]
+
+
+def test_adaptive_encoding_unreachable_target(tmp_path):
+    image_bytes, info = imaging.encode_adaptive(_photo(tmp_path), min_ssim=0.99, max_bytes=2_000)
+
+    assert not info["encoding"]["target_met"]
+    assert len(image_bytes) == min(c["file_size_bytes"] for c in info["encoding"]["candidates"])
+
+
+def test_adaptive_encoding_keeps_transparency(tmp_path):
+    _, info = imaging.encode_adaptive(_png(tmp_path), min_ssim=0.95)
+
+    assert [c["format"] for c in info["encoding"]["candidates"]] == ["WEBP", "PNG"]
+    with pytest.raises(ValueError):
+        imaging.encode_adaptive(_png(tmp_path))
+
+
+@pytest.fixture
+def image_workers(monkeypatch):
+    monkeypatch.setattr(settings, "image_workers", 2)
+    monkeypatch.setattr(settings, "image_worker_queue_depth", 1)
+    monkeypatch.setattr(settings, "image_worker_max_tasks", 2)
+    yield
+    imaging.shutdown_image_workers()
+
+
+def test_worker_pool_matches_inline_results(tmp_path, image_workers):
+    path = _png(tmp_path, mode="RGB")
+    arg_lists = [(path, True, quality, 200) for quality in (50, 60, 70, 80, 90)]
+
+    # Queue depth 1 and two tasks per worker exercise back-pressure and recycling
+    results = imaging.run_image_tasks(imaging.encode_image, arg_lists)
+    assert results == [imaging.encode_image(*args) for args in arg_lists]
+
+    with open(path, "rb") as f:
+        converted = imaging.run_image_task(imaging.convert_bytes, f.read(), "webp", 70)
+    assert converted[8:12] == b"WEBP"
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_task_errors_can_be_returned_in_place(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(settings, "image_workers", workers)
+    arg_lists = [(_png(tmp_path),), (str(tmp_path / "missing.png"),)]
+    try:
+        results = imaging.run_image_tasks(imaging.encode_image, arg_lists, return_exceptions=True)
+    finally:
+        imaging.shutdown_image_workers()
+
+    assert results[0][1]["mode"] == "RGBA"
+    assert isinstance(results[1], FileNotFoundError)
+
+
+def test_worker_errors_reach_the_caller(tmp_path, image_workers):
+    with pytest.raises(FileNotFoundError):
+        imaging.run_image_task(imaging.encode_image, str(tmp_path / "missing.png"))
+    # The pool survives task errors
+    assert imaging.run_image_task(imaging.encode_image, _png(tmp_path))[1]["mode"] == "RGBA"
@@ -0,0 +1,51 @@
+"""
+Tests for the import-time budget check (scripts/import_budget.py)
+"""
+
+from pathlib import Path
+import importlib.util
+import subprocess
+import sys
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "import_budget.py"
+
+spec = importlib.util.spec_from_file_location("import_budget", SCRIPT)
+import_budget = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_budget)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 | encodings
+-- import budget: target starts --
+import time:      2000 |       2000 |       PIL._imaging
+import time:      5000 |       7000 |     PIL.Image
+import time:       300 |       7300 |   src.services.media_storage
+import time:      9000 |       9000 |     numpy
+import time:       100 |       9100 |   streamlit
+import time:       200 |      16600 | main
+"""
+
+
+def test_parse_importtime_links_importers():
+    modules = {module.name: module for module in import_budget.parse_importtime(SAMPLE)}
+
+    assert "encodings" not in modules
+    assert modules["PIL.Image"].parent is modules["src.services.media_storage"]
+    assert modules["PIL._imaging"].chain() == [
+        "main", "src.services.media_storage", "PIL.Image", "PIL._imaging"
+    ]
+    assert modules["main"].depth == 0 and modules["main"].cumulative_us == 16600
+
+
+def test_only_heavy_imports_from_our_code_fail():
+    modules = import_budget.parse_importtime(SAMPLE)
+    assert [module.name for module in import_budget.eager_heavy_imports(modules)] == ["PIL.Image"]
+
+
+def test_api_does_not_import_heavy_modules():
+    # Time budgets vary by machine, so only the heavy-module rule is enforced here
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "main:app", "--budget-ms", "0"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
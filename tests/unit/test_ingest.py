@@ -0,0 +1,155 @@
+"""
+Tests for streaming upload ingest
+"""
+
+import asyncio
+import hashlib
+import pytest
+from src.services.ingest import InvalidUpload, MemoryBudget, SpooledUpload, read_upload_form
+
+BOUNDARY = "oralakeboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def _body(payload: bytes, piece: int = 1000):
+    body = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"data.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + payload + (
+        f"\r\n--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"tags\"\r\n\r\ncsv,demo"
+        f"\r\n--{BOUNDARY}--\r\n"
+    ).encode()
+
+    async def stream():
+        for i in range(0, len(body), piece):
+            yield body[i:i + piece]
+    return stream()
+
+
+def test_form_is_hashed_while_streaming():
+    payload = b"id,value\n" * 5000
+
+    async def run():
+        form = await read_upload_form(CONTENT_TYPE, _body(payload))
+        try:
+            assert form.filename == "data.csv"
+            assert form.fields == {"tags": "csv,demo"}
+            assert form.file.size == len(payload)
+            assert form.file.content_hash == hashlib.sha256(payload).hexdigest()
+            assert await form.file.read() == payload
+            return form.file.spilled
+        finally:
+            await form.aclose()
+    assert asyncio.run(run()) is False
+
+
+def test_large_upload_spills_and_releases_budget():
+    budget = MemoryBudget(64 * 1024)
+
+    async def run():
+        upload = SpooledUpload(spool_bytes=16 * 1024, budget=budget)
+        await upload.append(b"x" * 10_000)
+        assert budget.used == 16 * 1024
+        await upload.append(b"y" * 10_000)
+        await upload.finish()
+        assert upload.spilled and budget.used == 0
+        assert await upload.read() == b"x" * 10_000 + b"y" * 10_000
+        await upload.aclose()
+    asyncio.run(run())
+
+
+def test_spilled_upload_never_touches_disk_on_the_loop(monkeypatch):
+    import src.services.ingest as ingest
+    import tempfile
+    import threading
+
+    class CheckedFile:
+        def __init__(self):
+            self.file = temporary()
+            self.seek, self.close = self.file.seek, self.file.close
+
+        def write(self, data):
+            assert threading.current_thread() is not threading.main_thread(), "write on the loop"
+            return self.file.write(data)
+
+        def read(self, size=-1):
+            assert threading.current_thread() is not threading.main_thread(), "read on the loop"
+            return self.file.read(size)
+
+    def temporary_file():
+        assert threading.current_thread() is not threading.main_thread(), "spill on the loop"
+        return CheckedFile()
+
+    temporary = tempfile.TemporaryFile
+    monkeypatch.setattr(ingest.tempfile, "TemporaryFile", temporary_file)
+
+    async def run():
+        upload = SpooledUpload(spool_bytes=1024, budget=MemoryBudget(4096))
+        await upload.append(b"x" * 1000)
+        await upload.append(b"y" * 1000)
+        await upload.finish()
+        data = await upload.read()
+        await upload.aclose()
+        return upload.spilled, data
+    assert asyncio.run(run()) == (True, b"x" * 1000 + b"y" * 1000)
+
+
+def test_finished_upload_keeps_only_what_it_buffers():
+    budget = MemoryBudget(64 * 1024)
+
+    async def run():
+        upload = SpooledUpload(spool_bytes=16 * 1024, budget=budget)
+        await upload.append(b"x" * 1000)
+        await upload.finish()
+        assert budget.used == 1000
+        await upload.aclose()
+        assert budget.used == 0
+    asyncio.run(run())
+
+
+def test_concurrent_partial_uploads_do_not_deadlock():
+    # Twenty uploads of 10 KB against room for four 16 KB allowances
+    budget = MemoryBudget(64 * 1024)
+    payload = b"z" * 10_000
+
+    async def upload():
+        spooled = SpooledUpload(spool_bytes=16 * 1024, budget=budget)
+        try:
+            for i in range(0, len(payload), 1000):
+                await spooled.append(payload[i:i + 1000])
+                await asyncio.sleep(0)
+            await spooled.finish()
+            assert not spooled.spilled
+            return await spooled.read()
+        finally:
+            await spooled.aclose()
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(upload() for _ in range(20))), timeout=10)
+
+    assert asyncio.run(run()) == [payload] * 20
+    assert budget.used == 0 and budget.waits > 0
+
+
+def test_budget_applies_backpressure():
+    budget = MemoryBudget(100)
+
+    async def run():
+        await budget.acquire(80)
+        waiter = asyncio.create_task(budget.acquire(50))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await budget.release(80)
+        assert await waiter == 50
+        assert budget.waits == 1
+    asyncio.run(run())
+
+
+def test_missing_file_part_is_rejected():
+    async def empty():
+        yield f"--{BOUNDARY}--\r\n".encode()
+
+    with pytest.raises(InvalidUpload):
+        asyncio.run(read_upload_form(CONTENT_TYPE, empty()))
+    with pytest.raises(InvalidUpload):
+        asyncio.run(read_upload_form("application/json", empty()))
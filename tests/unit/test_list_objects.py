@@ -0,0 +1,38 @@
+"""
+Tests for list_objects cursors and query construction
+"""
+
+import pytest
+from datetime import datetime
+from src.services.oralake import (
+    _list_objects_query, _list_page, decode_cursor, encode_cursor
+)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+
+
+def test_decode_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_query_only_binds_given_filters():
+    sql, binds = _list_objects_query(
+        tag="photo", obj_type=None, created_after=datetime(2025, 1, 1),
+        min_size=None, limit=10, after_id=42
+    )
+    assert binds == {
+        "after_id": 42, "page_rows": 11, "tag": "photo", "created_after": datetime(2025, 1, 1)
+    }
+    assert "o.content," not in sql
+    assert "ORDER BY o.object_id" in sql
+
+
+def test_page_sets_cursor_only_when_more_rows():
+    rows = [{"object_id": i} for i in (1, 2, 3)]
+    page = _list_page(rows, limit=2)
+    assert page["objects"] == rows[:2]
+    assert decode_cursor(page["next_cursor"]) == 2
+    assert _list_page(rows, limit=3)["next_cursor"] is None
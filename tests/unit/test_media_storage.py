@@ -12,7 +12,7 @@ from src.services.media_storage import (
     convert_image_format,
     create_thumbnail
 )
-from src.database import pool
+from src.database import get_pool
 
 
 @pytest.fixture(autouse=True)
@@ -30,7 +30,7 @@ def cleanup_test_media():
 def _cleanup():
     """Helper function to clean up test data"""
     try:
-        with pool.acquire() as conn:
+        with get_pool().acquire() as conn:
             cursor = conn.cursor()
             
             # Delete test media objects (order matters due to foreign keys)
@@ -65,6 +65,7 @@ def _cleanup():
                 """, pattern=pattern)
             
             conn.commit()
+            cursor.callproc("ora_lake_ops.purge_blobs")
     except Exception as e:
         print(f"Cleanup error: {e}")
 
@@ -0,0 +1,57 @@
+"""
+Tests for the byte-bounded object content cache
+"""
+
+from src.services.object_cache import ObjectCache
+
+
+def test_hit_miss_and_version_keys():
+    cache = ObjectCache(max_bytes=100)
+    cache.put(1, 1, b"v1")
+    assert cache.get(1, 1) == b"v1"
+    assert cache.get(1, 2) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ObjectCache(max_bytes=30, max_entry_bytes=30)
+    cache.put(1, 1, b"a" * 10)
+    cache.put(2, 1, b"b" * 10)
+    cache.get(1, 1)
+    cache.put(3, 1, b"c" * 15)
+
+    assert cache.get(2, 1) is None
+    assert cache.get(1, 1) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 25
+
+
+def test_skips_entries_over_the_per_entry_limit():
+    cache = ObjectCache(max_bytes=80)
+    cache.put(1, 1, b"x" * 11)
+    assert cache.get(1, 1) is None
+
+
+def test_invalidate_by_id_and_name():
+    cache = ObjectCache(max_bytes=100, max_entry_bytes=100)
+    cache.put(1, 1, b"one", "profile_alice", "IMAGE")
+    cache.put(1, 2, b"two", "profile_alice", "IMAGE")
+    cache.put(2, 1, b"other", "profile_bob", "IMAGE")
+
+    cache.invalidate_name("profile_alice", "IMAGE")
+    assert cache.get(1, 1) is None and cache.get(1, 2) is None
+    assert cache.get(2, 1) == b"other"
+
+    cache.invalidate(2)
+    assert cache.get(2, 1) is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ObjectCache(max_bytes=0)
+    cache.put(1, 1, b"data")
+    assert not cache.enabled
+    assert cache.get(1, 1) is None
@@ -0,0 +1,88 @@
+"""
+Tests for the connection ownership of object content streams
+"""
+
+import asyncio
+import zlib
+from src.services.oralake import ObjectStream
+from src.services.oralake_async import AsyncObjectStream
+
+
+class _Connection:
+    def __init__(self):
+        self.closes = 0
+
+    def close(self):
+        self.closes += 1
+
+
+class _AsyncConnection(_Connection):
+    async def close(self):
+        self.closes += 1
+
+
+class _Lob:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def getchunksize(self):
+        return 4
+
+    def size(self):
+        return len(self.data)
+
+    def read(self, offset, amount):
+        return self.data[offset - 1:offset - 1 + amount]
+
+
+class _AsyncLob(_Lob):
+    async def getchunksize(self):
+        return 4
+
+    async def size(self):
+        return len(self.data)
+
+    async def read(self, offset, amount):
+        return self.data[offset - 1:offset - 1 + amount]
+
+
+INFO = {"version_num": 3, "content_hash": "ab" * 32, "size_bytes": 26}
+CONTENT = b"abcdefghijklmnopqrstuvwxyz"
+
+
+def test_unread_stream_releases_its_connection_on_close():
+    conn = _Connection()
+    with ObjectStream(conn, _Lob(CONTENT), None, INFO):
+        pass
+    assert conn.closes == 1
+
+
+def test_exhausted_stream_releases_its_connection_once():
+    conn = _Connection()
+    stream = ObjectStream(conn, _Lob(CONTENT), None, INFO, offset=2, length=5)
+    assert b"".join(stream) == b"cdefg"
+    stream.close()
+    assert conn.closes == 1
+    assert stream.version == 3
+
+
+def test_ranges_share_one_locator():
+    conn = _Connection()
+    with ObjectStream(conn, _Lob(zlib.compress(CONTENT)), "zlib", INFO) as stream:
+        assert b"".join(stream.read_range(0, 3)) == b"abc"
+        assert b"".join(stream.read_range(23)) == b"xyz"
+        assert conn.closes == 0
+    assert conn.closes == 1
+
+
+def test_async_stream_releases_its_connection():
+    async def run():
+        unread, read = _AsyncConnection(), _AsyncConnection()
+        async with AsyncObjectStream(unread, _AsyncLob(CONTENT), None, INFO):
+            pass
+        stream = AsyncObjectStream(read, _AsyncLob(CONTENT), None, INFO, offset=20)
+        data = b"".join([piece async for piece in stream])
+        await stream.aclose()
+        return data, unread.closes, read.closes
+
+    assert asyncio.run(run()) == (b"uvwxyz", 1, 1)
@@ -0,0 +1,75 @@
+"""
+Tests for connection pool acquire statistics
+"""
+
+from src.database import PoolStats
+import asyncio
+import src.database as db
+import subprocess
+import sys
+
+
+def test_pool_stats_percentiles():
+    stats = PoolStats(sample_size=100)
+    for ms in range(1, 101):
+        stats.record_wait(ms / 1000)
+
+    snapshot = stats.snapshot()
+    assert snapshot["acquired"] == 100
+    assert snapshot["wait_ms"]["p50"] == 51.0
+    assert snapshot["wait_ms"]["p99"] == 99.0
+    assert snapshot["wait_ms"]["max"] == 100.0
+
+
+def test_pool_stats_counts_timeouts_separately():
+    stats = PoolStats()
+    stats.record_failure(Exception("DPY-4005: timed out waiting for the connection pool"))
+    stats.record_failure(Exception("ORA-12541: no listener"))
+
+    snapshot = stats.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["failures"] == 1
+    assert snapshot["wait_ms"]["p50"] is None
+
+
+def test_importing_services_does_not_create_pools():
+    # A fresh interpreter, since other test modules import the pool itself
+    code = (
+        "import src.services.oralake, src.services.oralake_async, src.database as db; "
+        "assert db._pool is None and db._async_pool is None"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, timeout=60)
+    assert result.returncode == 0, result.stderr.decode()
+
+
+class _AsyncPool:
+    busy = 0
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self, force=False):
+        self.closed = True
+
+
+def test_async_pool_is_recreated_for_a_new_event_loop(monkeypatch):
+    created = []
+    monkeypatch.setattr(db.oracledb, "create_pool_async", lambda **params: created.append(_AsyncPool()) or created[-1])
+    monkeypatch.setattr(db, "_async_pool", None)
+    monkeypatch.setattr(db, "_async_pool_loop", None)
+
+    async def get_twice():
+        return db.get_async_pool(), db.get_async_pool()
+
+    async def get_and_close():
+        pools = await get_twice()
+        await db.close_pools(drain_timeout=0)
+        return pools
+
+    first, again = asyncio.run(get_twice())
+    second, _ = asyncio.run(get_and_close())
+    assert first is again
+    assert second is not first
+    assert len(created) == 2
+    # The replaced pool is closed, not just dropped
+    assert first.closed and second.closed
@@ -0,0 +1,43 @@
+"""
+Tests for HTTP Range header parsing
+"""
+
+import pytest
+from src.routes.ranges import (
+    RangeNotSatisfiable, multipart_headers, multipart_length, parse_range
+)
+
+
+def test_parse_single_and_open_ranges():
+    assert parse_range("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range("bytes=990-2000", 1000) == [(990, 999)]
+
+
+def test_parse_multiple_ranges_skips_out_of_bounds():
+    assert parse_range("bytes=0-9, 20-29, 5000-6000", 1000) == [(0, 9), (20, 29)]
+
+
+def test_parse_ignores_missing_or_malformed_headers():
+    assert parse_range(None, 1000) is None
+    assert parse_range("items=0-10", 1000) is None
+    assert parse_range("bytes=abc-10", 1000) is None
+    assert parse_range("bytes=10-5", 1000) is None
+
+
+def test_parse_unsatisfiable():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=1000-1100", 1000)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=5000-", 1000)
+
+
+def test_multipart_length_matches_body():
+    ranges = [(0, 9), (20, 29)]
+    body = b""
+    for start, end in ranges:
+        body += multipart_headers("b", "video/mp4", start, end, 100)
+        body += b"x" * (end - start + 1) + b"\r\n"
+    body += b"--b--\r\n"
+    assert multipart_length("b", "video/mp4", ranges, 100) == len(body)
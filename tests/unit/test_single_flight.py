@@ -0,0 +1,80 @@
+"""
+Tests for single-flight request coalescing
+"""
+
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.services.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    runs, waits = [], []
+
+    def fetch():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return b"payload"
+
+    def read():
+        return flights.do((1, 1), fetch, on_wait=lambda: waits.append(1))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(read)
+        started.wait(5)
+        followers = [executor.submit(read) for _ in range(3)]
+        while len(waits) < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(runs) == 1
+    assert results[0] == (b"payload", False)
+    assert all(result == (b"payload", True) for result in results[1:])
+    assert flights.stats() == {"calls": 1, "shared": 3}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flights.do("key", lambda: 42) == (42, False)
+
+
+def test_async_callers_share_one_task():
+    flights = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return b"payload"
+
+    async def run():
+        return await asyncio.gather(*(flights.do_async((1, 2), fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(runs) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(data == b"payload" for data, _ in results)
+
+
+def test_cancelled_async_caller_does_not_cancel_others():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do_async("k", fetch))
+        second = asyncio.ensure_future(flights.do_async("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == ("done", True)
@@ -0,0 +1,92 @@
+"""
+Tests for the multipart upload staging area
+"""
+
+import asyncio
+import os
+import pytest
+from src.config import settings
+from src.services import uploads
+
+
+@pytest.fixture(autouse=True)
+def staging_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_staging_dir", str(tmp_path))
+
+
+def _write(upload_id, part_number, *chunks):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+    return asyncio.run(uploads.write_part(upload_id, part_number, body()))
+
+
+def test_parts_assemble_in_order():
+    upload_id = uploads.create_upload("video", "video/mp4")
+    _write(upload_id, 2, b"world")
+    first = _write(upload_id, 1, b"hello ", b"big ")
+    assert first["size"] == 10
+
+    session, reader = uploads.open_parts(upload_id)
+    with reader:
+        assert session["name"] == "video"
+        assert reader.read() == b"hello big world"
+        reader.seek(8)
+        assert reader.read(4) == b"g wo"
+
+
+def test_resent_part_replaces_earlier_one():
+    upload_id = uploads.create_upload("log", "text/plain")
+    _write(upload_id, 1, b"partial")
+    part = _write(upload_id, 1, b"complete")
+    assert uploads.get_upload(upload_id)["parts"] == [part]
+
+
+def test_parallel_uploads_of_one_part_keep_one_file(tmp_path):
+    upload_id = uploads.create_upload("log", "text/plain")
+
+    async def body(data):
+        for i in range(0, len(data), 4):
+            await asyncio.sleep(0)
+            yield data[i:i + 4]
+
+    async def both():
+        return await asyncio.gather(*(uploads.write_part(upload_id, 1, body(data))
+                                      for data in (b"first copy", b"second copy")))
+
+    results = asyncio.run(both())
+    parts = uploads.get_upload(upload_id)["parts"]
+    assert len(parts) == 1 and parts[0] in results
+    assert len(list((tmp_path / upload_id).glob("00001.*.part"))) == 1
+
+
+def test_last_placed_duplicate_wins(tmp_path):
+    upload_id = uploads.create_upload("log", "text/plain")
+    older, newer = (tmp_path / upload_id / f"00001.{c * 64}.part" for c in "ab")
+    newer.write_bytes(b"new")
+    older.write_bytes(b"old")
+    os.utime(older, ns=(1, 1))
+
+    assert uploads.get_upload(upload_id)["parts"][0]["etag"] == "b" * 64
+
+
+def test_complete_checks_listed_parts():
+    upload_id = uploads.create_upload("data", "text/csv")
+    part = _write(upload_id, 1, b"a,b\n")
+    with pytest.raises(uploads.InvalidPart):
+        uploads.open_parts(upload_id, [{"part_number": 2}])
+    with pytest.raises(uploads.InvalidPart):
+        uploads.open_parts(upload_id, [{"part_number": 1, "etag": "0" * 64}])
+    _, reader = uploads.open_parts(upload_id, [part])
+    reader.close()
+
+
+def test_invalid_and_unknown_uploads():
+    upload_id = uploads.create_upload("data", "text/csv")
+    with pytest.raises(uploads.InvalidPart):
+        _write(upload_id, 0, b"x")
+    with pytest.raises(uploads.UploadNotFound):
+        uploads.get_upload("../" + upload_id)
+    uploads.abort_upload(upload_id)
+    with pytest.raises(uploads.UploadNotFound):
+        uploads.get_upload(upload_id)